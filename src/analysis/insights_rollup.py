@@ -0,0 +1,214 @@
+"""
+Incremental Rollup Store for Aggregated Insights
+10 Academy Week 2 Challenge - Task 2: Sentiment and Thematic Analysis
+
+`aggregate_insights` used to rebuild the (bank, rating) table from every review
+with a groupby and a per-group `mode()`. This module keeps additive counters per
+(bank, rating) in SQLite instead:
+- number of rows and of non-empty reviews
+- sum of the numeric sentiment (POSITIVE=1, NEUTRAL=0, NEGATIVE=-1)
+- a rating histogram and a theme frequency table
+
+Merging new reviews costs O(new rows): a table of review hashes skips reviews that
+were already counted, and the mean, median and mode are derived from the counters
+when the aggregate is read. The table also keeps the sentiment label and theme each
+review was counted with, so a review re-scored by another model or re-themed by a
+changed mapping moves its contribution instead of keeping its first label forever.
+"""
+
+import os
+import hashlib
+import sqlite3
+import logging
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_NUMERIC = {'POSITIVE': 1, 'NEUTRAL': 0, 'NEGATIVE': -1}
+
+
+def review_hashes(df: pd.DataFrame) -> pd.Series:
+    """
+    SHA-1 of the columns that identify a review across runs: bank, text, date
+    (Task 1 de-duplicates on these three) and rating.
+    """
+    dates = pd.to_datetime(df['date'], errors='coerce').dt.strftime('%Y-%m-%d').fillna('')
+    keys = (df['bank'].astype(str) + '|' + df['review'].fillna('').astype(str) + '|' + dates
+            + '|' + df['rating'].astype(str))
+    return keys.map(lambda key: hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+def median_from_histogram(histogram: dict) -> float:
+    """Median of the values described by {value: count}, as pandas' median() computes it."""
+    total = sum(histogram.values())
+    values = sorted(histogram)
+    lower_rank, upper_rank = (total - 1) // 2, total // 2
+    lower = upper = None
+    seen = 0
+    for value in values:
+        seen += histogram[value]
+        if lower is None and seen > lower_rank:
+            lower = value
+        if seen > upper_rank:
+            upper = value
+            break
+    return (lower + upper) / 2
+
+def _optional(value):
+    """NaN / None -> None, so labels and themes compare equal to their stored NULLs."""
+    return None if pd.isna(value) else str(value)
+
+class InsightsRollup:
+    """
+    SQLite-backed additive counters per (bank, rating). Reviews merged twice are
+    counted once, so the daily run can merge its whole output; a review merged again
+    with a different sentiment label or theme is counted with the new values.
+    """
+
+    # Stay well below SQLite's limit on bound parameters per statement
+    QUERY_BATCH_SIZE = 500
+    TABLES = ('rollup_counts', 'rollup_ratings', 'rollup_themes', 'rollup_seen')
+
+    def __init__(self, filepath: str):
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        self.conn = sqlite3.connect(filepath)
+        seen_columns = [row[1] for row in self.conn.execute("PRAGMA table_info(rollup_seen)")]
+        if seen_columns and 'sentiment_label' not in seen_columns:
+            # Stores from before labels were tracked cannot tell re-scored reviews
+            # apart; start over, the next merge of the full output rebuilds them
+            logger.warning("Insights rollup: store predates label tracking; resetting it.")
+            with self.conn:
+                for table in self.TABLES:
+                    self.conn.execute(f"DROP TABLE {table}")
+        self.conn.executescript(
+            "CREATE TABLE IF NOT EXISTS rollup_counts ("
+            " bank TEXT NOT NULL, rating INTEGER NOT NULL,"
+            " row_count INTEGER NOT NULL, review_count INTEGER NOT NULL, sentiment_sum REAL NOT NULL,"
+            " PRIMARY KEY (bank, rating));"
+            "CREATE TABLE IF NOT EXISTS rollup_ratings ("
+            " bank TEXT NOT NULL, rating INTEGER NOT NULL, rating_value REAL NOT NULL, count INTEGER NOT NULL,"
+            " PRIMARY KEY (bank, rating, rating_value));"
+            "CREATE TABLE IF NOT EXISTS rollup_themes ("
+            " bank TEXT NOT NULL, rating INTEGER NOT NULL, theme TEXT NOT NULL, count INTEGER NOT NULL,"
+            " PRIMARY KEY (bank, rating, theme));"
+            "CREATE TABLE IF NOT EXISTS rollup_seen ("
+            " review_hash TEXT PRIMARY KEY, sentiment_label TEXT, theme TEXT);"
+        )
+
+    def _seen(self, hashes: list) -> dict:
+        """{review_hash: (sentiment_label, theme)} of the hashes already counted."""
+        seen = {}
+        for i in range(0, len(hashes), self.QUERY_BATCH_SIZE):
+            batch = hashes[i:i + self.QUERY_BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            rows = self.conn.execute(
+                f"SELECT review_hash, sentiment_label, theme FROM rollup_seen WHERE review_hash IN ({placeholders})", batch
+            )
+            seen.update((review_hash, (label, theme)) for review_hash, label, theme in rows)
+        return seen
+
+    def merge(self, df: pd.DataFrame) -> int:
+        """
+        Adds the reviews of `df` not counted before to the counters, and moves the
+        contribution of reviews whose sentiment label or theme changed since they were
+        counted. Returns how many reviews were added or updated.
+        """
+        # groupby() drops rows with a missing key, so the counters do too
+        df = df.dropna(subset=['bank', 'rating']).copy()
+        df['review_hash'] = review_hashes(df)
+        # The same review twice in one batch is counted once, with its last values
+        df = df.drop_duplicates(subset=['review_hash'], keep='last')
+        current = [(_optional(label), _optional(theme)) for label, theme in zip(df['sentiment_label'], df['identified_theme'])]
+
+        seen = self._seen(df['review_hash'].tolist())
+        stored = [seen.get(review_hash) for review_hash in df['review_hash']]
+        is_new = pd.Series([values is None for values in stored], index=df.index)
+        is_changed = pd.Series([
+            values is not None and values != current_values for values, current_values in zip(stored, current)
+        ], index=df.index)
+
+        new_rows = df[is_new].copy()
+        changed_rows = df[is_changed].copy()
+        if new_rows.empty and changed_rows.empty:
+            return 0
+
+        keys = ['bank', 'rating']
+        # Signed contributions: +1 for new rows and the new values of changed rows,
+        # -1 for the values changed rows were counted with before
+        previous = changed_rows.assign(
+            sentiment_label=[stored_values[0] for stored_values, changed in zip(stored, is_changed) if changed],
+            identified_theme=[stored_values[1] for stored_values, changed in zip(stored, is_changed) if changed],
+        )
+        contributions = pd.concat([
+            new_rows.assign(weight=1, new_row=1),
+            changed_rows.assign(weight=1, new_row=0),
+            previous.assign(weight=-1, new_row=0),
+        ], ignore_index=True)
+        contributions['bank'] = contributions['bank'].astype(str)
+        contributions['rating'] = contributions['rating'].astype(int)
+        contributions['sentiment_delta'] = contributions['sentiment_label'].map(SENTIMENT_NUMERIC).fillna(0) * contributions['weight']
+        contributions['review_delta'] = contributions['review'].notna().astype(int) * contributions['new_row']
+
+        counts = contributions.groupby(keys).agg(
+            row_count=('new_row', 'sum'),
+            review_count=('review_delta', 'sum'),
+            sentiment_sum=('sentiment_delta', 'sum')
+        ).reset_index()
+        # Groups are keyed by rating, so each histogram has a single value; it is kept
+        # as a table so the median stays derivable if the grouping keys change
+        ratings = new_rows.assign(bank=new_rows['bank'].astype(str), rating=new_rows['rating'].astype(int))
+        ratings = ratings.assign(rating_value=ratings['rating']).groupby(keys + ['rating_value']).size().reset_index(name='count')
+        themes = contributions.dropna(subset=['identified_theme']).rename(columns={'identified_theme': 'theme'})
+        themes = themes.groupby(keys + ['theme'])['weight'].sum().reset_index(name='count')
+        themes = themes[themes['count'] != 0]
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO rollup_counts (bank, rating, row_count, review_count, sentiment_sum) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (bank, rating) DO UPDATE SET row_count = row_count + excluded.row_count, "
+                "review_count = review_count + excluded.review_count, sentiment_sum = sentiment_sum + excluded.sentiment_sum",
+                [(b, int(r), int(n), int(c), float(s)) for b, r, n, c, s in counts.itertuples(index=False)]
+            )
+            self.conn.executemany(
+                "INSERT INTO rollup_ratings (bank, rating, rating_value, count) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (bank, rating, rating_value) DO UPDATE SET count = count + excluded.count",
+                [(b, int(r), float(v), int(c)) for b, r, v, c in ratings.itertuples(index=False)]
+            )
+            self.conn.executemany(
+                "INSERT INTO rollup_themes (bank, rating, theme, count) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (bank, rating, theme) DO UPDATE SET count = count + excluded.count",
+                [(b, int(r), t, int(c)) for b, r, t, c in themes.itertuples(index=False)]
+            )
+            # A theme whose last review moved to another theme must not be a mode candidate
+            self.conn.execute("DELETE FROM rollup_themes WHERE count <= 0")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO rollup_seen (review_hash, sentiment_label, theme) VALUES (?, ?, ?)",
+                [(review_hash, *values) for review_hash, values, counted in zip(df['review_hash'], current, is_new | is_changed) if counted]
+            )
+        logger.info(f"Insights rollup: merged {len(new_rows)} new reviews and updated {len(changed_rows)} re-scored or "
+                    f"re-themed reviews ({len(df) - len(new_rows) - len(changed_rows)} unchanged).")
+        return len(new_rows) + len(changed_rows)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        The aggregate table of `aggregate_insights`, derived from the counters:
+        mean = sum / rows, median from the rating histogram, and mode = most frequent
+        theme with ties going to the alphabetically smallest (as `mode()[0]` does).
+        """
+        counts = pd.read_sql_query("SELECT * FROM rollup_counts ORDER BY bank, rating", self.conn)
+        ratings = pd.read_sql_query("SELECT * FROM rollup_ratings", self.conn)
+        themes = pd.read_sql_query(
+            "SELECT bank, rating, theme FROM rollup_themes ORDER BY bank, rating, count DESC, theme", self.conn
+        ).drop_duplicates(subset=['bank', 'rating'])
+
+        medians = {
+            key: median_from_histogram(dict(zip(group['rating_value'], group['count'])))
+            for key, group in ratings.groupby(['bank', 'rating'])
+        }
+        agg_df = counts.merge(themes.rename(columns={'theme': 'top_theme'}), on=['bank', 'rating'], how='left')
+        agg_df['Avg_Sentiment_Index (-1 to 1)'] = agg_df['sentiment_sum'] / agg_df['row_count']
+        agg_df['median_rating'] = [medians[key] for key in zip(agg_df['bank'], agg_df['rating'])]
+        agg_df = agg_df.rename(columns={'review_count': 'total_reviews'})
+        return agg_df[['bank', 'rating', 'total_reviews', 'Avg_Sentiment_Index (-1 to 1)', 'median_rating', 'top_theme']]
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,250 @@
+"""
+Streaming Keyword Statistics (Hashed Document Frequencies + Space-Saving Top-k)
+10 Academy Week 2 Challenge - Task 2: Sentiment and Thematic Analysis
+
+Replaces the full TF-IDF refit of every run with statistics that are updated
+incrementally from the tokens of new reviews only:
+- document frequencies of all 1- to 3-grams in a fixed-size hashed array (the
+  hashing trick: memory does not grow with the vocabulary, collisions only ever
+  overestimate a term's frequency)
+- approximate top-k n-grams per (bank, month), per bank and overall, kept with
+  Space-Saving counters (Metwally et al.), whose counts overestimate by at most the
+  recorded error. The capacity is far above the distinct n-grams of a month, so
+  monthly counts are exact; longer windows may evict, and their terms are ranked
+  on the guaranteed count (count - error) so that a rare term which inherited a
+  large error never outranks a frequent one
+
+Terms are ranked by guaranteed document count x smoothed IDF, the same weighting as
+TfidfVectorizer's default. Comparing a month's counters with the previous month
+surfaces emerging phrases without refitting anything.
+"""
+
+import os
+import json
+import zlib
+import heapq
+import logging
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+logger = logging.getLogger(__name__)
+
+ALL = '*'
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter summary with room for `capacity` items. An unseen
+    item replaces the current minimum and inherits its count as the error bound,
+    so an item's true count lies between count - error and count.
+    """
+
+    def __init__(self, capacity: int, counts: dict = None, errors: dict = None):
+        self.capacity = capacity
+        self.counts = counts or {}
+        self.errors = errors or {}
+        # Lazy min-heap with one (count, item) entry per item. Counts only grow, so an
+        # entry never exceeds its item's count and is refreshed when it reaches the top
+        self._heap = [(count, item) for item, count in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def _min(self) -> tuple:
+        """(item, count) with the smallest count, in amortized O(log capacity)."""
+        while True:
+            count, item = self._heap[0]
+            if self.counts[item] == count:
+                return item, count
+            heapq.heapreplace(self._heap, (self.counts[item], item))
+
+    def add(self, item: str, weight: int = 1):
+        if item in self.counts:
+            self.counts[item] += weight
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = weight
+            self.errors[item] = 0
+            heapq.heappush(self._heap, (weight, item))
+        else:
+            evicted, floor = self._min()
+            heapq.heapreplace(self._heap, (floor + weight, item))
+            del self.counts[evicted], self.errors[evicted]
+            self.counts[item] = floor + weight
+            self.errors[item] = floor
+
+    def guaranteed(self, item: str) -> int:
+        """Lower bound of the item's true count (0 if it is not tracked)."""
+        return self.counts.get(item, 0) - self.errors.get(item, 0)
+
+    def upper_bound(self, item: str) -> int:
+        """Upper bound of the item's true count; an untracked item was at most the minimum once full."""
+        if item in self.counts:
+            return self.counts[item]
+        return self._min()[1] if len(self.counts) >= self.capacity else 0
+
+    def top(self, n: int) -> list:
+        """[(item, guaranteed_count, max_overestimate)] of the `n` highest guaranteed counts."""
+        items = sorted(self.counts, key=lambda item: (-self.guaranteed(item), -self.counts[item], item))[:n]
+        return [(item, self.guaranteed(item), self.errors[item]) for item in items]
+
+    def to_dict(self) -> dict:
+        return {'counts': self.counts, 'errors': self.errors}
+
+class KeywordStatistics:
+    """Incrementally updated n-gram document frequencies and top-k terms per bank and month."""
+
+    # Counters, document frequencies and seen hashes in a single file, replaced atomically
+    STATE_FILENAME = 'keyword_stats.npz'
+
+    def __init__(self, num_features: int = 2 ** 20, top_k: int = 200, ngram_range: tuple = (1, 3),
+                 capacity: int = 50_000):
+        self.num_features = num_features
+        self.top_k = top_k
+        self.ngram_range = tuple(ngram_range)
+        self.capacity = capacity
+        self.total_docs = 0
+        self.doc_freq = np.zeros(num_features, dtype=np.int64)
+        self.sketches = {}  # 'bank|month' -> SpaceSaving (ALL stands for every bank / month)
+        # 64-bit hashes of the reviews already counted, kept sorted for binary search
+        self.seen_hashes = np.empty(0, dtype=np.uint64)
+
+    def ngrams(self, tokens: str) -> set:
+        """Distinct n-grams of a space-joined token string, after stop-word removal (as TfidfVectorizer does)."""
+        words = [word for word in tokens.split() if word not in ENGLISH_STOP_WORDS]
+        low, high = self.ngram_range
+        return {
+            ' '.join(words[i:i + n])
+            for n in range(low, high + 1)
+            for i in range(len(words) - n + 1)
+        }
+
+    def _feature_index(self, term: str) -> int:
+        # crc32 is stable across processes, unlike Python's salted hash()
+        return zlib.crc32(term.encode('utf-8')) % self.num_features
+
+    def _sketch(self, bank: str, month: str) -> SpaceSaving:
+        key = f"{bank}|{month}"
+        if key not in self.sketches:
+            self.sketches[key] = SpaceSaving(self.capacity)
+        return self.sketches[key]
+
+    def _filter_new(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Drops reviews counted in an earlier update and records the new ones."""
+        keys = pd.DataFrame({
+            'bank': df['bank'].astype(str),
+            'review': df['review'].astype(str),
+            'date': pd.to_datetime(df['date'], errors='coerce').dt.strftime('%Y-%m-%d'),
+        })
+        hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+        positions = np.searchsorted(self.seen_hashes, hashes)
+        positions[positions == len(self.seen_hashes)] = 0
+        already_seen = (self.seen_hashes[positions] == hashes) if len(self.seen_hashes) else np.zeros(len(hashes), dtype=bool)
+
+        self.seen_hashes = np.union1d(self.seen_hashes, hashes[~already_seen])
+        return df[~already_seen]
+
+    def update(self, df: pd.DataFrame, text_col: str = 'review_tokens') -> int:
+        """Counts the reviews of `df` not seen before. Returns how many were added."""
+        new_rows = self._filter_new(df.dropna(subset=[text_col]))
+        months = pd.to_datetime(new_rows['date'], errors='coerce').dt.strftime('%Y-%m').fillna('unknown')
+
+        for tokens, bank, month in zip(new_rows[text_col], new_rows['bank'].astype(str), months):
+            terms = self.ngrams(tokens)
+            if not terms:
+                continue
+            self.total_docs += 1
+            np.add.at(self.doc_freq, [self._feature_index(term) for term in terms], 1)
+            for sketch in (self._sketch(bank, month), self._sketch(bank, ALL), self._sketch(ALL, ALL)):
+                for term in terms:
+                    sketch.add(term)
+
+        logger.info(f"Keyword statistics: counted {len(new_rows)} new reviews ({self.total_docs} documents in total).")
+        return len(new_rows)
+
+    def idf(self, terms: list) -> np.ndarray:
+        """Smoothed IDF, ln((1 + n) / (1 + df)) + 1, from the hashed document frequencies."""
+        doc_freq = self.doc_freq[[self._feature_index(term) for term in terms]]
+        return np.log((1 + self.total_docs) / (1 + doc_freq)) + 1
+
+    def top_terms(self, bank: str = ALL, month: str = ALL, n: int = 10) -> pd.DataFrame:
+        """
+        Top `n` n-grams of a bank and month (ALL for every bank / month), by guaranteed
+        document count x IDF. The true count lies in [doc_count, doc_count + max_overestimate].
+        """
+        sketch = self.sketches.get(f"{bank}|{month}")
+        columns = ['term', 'doc_count', 'max_overestimate', 'idf', 'score']
+        if sketch is None or not sketch.counts:
+            return pd.DataFrame(columns=columns)
+
+        top = pd.DataFrame(sketch.top(self.top_k), columns=columns[:3])
+        top['idf'] = self.idf(top['term'].tolist())
+        top['score'] = top['doc_count'] * top['idf']
+        return top.sort_values(['score', 'term'], ascending=[False, True]).head(n).reset_index(drop=True)
+
+    def emerging_terms(self, bank: str, month: str, n: int = 10) -> pd.DataFrame:
+        """
+        N-grams whose share of a bank's reviews grew most from the previous month to
+        `month` (format YYYY-MM), e.g. a newly reported failure. The current share uses
+        the guaranteed count and the previous share the upper bound, so evictions can
+        only hide growth, never invent it.
+        """
+        previous_month = (pd.Period(month, freq='M') - 1).strftime('%Y-%m')
+        current = self.sketches.get(f"{bank}|{month}")
+        previous = self.sketches.get(f"{bank}|{previous_month}")
+        if current is None:
+            return pd.DataFrame(columns=['term', 'share', 'previous_share', 'growth'])
+
+        # Counts always sum to the number of (document, term) pairs added, evictions or not
+        current_total = max(sum(current.counts.values()), 1)
+        previous_total = max(sum(previous.counts.values()), 1) if previous else 1
+        emerging = pd.DataFrame([
+            {
+                'term': term,
+                'share': current.guaranteed(term) / current_total,
+                'previous_share': (previous.upper_bound(term) if previous else 0) / previous_total,
+            }
+            for term in current.counts
+        ])
+        emerging['growth'] = emerging['share'] - emerging['previous_share']
+        return emerging.sort_values(['growth', 'term'], ascending=[False, True]).head(n).reset_index(drop=True)
+
+    def save(self, dirpath: str):
+        os.makedirs(dirpath, exist_ok=True)
+        state = {
+            'num_features': self.num_features,
+            'top_k': self.top_k,
+            'ngram_range': list(self.ngram_range),
+            'capacity': self.capacity,
+            'total_docs': self.total_docs,
+            'sketches': {key: sketch.to_dict() for key, sketch in self.sketches.items()},
+        }
+        # Write to a temporary file first so an interrupted save keeps the previous state;
+        # a file object stops numpy from appending its own '.npz' to the name
+        state_filepath = os.path.join(dirpath, self.STATE_FILENAME)
+        with open(state_filepath + '.tmp', 'wb') as f:
+            np.savez_compressed(f, doc_freq=self.doc_freq, seen_hashes=self.seen_hashes, state=np.array(json.dumps(state)))
+        os.replace(state_filepath + '.tmp', state_filepath)
+
+    @classmethod
+    def load(cls, dirpath: str, **defaults) -> 'KeywordStatistics':
+        """
+        Loads saved statistics, or returns empty ones built with `defaults` if none exist.
+        Statistics saved by earlier versions (keyword_stats.json with .npy files, whose
+        counters held only top_k items) are ignored, so the next update recounts everything.
+        """
+        state_filepath = os.path.join(dirpath, cls.STATE_FILENAME)
+        if not os.path.exists(state_filepath):
+            return cls(**defaults)
+
+        with np.load(state_filepath, allow_pickle=False) as saved:
+            state = json.loads(str(saved['state']))
+            doc_freq, seen_hashes = saved['doc_freq'], saved['seen_hashes']
+        stats = cls(state['num_features'], state['top_k'], state['ngram_range'], state['capacity'])
+        stats.total_docs = state['total_docs']
+        stats.doc_freq = doc_freq
+        stats.seen_hashes = seen_hashes
+        stats.sketches = {
+            key: SpaceSaving(stats.capacity, sketch['counts'], sketch['errors'])
+            for key, sketch in state['sketches'].items()
+        }
+        return stats
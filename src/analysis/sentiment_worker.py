@@ -0,0 +1,371 @@
+"""
+Warm Sentiment Inference Worker
+10 Academy Week 2 Challenge - Task 2: Sentiment and Thematic Analysis
+
+A long-running local process that loads the sentiment model once and serves
+scoring requests over an authenticated localhost socket
+(multiprocessing.connection). Requests that arrive within a short window are
+merged into shared length-bucketed batches, so several notebooks or pipeline runs
+scoring at the same time share the model's batches instead of queueing one by one.
+
+multiprocessing.connection unpickles every message, so both sides must prove that
+they hold a shared secret before anything is exchanged. The secret comes from the
+SENTIMENT_WORKER_AUTHKEY environment variable or from a key file only its owner can
+read; there is no default, and without a secret the worker does not start and
+Task 2 does not connect.
+
+Create the key once:    python src/analysis/sentiment_worker.py --create-key
+Start the worker:       python src/analysis/sentiment_worker.py
+Print its metrics:      python src/analysis/sentiment_worker.py --metrics
+
+Task 2 (`run_sentiment_analysis`) uses the worker automatically when it is running.
+"""
+
+import os
+import sys
+import stat
+import time
+import queue
+import socket
+import struct
+import secrets
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing.connection import Listener, Connection, AuthenticationError, answer_challenge, deliver_challenge
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# --- Configuration ---
+WORKER_ADDRESS = ('127.0.0.1', int(os.environ.get('SENTIMENT_WORKER_PORT', 6010)))
+# Shared secret: the SENTIMENT_WORKER_AUTHKEY environment variable, or else this file
+# (created by --create-key, readable by its owner only)
+WORKER_AUTHKEY_FILEPATH = os.environ.get(
+    'SENTIMENT_WORKER_AUTHKEY_FILE', os.path.join(PROJECT_ROOT, 'data', 'cache', 'sentiment_worker.key')
+)
+
+# Seconds allowed for connecting plus the authentication handshake, and for each reply
+CONNECT_TIMEOUT_SECONDS = 5
+REQUEST_TIMEOUT_SECONDS = 300
+
+# Cross-request batching: wait at most this long for more requests once one arrives,
+# and stop collecting when the merged batch holds this many texts
+BATCH_WAIT_SECONDS = 0.05
+MAX_MERGED_TEXTS = 1024
+
+# Clients send large jobs in chunks so concurrent requests can be interleaved
+CLIENT_CHUNK_SIZE = 512
+LATENCY_WINDOW = 1000
+
+
+def create_authkey(filepath: str = None) -> str:
+    """Writes a new random key file readable by its owner only (mode 0600). Never overwrites one."""
+    filepath = filepath or WORKER_AUTHKEY_FILEPATH
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(secrets.token_hex(32))
+    return filepath
+
+def load_authkey(filepath: str = None) -> bytes:
+    """
+    Returns the shared secret from SENTIMENT_WORKER_AUTHKEY, or else from the key file
+    (WORKER_AUTHKEY_FILEPATH unless `filepath` is given). Raises FileNotFoundError when
+    there is neither, and PermissionError when the key file can be read by other users.
+    """
+    filepath = filepath or WORKER_AUTHKEY_FILEPATH
+    authkey = os.environ.get('SENTIMENT_WORKER_AUTHKEY')
+    if authkey:
+        return authkey.encode('utf-8')
+    
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(
+            f"No sentiment worker key: set SENTIMENT_WORKER_AUTHKEY or run "
+            f"'python src/analysis/sentiment_worker.py --create-key' to create {filepath}."
+        )
+    # Windows has no POSIX permission bits to check
+    if os.name != 'nt' and stat.S_IMODE(os.stat(filepath).st_mode) & 0o077:
+        raise PermissionError(f"{filepath} is readable by other users; restrict it with 'chmod 600 {filepath}'.")
+    with open(filepath, 'r', encoding='utf-8') as f:
+        authkey = f.read().strip()
+    if not authkey:
+        raise FileNotFoundError(f"{filepath} is empty.")
+    return authkey.encode('utf-8')
+
+def _set_socket_timeout(conn: Connection, seconds: float):
+    """Bounds every blocking send and receive on the socket behind `conn`."""
+    # A temporary socket object over the same descriptor, detached again so it is not closed
+    sock = socket.socket(fileno=conn.fileno())
+    try:
+        if os.name == 'nt':
+            value = int(seconds * 1000)
+        else:
+            value = struct.pack('ll', int(seconds), int(seconds % 1 * 1_000_000))
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVTIMEO, value)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO, value)
+    finally:
+        sock.detach()
+
+class WorkerMetrics:
+    """Thread-safe request, batch, latency and throughput counters."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.requests = 0
+        self.texts = 0
+        self.batches = 0
+        self.inference_seconds = 0.0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def record_batch(self, n_requests: int, n_texts: int, seconds: float, latencies: list):
+        with self.lock:
+            self.requests += n_requests
+            self.texts += n_texts
+            self.batches += 1
+            self.inference_seconds += seconds
+            self.latencies.extend(latencies)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            latencies = sorted(self.latencies)
+            percentile = lambda q: round(latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000, 1) if latencies else None
+            return {
+                'uptime_seconds': round(time.monotonic() - self.started, 1),
+                'requests': self.requests,
+                'texts': self.texts,
+                'merged_batches': self.batches,
+                'avg_requests_per_batch': round(self.requests / self.batches, 2) if self.batches else None,
+                'avg_texts_per_batch': round(self.texts / self.batches, 1) if self.batches else None,
+                'texts_per_inference_second': round(self.texts / self.inference_seconds, 1) if self.inference_seconds else None,
+                'latency_p50_ms': percentile(0.50),
+                'latency_p95_ms': percentile(0.95),
+            }
+
+class _ScoreRequest:
+    def __init__(self, texts: list):
+        self.texts = texts
+        self.received = time.monotonic()
+        self.future = Future()
+
+class SentimentWorker:
+    """Serves (label, score) requests from one warm sentiment pipeline."""
+
+    def __init__(self, score_fn, model_key: str, address: tuple = WORKER_ADDRESS, authkey: bytes = None):
+        self.score_fn = score_fn
+        self.model_key = model_key
+        self.address = address
+        self.authkey = authkey or load_authkey()
+        self.requests = queue.Queue()
+        self.metrics = WorkerMetrics()
+        self.stopped = threading.Event()
+
+    def _collect_batch(self) -> list:
+        """Blocks for one request, then merges whatever else arrives within the batching window."""
+        pending = [self.requests.get()]
+        n_texts = len(pending[0].texts)
+        deadline = time.monotonic() + BATCH_WAIT_SECONDS
+        while n_texts < MAX_MERGED_TEXTS:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self.requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending.append(request)
+            n_texts += len(request.texts)
+        return pending
+
+    def _batch_loop(self):
+        while not self.stopped.is_set():
+            pending = self._collect_batch()
+            texts = [text for request in pending for text in request.texts]
+
+            started = time.monotonic()
+            try:
+                results = self.score_fn(texts)
+            except Exception as e:
+                logger.error(f"Scoring a merged batch of {len(texts)} texts failed: {e}")
+                for request in pending:
+                    request.future.set_exception(e)
+                continue
+            finished = time.monotonic()
+
+            offset = 0
+            for request in pending:
+                request.future.set_result(results[offset:offset + len(request.texts)])
+                offset += len(request.texts)
+            self.metrics.record_batch(len(pending), len(texts), finished - started,
+                                      [finished - request.received for request in pending])
+
+    def _serve_connection(self, conn):
+        """Authenticates one client, then answers its messages until it disconnects."""
+        with conn:
+            # The handshake runs here rather than in accept(), so a client that stalls 
+            # cannot block new connections; nothing is unpickled before it succeeds
+            _set_socket_timeout(conn, CONNECT_TIMEOUT_SECONDS)
+            try:
+                deliver_challenge(conn, self.authkey)
+                answer_challenge(conn, self.authkey)
+            except (AuthenticationError, EOFError, OSError) as e:
+                logger.warning(f"Rejected a connection: {e}")
+                return
+            _set_socket_timeout(conn, 0)
+            
+            while True:
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    return
+                op = message.get('op')
+                if op == 'score':
+                    request = _ScoreRequest(message['texts'])
+                    self.requests.put(request)
+                    try:
+                        conn.send({'ok': True, 'results': request.future.result()})
+                    except Exception as e:
+                        conn.send({'ok': False, 'error': str(e)})
+                elif op == 'model_key':
+                    conn.send({'ok': True, 'model_key': self.model_key})
+                elif op == 'metrics':
+                    conn.send({'ok': True, 'metrics': self.metrics.snapshot()})
+                else:
+                    conn.send({'ok': False, 'error': f"Unknown operation: {op}"})
+
+    def serve_forever(self):
+        threading.Thread(target=self._batch_loop, name='sentiment-batcher', daemon=True).start()
+        # No authkey here: each connection thread authenticates its own client
+        with Listener(self.address) as listener:
+            logger.info(f"🚀 Sentiment worker ({self.model_key}) listening on {self.address[0]}:{self.address[1]}")
+            try:
+                while True:
+                    try:
+                        conn = listener.accept()
+                    except OSError as e:
+                        logger.warning(f"Failed to accept a connection: {e}")
+                        continue
+                    threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+            finally:
+                self.stopped.set()
+                logger.info(f"Sentiment worker stopped. Metrics: {self.metrics.snapshot()}")
+
+class SentimentWorkerClient:
+    """
+    Client of a running SentimentWorker. Connecting and authenticating must finish 
+    within CONNECT_TIMEOUT_SECONDS and every reply must arrive within 
+    REQUEST_TIMEOUT_SECONDS, so a silent listener on the port cannot hang the caller.
+    """
+
+    def __init__(self, address: tuple = WORKER_ADDRESS, authkey: bytes = None):
+        authkey = authkey or load_authkey()
+        sock = socket.create_connection(address, timeout=CONNECT_TIMEOUT_SECONDS)
+        # Connection needs a blocking socket; timeouts are set on the socket itself
+        sock.setblocking(True)
+        self.conn = Connection(sock.detach())
+        try:
+            _set_socket_timeout(self.conn, CONNECT_TIMEOUT_SECONDS)
+            # Mutual authentication, as multiprocessing.connection.Client does it
+            answer_challenge(self.conn, authkey)
+            deliver_challenge(self.conn, authkey)
+            _set_socket_timeout(self.conn, REQUEST_TIMEOUT_SECONDS)
+        except BlockingIOError:
+            # The socket timeout expired while waiting for the listener
+            self.conn.close()
+            raise TimeoutError(f"no authentication handshake within {CONNECT_TIMEOUT_SECONDS} seconds")
+        except BaseException:
+            self.conn.close()
+            raise
+
+    def _call(self, message: dict) -> dict:
+        self.conn.send(message)
+        if not self.conn.poll(REQUEST_TIMEOUT_SECONDS):
+            raise TimeoutError(f"Sentiment worker did not reply within {REQUEST_TIMEOUT_SECONDS} seconds.")
+        reply = self.conn.recv()
+        if not reply['ok']:
+            raise RuntimeError(f"Sentiment worker error: {reply['error']}")
+        return reply
+
+    def model_key(self) -> str:
+        return self._call({'op': 'model_key'})['model_key']
+
+    def metrics(self) -> dict:
+        return self._call({'op': 'metrics'})['metrics']
+
+    def score(self, texts: list) -> list:
+        """Returns one (label, score) per text, sending the texts in chunks."""
+        results = []
+        for i in range(0, len(texts), CLIENT_CHUNK_SIZE):
+            results.extend(self._call({'op': 'score', 'texts': list(texts[i:i + CLIENT_CHUNK_SIZE])})['results'])
+        return results
+
+    def close(self):
+        self.conn.close()
+
+def connect_to_worker(address: tuple = WORKER_ADDRESS, authkey: bytes = None):
+    """
+    Returns a client of the running worker, or None when there is no worker key, no 
+    worker listening, or the listener fails to authenticate or answer in time.
+    """
+    try:
+        authkey = authkey or load_authkey()
+    except OSError as e:
+        logger.debug(f"Not using a sentiment worker: {e}")
+        return None
+    
+    try:
+        return SentimentWorkerClient(address, authkey)
+    except ConnectionRefusedError:
+        return None
+    except (AuthenticationError, EOFError, OSError) as e:
+        # Includes timeouts: whatever listens on the port is not a usable worker
+        logger.warning(f"Could not connect to the sentiment worker on {address[0]}:{address[1]} ({e!r}).")
+        return None
+
+def main():
+    """Loads the sentiment model once (Task 2 settings) and serves requests until interrupted."""
+    try:
+        authkey = load_authkey()
+    except OSError as e:
+        logger.error(f"Refusing to start the sentiment worker: {e}")
+        return False
+    
+    if PROJECT_ROOT not in sys.path:
+        sys.path.insert(0, PROJECT_ROOT)
+    # Imported here so clients never pay for importing Task 2 and its NLP libraries
+    from src.analysis import task_2_nlp_analysis as task_2
+
+    sentiment_pipeline = task_2.load_sentiment_pipeline()
+
+    def score_fn(texts: list) -> list:
+        outputs = task_2.run_batched_inference(sentiment_pipeline, texts)
+        return [(output['label'], output['score']) for output in outputs]
+
+    worker = SentimentWorker(score_fn, task_2.sentiment_model_key(sentiment_pipeline), authkey=authkey)
+    try:
+        worker.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return True
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if '--create-key' in sys.argv:
+        try:
+            logger.info(f"🔑 Created sentiment worker key {create_authkey()}")
+        except FileExistsError:
+            logger.error(f"{WORKER_AUTHKEY_FILEPATH} already exists; delete it first to replace the key.")
+            sys.exit(1)
+    elif '--metrics' in sys.argv:
+        client = connect_to_worker()
+        if client is None:
+            logger.error(f"No sentiment worker is listening on {WORKER_ADDRESS[0]}:{WORKER_ADDRESS[1]}.")
+        else:
+            logger.info(f"Sentiment worker metrics: {client.metrics()}")
+            client.close()
+    else:
+        sys.exit(0 if main() else 1)
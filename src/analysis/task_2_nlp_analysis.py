@@ -0,0 +1,868 @@
+"""
+Task 2: Sentiment and Thematic Analysis Pipeline
+
+This script loads the balanced and cleaned review data from Task 1,
+applies pre-trained Hugging Face DistilBERT for sentiment analysis,
+and extracts themes using a rule-based keyword approach.
+
+
+It aggregates the final results and saves an enriched CSV for reporting.
+"""
+
+import pandas as pd
+import logging
+import os
+import sys
+import re
+import time
+import hashlib
+import sqlite3
+import numpy as np
+from tqdm import tqdm
+import nltk
+from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+# We will use the 'emoji' library for conversion.
+# Ensure 'pip install emoji' is run if you use this code outside the current environment.
+try:
+    import emoji
+except ImportError:
+    # If the library is not available, we define a fallback function
+    def emojize(text, language='en', delimiters=(':', ':'), variant=None):
+        return text
+    logging.warning("The 'emoji' library is not installed. Emoji conversion will be skipped.")
+
+
+# --- Configuration ---
+# Safely determine the project root, accounting for environments where __file__ is not defined (like notebooks).
+try:
+    SCRIPT_PATH = os.path.abspath(__file__)
+    # Navigate three levels up from the script location (src/analysis/task_2_nlp_analysis.py -> PROJECT_ROOT)
+    PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(SCRIPT_PATH)))
+except NameError:
+    # Fallback for environments where __file__ is not defined (like notebooks).
+    # Assumes the execution is happening one directory level below the project root (e.g., inside 'notebooks').
+    PROJECT_ROOT = os.path.dirname(os.getcwd()) 
+    logging.warning(
+        "Could not determine script location via '__file__'. Assuming project root is one level up from "
+        f"current working directory: {PROJECT_ROOT}"
+    )
+
+DATA_PROCESSED_PATH = os.path.join(PROJECT_ROOT, 'data', 'processed')
+DATA_CACHE_PATH = os.path.join(PROJECT_ROOT, 'data', 'cache')
+
+# Make the shared 'src.common' helpers importable when run as a script
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+from src.common.review_format import read_reviews, write_reviews
+from src.analysis.insights_rollup import InsightsRollup
+from src.analysis.keyword_stats import KeywordStatistics
+from src.analysis.sentiment_worker import connect_to_worker
+
+INPUT_FILENAME = "final_bank_reviews_constrained.csv"
+OUTPUT_FILENAME = "reviews_with_sentiment_themes.csv"
+AGGREGATED_FILENAME = "aggregated_bank_insights.csv"
+
+# --- Sentiment Model and Batched Inference Settings ---
+SENTIMENT_MODEL_NAME = "distilbert-base-uncased-finetuned-sst-2-english"
+# Reviews are sorted by token length and packed into dynamic batches whose padded size
+# (batch size x longest review) stays within the token budget; longer reviews are truncated.
+BATCHED_INFERENCE = True
+MAX_SEQUENCE_LENGTH = 256
+BATCH_TOKEN_BUDGET = 8192
+MAX_BATCH_SIZE = 64
+
+# --- CPU Inference Backend ---
+# 'pytorch'      : full-precision (fp32) model, as downloaded from the Hugging Face Hub
+# 'pytorch-int8' : the same model with its Linear layers dynamically quantized to int8
+# 'onnx'         : graph-optimized ONNX Runtime export (needs 'optimum[onnxruntime]'),
+#                  read from SENTIMENT_ONNX_MODEL_PATH and exported there on first use
+SENTIMENT_BACKEND = 'pytorch'
+SENTIMENT_ONNX_MODEL_PATH = os.path.join(PROJECT_ROOT, 'models', 'distilbert-sst2-onnx')
+# Intra-op threads for PyTorch / ONNX Runtime (None keeps the library default)
+SENTIMENT_NUM_THREADS = None
+SENTIMENT_BACKENDS = ('pytorch', 'pytorch-int8', 'onnx')
+
+# Score through the warm sentiment worker (src/analysis/sentiment_worker.py) when one is
+# running, instead of loading the model in this process
+SENTIMENT_WORKER_ENABLED = True
+
+# Tokens of the shared normalization stage (scikit-learn's default word pattern)
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+# Persistent sentiment cache keyed by (model name/version, hash of the preprocessed text)
+SENTIMENT_CACHE_ENABLED = True
+SENTIMENT_CACHE_FILEPATH = os.path.join(DATA_CACHE_PATH, 'sentiment_cache.sqlite')
+# Entries of every model (DistilBERT backends, VADER fallback) are kept side by side;
+# set to True to drop all entries of other models whenever the cache is opened
+SENTIMENT_CACHE_PRUNE_OTHER_MODELS = False
+
+# Incremental (bank, rating) rollup behind the aggregated insights: each run only merges
+# reviews it has not counted before. Disable to rebuild the aggregate from scratch.
+INSIGHTS_ROLLUP_ENABLED = True
+INSIGHTS_ROLLUP_FILEPATH = os.path.join(DATA_PROCESSED_PATH, 'insights_rollup.sqlite')
+
+# Streaming keyword statistics (hashed 1-3-gram document frequencies, top-k n-grams per
+# bank and month), updated with the tokens of new reviews instead of refitting TF-IDF
+KEYWORD_STATS_PATH = os.path.join(DATA_PROCESSED_PATH, 'keyword_stats')
+KEYWORD_STATS_NUM_FEATURES = 2 ** 20
+KEYWORD_STATS_TOP_K = 200
+# Counters kept per sketch; well above the distinct n-grams of a bank's month, so monthly
+# counts stay exact and only the all-time sketches ever evict
+KEYWORD_STATS_CAPACITY = 50_000
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+# Enable progress bar for pandas apply/iteration
+tqdm.pandas()
+
+# --- Thematic Keyword Definitions (Rule-Based Clustering) ---
+# These keywords and phrases are mapped to the 5 requested overarching themes.
+THEME_MAPPING = {
+    # 1. Account Access Issues
+    'Account Access Issues': [
+        'login error', 'cannot log', 'forgot password', 'pin', 'username', 
+        'fingerprint', 'face id', 'access problem', 'locked out', 'security code', 
+        'authentication', 'registration', 'session'
+    ],
+    # 2. Transaction Performance
+    'Transaction Performance': [
+        'slow', 'transfer fail', 'transaction fail', 'delay', 'stuck', 
+        'pending', 'not delivered', 'speed', 'instantly', 'fast', 
+        'loading', 'crash', 'bugs', 'down', 'lag'
+    ],
+    # 3. User Interface & Experience
+    'User Interface & Experience': [
+        'ui', 'user interface', 'design', 'layout', 'simple', 'confusing', 
+        'easy to use', 'navigation', 'experience', 'complex', 'smooth', 
+        'modern look', 'friendly', 'thumbs up', 'star' # Added 'thumbs up' and 'star'
+    ],
+    # 4. Customer Support
+    'Customer Support': [
+        'customer service', 'support team', 'call center', 'help desk', 
+        'response', 'contact', 'reach out', 'fix', 'problem solved', 'unresponsive'
+    ],
+    # 5. Feature Requests & General
+    'Feature Requests & General': [
+        'wishlist', 'new feature', 'budgeting', 'saving goal', 'update', 
+        'card management', 'virtual card', 'future', 'add', 'please include', 'thank you', 'love it' # Added general positive/request terms
+    ]
+}
+
+def load_data(filepath: str) -> pd.DataFrame:
+    """Loads the final constrained review data (typed Parquet handoff, or its CSV fallback)."""
+    try:
+        df = read_reviews(filepath)
+        df.reset_index(names=['review_id_generated'], inplace=True)
+        logger.info(f"Loaded {len(df)} constrained reviews for NLP analysis.")
+        return df
+    except FileNotFoundError:
+        logger.error(f"Input file not found: {filepath}. Run Task 1 preprocessing first.")
+        return pd.DataFrame()
+    except Exception as e:
+        logger.error(f"Error loading data: {e}")
+        return pd.DataFrame()
+        
+def convert_emojis(text: str) -> str:
+    """Converts emojis in the text to their textual descriptions."""
+    if 'emoji' in sys.modules:
+        # Replace emojis with their standard CLDR shortcodes (e.g., 👍 becomes :thumbs_up:)
+        text_with_shortcodes = emoji.demojize(text, delimiters=(" :", ": "))
+        # Replace shortcodes with plain text (e.g., :thumbs_up: becomes thumbs_up)
+        return text_with_shortcodes.replace(" :", " ").replace(": ", " ").replace(":", "")
+    return text
+
+def normalize_reviews(df: pd.DataFrame, text_col: str = 'review') -> pd.DataFrame:
+    """
+    Shared normalization stage, run once per distinct review text. Adds:
+    - review_preprocessed : emoji-expanded text, original casing and punctuation
+                            (input of the sentiment models; VADER relies on both)
+    - review_normalized   : review_preprocessed lowercased (input of theme matching)
+    - review_tokens       : space-joined word tokens of review_normalized (input of 
+                            the keyword statistics and the Task 4 word cloud)
+    """
+    codes, unique_texts = pd.factorize(df[text_col])
+    unique_texts = pd.Series(unique_texts, dtype=object)
+    
+    preprocessed = unique_texts.progress_apply(convert_emojis)
+    normalized = preprocessed.str.lower()
+    tokens = normalized.str.findall(TOKEN_PATTERN).str.join(' ')
+    
+    # Missing texts have code -1, which take() with allow_fill maps back to NaN
+    for col, values in (('review_preprocessed', preprocessed), ('review_normalized', normalized), ('review_tokens', tokens)):
+        df[col] = pd.api.extensions.take(values.to_numpy(dtype=object), codes, allow_fill=True) if len(values) else np.nan
+    logger.info(f"Text normalization complete ({len(unique_texts)} distinct texts for {len(df)} reviews).")
+    return df
+
+class SentimentCache:
+    """
+    SQLite-backed store of (sentiment_label, sentiment_score) per preprocessed text, 
+    scoped to one model version.
+    
+    Entries are keyed by (model_key, text_hash), so results of a different model (or 
+    model version) are never reused, and switching models (e.g. to the VADER 
+    fallback or another backend) leaves the other models' entries in place. 
+    `prune_other_models` removes them explicitly.
+    """
+    
+    # Stay well below SQLite's limit on bound parameters per statement
+    QUERY_BATCH_SIZE = 500
+    
+    def __init__(self, model_key: str, filepath: str = SENTIMENT_CACHE_FILEPATH, prune: bool = False):
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        self.model_key = model_key
+        self.conn = sqlite3.connect(filepath)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sentiment_cache ("
+            "model_key TEXT NOT NULL, text_hash TEXT NOT NULL, "
+            "sentiment_label TEXT NOT NULL, sentiment_score REAL NOT NULL, "
+            "PRIMARY KEY (model_key, text_hash))"
+        )
+        self.conn.commit()
+        if prune:
+            self.prune_other_models()
+    
+    def prune_other_models(self) -> int:
+        """Deletes the entries of every other model key. Returns how many were deleted."""
+        deleted = self.conn.execute("DELETE FROM sentiment_cache WHERE model_key != ?", (self.model_key,)).rowcount
+        self.conn.commit()
+        if deleted:
+            logger.info(f"Sentiment cache: pruned {deleted} entries of other models.")
+        return deleted
+    
+    @staticmethod
+    def text_key(text: str) -> str:
+        return hashlib.sha1(str(text).encode('utf-8')).hexdigest()
+    
+    def get_many(self, keys: list) -> dict:
+        """Returns {key: (label, score)} for the keys cached for this model."""
+        found = {}
+        for i in range(0, len(keys), self.QUERY_BATCH_SIZE):
+            batch = keys[i:i + self.QUERY_BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            rows = self.conn.execute(
+                "SELECT text_hash, sentiment_label, sentiment_score FROM sentiment_cache "
+                f"WHERE model_key = ? AND text_hash IN ({placeholders})", [self.model_key, *batch]
+            ).fetchall()
+            found.update((key, (label, score)) for key, label, score in rows)
+        return found
+    
+    def put_many(self, results: dict):
+        """Stores {key: (label, score)} for this model."""
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO sentiment_cache (model_key, text_hash, sentiment_label, sentiment_score) VALUES (?, ?, ?, ?)",
+            [(self.model_key, key, label, float(score)) for key, (label, score) in results.items()]
+        )
+        self.conn.commit()
+    
+    def close(self):
+        self.conn.close()
+
+def score_with_cache(texts: pd.Series, model_key: str, score_fn) -> list:
+    """
+    Returns one (label, score) per text. Unique texts already scored by `model_key` 
+    come from the cache; only new or changed texts are passed to `score_fn`, which 
+    takes a list of texts and returns a list of (label, score).
+    """
+    if not SENTIMENT_CACHE_ENABLED:
+        return score_fn(texts.tolist())
+    
+    keys = [SentimentCache.text_key(text) for text in texts]
+    texts_by_key = dict(zip(keys, texts))
+    
+    cache = SentimentCache(model_key, SENTIMENT_CACHE_FILEPATH, prune=SENTIMENT_CACHE_PRUNE_OTHER_MODELS)
+    try:
+        results_by_key = cache.get_many(list(texts_by_key))
+        missing_keys = [key for key in texts_by_key if key not in results_by_key]
+        logger.info(f"Sentiment cache ({model_key}): {len(texts_by_key) - len(missing_keys)} of "
+                    f"{len(texts_by_key)} unique texts cached, scoring {len(missing_keys)}.")
+        
+        if missing_keys:
+            new_results = dict(zip(missing_keys, score_fn([texts_by_key[key] for key in missing_keys])))
+            cache.put_many(new_results)
+            results_by_key.update(new_results)
+    finally:
+        cache.close()
+    
+    return [results_by_key[key] for key in keys]
+
+def fallback_vader_analysis(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Performs sentiment analysis using VADER (Valence Aware Dictionary and sEntiment Reasoner) 
+    as a robust fallback when the deep learning model (DistilBERT) fails to load.
+    """
+    logger.warning("Falling back to VADER sentiment analysis due to missing deep learning libraries.")
+    try:
+        # Attempt to download VADER lexicon data
+        nltk.download('vader_lexicon', quiet=True)
+    except Exception as e:
+        logger.error(f"Failed to download NLTK VADER lexicon: {e}. Check internet connection/NLTK setup.")
+        # We proceed anyway, VADER might still work if the lexicon is already present.
+
+    sia = SentimentIntensityAnalyzer()
+    
+    def get_vader_sentiment(text):
+        """Maps VADER compound score to POSITIVE, NEUTRAL, or NEGATIVE labels."""
+        if pd.isna(text) or not text.strip():
+            return 'NEUTRAL', 0.0
+            
+        score = sia.polarity_scores(text)['compound']
+        
+        # Standard VADER classification thresholds
+        if score >= 0.05:
+            return 'POSITIVE', score
+        elif score <= -0.05:
+            return 'NEGATIVE', score
+        else:
+            return 'NEUTRAL', score
+
+    # Apply VADER analysis on the preprocessed text (cached per lexicon/library version)
+    vader_results = score_with_cache(
+        df['review_preprocessed'],
+        model_key=f"vader@nltk-{nltk.__version__}",
+        score_fn=lambda texts: [get_vader_sentiment(text) for text in tqdm(texts, desc="Analyzing Sentiment (VADER)")]
+    )
+    
+    # Unpack the results into the required columns
+    df[['sentiment_label', 'sentiment_score']] = pd.DataFrame(vader_results, index=df.index)
+    
+    logger.info("Sentiment Analysis complete using VADER (Fallback).")
+    return df
+
+def build_length_batches(lengths, token_budget: int = BATCH_TOKEN_BUDGET, max_batch_size: int = MAX_BATCH_SIZE) -> list:
+    """
+    Groups review indices into batches of similar token length.
+    
+    Indices are visited in ascending length order and a batch is closed as soon as 
+    adding the next review would push its padded size (batch size x longest length) 
+    over `token_budget`, or the batch reaches `max_batch_size`.
+    """
+    batches = []
+    current_batch = []
+    for index in np.argsort(lengths, kind='stable'):
+        # Lengths are ascending, so the newcomer is the longest review of the batch
+        padded_size = (len(current_batch) + 1) * lengths[index]
+        if current_batch and (padded_size > token_budget or len(current_batch) >= max_batch_size):
+            batches.append(current_batch)
+            current_batch = []
+        current_batch.append(int(index))
+    if current_batch:
+        batches.append(current_batch)
+    return batches
+
+def run_batched_inference(sentiment_pipeline, texts: list, max_length: int = MAX_SEQUENCE_LENGTH,
+                          token_budget: int = BATCH_TOKEN_BUDGET, max_batch_size: int = MAX_BATCH_SIZE) -> list:
+    """
+    Scores `texts` with length-bucketed dynamic batches and returns the pipeline 
+    outputs in the original order.
+    
+    Sorting by token length keeps padding inside each batch minimal, and truncating 
+    to `max_length` bounds the cost of the occasional very long review.
+    """
+    tokenizer = sentiment_pipeline.tokenizer
+    encoded = tokenizer(texts, truncation=True, max_length=max_length)
+    lengths = np.array([len(input_ids) for input_ids in encoded['input_ids']])
+    batches = build_length_batches(lengths, token_budget, max_batch_size)
+    
+    results = [None] * len(texts)
+    for batch in tqdm(batches, desc="Analyzing Sentiment (batched)"):
+        outputs = sentiment_pipeline(
+            [texts[i] for i in batch],
+            batch_size=len(batch),
+            truncation=True,
+            max_length=max_length
+        )
+        for index, output in zip(batch, outputs):
+            results[index] = output
+    return results
+
+def _load_onnx_pipeline(num_threads: int = None):
+    """Loads the ONNX Runtime export of the model, exporting it on first use."""
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    import onnxruntime
+    from transformers import AutoTokenizer, pipeline
+    
+    session_options = onnxruntime.SessionOptions()
+    session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if num_threads:
+        session_options.intra_op_num_threads = num_threads
+    
+    if not os.path.isdir(SENTIMENT_ONNX_MODEL_PATH):
+        logger.info(f"Exporting {SENTIMENT_MODEL_NAME} to ONNX at {SENTIMENT_ONNX_MODEL_PATH}...")
+        ORTModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL_NAME, export=True).save_pretrained(SENTIMENT_ONNX_MODEL_PATH)
+        AutoTokenizer.from_pretrained(SENTIMENT_MODEL_NAME).save_pretrained(SENTIMENT_ONNX_MODEL_PATH)
+    
+    model = ORTModelForSequenceClassification.from_pretrained(SENTIMENT_ONNX_MODEL_PATH, session_options=session_options)
+    tokenizer = AutoTokenizer.from_pretrained(SENTIMENT_ONNX_MODEL_PATH)
+    return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+
+def _load_int8_pipeline():
+    """Loads the fp32 model and dynamically quantizes its Linear layers to int8."""
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+    
+    model = AutoModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL_NAME).eval()
+    quantized_model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    tokenizer = AutoTokenizer.from_pretrained(SENTIMENT_MODEL_NAME)
+    return pipeline("sentiment-analysis", model=quantized_model, tokenizer=tokenizer)
+
+def load_sentiment_pipeline(backend: str = None, num_threads: int = None):
+    """
+    Loads the Hugging Face sentiment-analysis pipeline on the selected CPU backend 
+    (SENTIMENT_BACKEND by default). Falls back to the fp32 model when the ONNX 
+    Runtime dependencies are not installed.
+    """
+    # Imported here so importing this module (e.g. to talk to the sentiment worker) 
+    # does not pay for loading transformers
+    from transformers import pipeline
+    
+    backend = backend or SENTIMENT_BACKEND
+    num_threads = num_threads or SENTIMENT_NUM_THREADS
+    if backend not in SENTIMENT_BACKENDS:
+        raise ValueError(f"Unknown sentiment backend '{backend}'. Choose from {SENTIMENT_BACKENDS}.")
+    
+    if num_threads:
+        import torch
+        torch.set_num_threads(num_threads)
+    
+    if backend == 'onnx':
+        try:
+            sentiment_pipeline = _load_onnx_pipeline(num_threads)
+        except ImportError as e:
+            logger.warning(f"ONNX backend unavailable ({e}); install 'optimum[onnxruntime]'. Using the fp32 model.")
+            backend, sentiment_pipeline = 'pytorch', pipeline("sentiment-analysis", model=SENTIMENT_MODEL_NAME)
+    elif backend == 'pytorch-int8':
+        sentiment_pipeline = _load_int8_pipeline()
+    else:
+        sentiment_pipeline = pipeline("sentiment-analysis", model=SENTIMENT_MODEL_NAME)
+    
+    # Remember which backend actually produced the pipeline (used in the cache key)
+    sentiment_pipeline.sentiment_backend = backend
+    logger.info(f"Sentiment model loaded on the '{backend}' backend (threads: {num_threads or 'default'}).")
+    return sentiment_pipeline
+
+def benchmark_sentiment_inference(texts: list) -> dict:
+    """
+    Compares throughput of the original one-call pipeline (no batch size, no 
+    truncation, input order) with length-bucketed batched inference on the same 
+    texts, and reports how often both produce the same label.
+    """
+    sentiment_pipeline = load_sentiment_pipeline()
+    
+    started = time.perf_counter()
+    baseline = sentiment_pipeline(texts)
+    baseline_seconds = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    batched = run_batched_inference(sentiment_pipeline, texts)
+    batched_seconds = time.perf_counter() - started
+    
+    agreement = np.mean([a['label'] == b['label'] for a, b in zip(baseline, batched)])
+    report = {
+        'reviews': len(texts),
+        'baseline_reviews_per_sec': round(len(texts) / baseline_seconds, 1),
+        'batched_reviews_per_sec': round(len(texts) / batched_seconds, 1),
+        'speedup': round(baseline_seconds / batched_seconds, 2),
+        'label_agreement': round(float(agreement), 4)
+    }
+    logger.info(f"Sentiment inference benchmark: {report}")
+    return report
+
+def compare_sentiment_backends(reference_filepath: str, backends: tuple = SENTIMENT_BACKENDS, 
+                               sample_size: int = 2000, num_threads: int = None) -> pd.DataFrame:
+    """
+    Accuracy-versus-speed report: scores a sample of the already enriched reviews 
+    with each backend and compares its labels and scores with the fp32 DistilBERT 
+    output stored in `reference_filepath` (reviews_with_sentiment_themes).
+    
+    Scores are compared as P(POSITIVE), since the stored score is the probability 
+    of whichever label was predicted.
+    """
+    reference = read_reviews(reference_filepath, columns=['review_preprocessed', 'sentiment_label', 'sentiment_score'])
+    reference = reference.dropna(subset=['review_preprocessed'])
+    if reference['sentiment_label'].astype(str).eq('NEUTRAL').any():
+        logger.warning("Reference file contains NEUTRAL labels (VADER fallback output); agreement will be understated.")
+    reference = reference.sample(n=min(sample_size, len(reference)), random_state=42)
+    
+    texts = reference['review_preprocessed'].astype(str).tolist()
+    reference_labels = reference['sentiment_label'].astype(str).to_numpy()
+    reference_positive = np.where(reference_labels == 'POSITIVE', reference['sentiment_score'], 1 - reference['sentiment_score'])
+    
+    rows = []
+    for backend in backends:
+        sentiment_pipeline = load_sentiment_pipeline(backend, num_threads)
+        started = time.perf_counter()
+        outputs = run_batched_inference(sentiment_pipeline, texts)
+        elapsed = time.perf_counter() - started
+        
+        labels = np.array([output['label'] for output in outputs])
+        scores = np.array([output['score'] for output in outputs])
+        positive = np.where(labels == 'POSITIVE', scores, 1 - scores)
+        score_diff = np.abs(positive - reference_positive)
+        rows.append({
+            'backend': sentiment_pipeline.sentiment_backend,
+            'reviews_per_sec': round(len(texts) / elapsed, 1),
+            'label_agreement': round(float(np.mean(labels == reference_labels)), 4),
+            'mean_abs_score_diff': round(float(score_diff.mean()), 4),
+            'max_abs_score_diff': round(float(score_diff.max()), 4)
+        })
+    
+    report = pd.DataFrame(rows)
+    baseline = report.loc[report['backend'] == 'pytorch', 'reviews_per_sec']
+    if not baseline.empty:
+        report['speedup_vs_fp32'] = (report['reviews_per_sec'] / baseline.iloc[0]).round(2)
+    logger.info(f"Sentiment backend report on {len(texts)} reviews:\n{report.to_string(index=False)}")
+    return report
+
+def sentiment_model_key(sentiment_pipeline) -> str:
+    """
+    Identifies the exact model behind a pipeline: model name, Hub commit (when 
+    known), transformers version and, for quantized or exported models, the 
+    backend, so cache entries follow model updates.
+    """
+    import transformers
+    commit_hash = getattr(sentiment_pipeline.model.config, '_commit_hash', None) or 'unknown-revision'
+    model_key = f"{SENTIMENT_MODEL_NAME}@{commit_hash}+transformers-{transformers.__version__}"
+    backend = getattr(sentiment_pipeline, 'sentiment_backend', 'pytorch')
+    return model_key if backend == 'pytorch' else f"{model_key}+{backend}"
+
+def score_with_worker(df: pd.DataFrame) -> bool:
+    """
+    Scores the preprocessed reviews through a running sentiment worker. Returns 
+    False (leaving `df` unchanged) when no worker is listening or it fails.
+    """
+    client = connect_to_worker()
+    if client is None:
+        return False
+    
+    try:
+        logger.info("Scoring sentiment through the running sentiment worker...")
+        results = score_with_cache(df['review_preprocessed'], client.model_key(), client.score)
+    except Exception as e:
+        logger.warning(f"Sentiment worker failed ({e}); loading the model locally instead.")
+        return False
+    finally:
+        client.close()
+    
+    df['sentiment_label'] = [label for label, _ in results]
+    df['sentiment_score'] = [score for _, score in results]
+    logger.info("Sentiment Analysis complete using the sentiment worker.")
+    return True
+
+def run_sentiment_analysis(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Applies the preferred DistilBERT model, through the warm sentiment worker when one 
+    is running. Falls back to VADER if the model cannot be loaded.
+    """
+    
+    # 1. Pre-process the reviews: Convert emojis to text (shared normalization stage)
+    if 'review_preprocessed' not in df.columns:
+        df = normalize_reviews(df)
+    
+    if SENTIMENT_WORKER_ENABLED and score_with_worker(df):
+        return df
+    
+    # Initialize the sentiment analysis pipeline
+    try:
+        logger.info("Attempting to load DistilBERT sentiment model...")
+        sentiment_pipeline = load_sentiment_pipeline()
+        
+        def score_texts(review_texts: list) -> list:
+            if BATCHED_INFERENCE:
+                # Length-bucketed dynamic batches, results restored to the original order
+                results = run_batched_inference(sentiment_pipeline, review_texts)
+            else:
+                # Use tqdm to show progress during the time-consuming analysis step
+                results = sentiment_pipeline(tqdm(review_texts, desc="Analyzing Sentiment (DistilBERT)"))
+            return [(res['label'], res['score']) for res in results]
+        
+        # Process the preprocessed reviews, scoring only texts not cached for this model
+        results = score_with_cache(df['review_preprocessed'], sentiment_model_key(sentiment_pipeline), score_texts)
+        
+        # Extract results
+        df['sentiment_label'] = [label for label, _ in results]
+        df['sentiment_score'] = [score for _, score in results]
+        
+        logger.info("Sentiment Analysis complete using DistilBERT.")
+        return df
+
+    except Exception as e:
+        # This catches errors when PyTorch/TensorFlow are missing, or internet issues
+        logger.error(f"Failed to load Hugging Face model. Error: {e}")
+        # 2. Fallback to VADER
+        return fallback_vader_analysis(df)
+        
+
+def assign_theme(review_text: str) -> str:
+    """
+    Assigns a primary theme to a review based on keyword matching (Rule-Based Clustering).
+    The theme with the most matched keywords wins.
+    """
+    if pd.isna(review_text):
+        return 'Unclassified'
+        
+    text_lower = review_text.lower()
+    
+    # Initialize score tracking for themes
+    theme_scores = {theme: 0 for theme in THEME_MAPPING.keys()}
+    
+    # Check for keyword matches
+    for theme, keywords in THEME_MAPPING.items():
+        for keyword in keywords:
+            # Use regex word boundary to match whole words/phrases accurately
+            if re.search(r'\b' + re.escape(keyword) + r'\b', text_lower):
+                theme_scores[theme] += 1
+                
+    # Determine the theme with the highest score
+    # Filter out themes with zero scores
+    positive_scores = {theme: score for theme, score in theme_scores.items() if score > 0}
+    
+    if positive_scores:
+        # Get theme(s) with the maximum score
+        max_score = max(positive_scores.values())
+        best_themes = [theme for theme, score in positive_scores.items() if score == max_score]
+        
+        # If multiple themes have the same max score, return the first one found, 
+        # or a composite label if you prefer, but sticking to one is simpler for initial analysis.
+        return best_themes[0]
+    else:
+        return 'General Feedback'
+
+class ThemeMatcher:
+    """
+    Precompiled single-pass version of `assign_theme`.
+    
+    All keywords of THEME_MAPPING are compiled into one alternation, wrapped in a 
+    lookahead so every start position of the text is tried once and overlapping 
+    hits are not consumed. At each position the longest keyword wins; the shorter 
+    keywords it starts with (e.g. 'user' inside 'user interface', should one be 
+    added) are credited through a precomputed prefix table. Each theme then scores 
+    one point per distinct keyword found, exactly as `assign_theme` does.
+    """
+    
+    def __init__(self, theme_mapping: dict = THEME_MAPPING):
+        self.themes = list(theme_mapping)
+        self.keyword_themes = {}
+        for theme, keywords in theme_mapping.items():
+            for keyword in keywords:
+                self.keyword_themes.setdefault(keyword, []).append(theme)
+        
+        # Longest first, so at a shared start position the longer phrase is the one captured
+        keywords = sorted(self.keyword_themes, key=len, reverse=True)
+        self.pattern = re.compile(r'(?=\b(' + '|'.join(re.escape(k) for k in keywords) + r')\b)')
+        
+        # keyword -> itself plus every shorter keyword that also matches at its start
+        self.implied_keywords = {
+            keyword: [keyword] + [
+                other for other in keywords
+                if len(other) < len(keyword) and keyword.startswith(other)
+                and re.match(r'\b' + re.escape(other) + r'\b', keyword)
+            ]
+            for keyword in keywords
+        }
+    
+    def matched_keywords(self, review_text: str) -> set:
+        """Distinct keywords found in the (lowercased) text in one scan."""
+        return {
+            implied
+            for keyword in self.pattern.findall(review_text.lower())
+            for implied in self.implied_keywords[keyword]
+        }
+    
+    def theme_scores(self, review_text: str) -> dict:
+        """Per-theme hit counts, in THEME_MAPPING order."""
+        scores = dict.fromkeys(self.themes, 0)
+        for keyword in self.matched_keywords(review_text):
+            for theme in self.keyword_themes[keyword]:
+                scores[theme] += 1
+        return scores
+    
+    def assign(self, review_text: str) -> str:
+        """Drop-in replacement for `assign_theme`: the first theme with the highest count wins."""
+        if pd.isna(review_text):
+            return 'Unclassified'
+        scores = self.theme_scores(review_text)
+        best_theme = max(scores, key=scores.get)  # max() keeps the first of tied themes
+        return best_theme if scores[best_theme] > 0 else 'General Feedback'
+    
+    def theme_hit_counts(self, texts: pd.Series, lowercased: bool = False) -> pd.DataFrame:
+        """
+        Per-theme hit counts for a whole column (one row per text, one column per theme).
+        Pass `lowercased=True` for already normalized text (review_normalized).
+        """
+        valid_texts = texts.dropna().astype(str)
+        if not lowercased:
+            valid_texts = valid_texts.str.lower()
+        hits = valid_texts.str.findall(self.pattern).explode().dropna()
+        hits = hits.map(self.implied_keywords).explode()
+        
+        # Count every keyword once per review, then credit each of its themes
+        pairs = pd.DataFrame({'row': hits.index, 'keyword': hits.values}).drop_duplicates()
+        pairs['theme'] = pairs['keyword'].map(self.keyword_themes)
+        pairs = pairs.explode('theme')
+        counts = pairs.groupby(['row', 'theme']).size().unstack(fill_value=0)
+        return counts.reindex(index=texts.index, columns=self.themes, fill_value=0)
+    
+    def assign_themes(self, texts: pd.Series, lowercased: bool = False) -> pd.Series:
+        """Vectorized `assign` over a column, with the same tie-break and fallbacks."""
+        counts = self.theme_hit_counts(texts, lowercased)
+        themes = counts.idxmax(axis=1)  # idxmax keeps the first of tied columns (THEME_MAPPING order)
+        themes[counts.max(axis=1) == 0] = 'General Feedback'
+        themes[texts.isna()] = 'Unclassified'
+        return themes
+
+THEME_MATCHER = ThemeMatcher(THEME_MAPPING)
+
+def benchmark_theme_matching(texts: pd.Series) -> dict:
+    """
+    Compares `assign_theme` (one regex search per keyword) with the precompiled 
+    matcher, per row and vectorized, and checks that all three agree.
+    """
+    timings = {}
+    started = time.perf_counter()
+    baseline = texts.apply(assign_theme)
+    timings['baseline_seconds'] = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    per_row = texts.apply(THEME_MATCHER.assign)
+    timings['matcher_seconds'] = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    vectorized = THEME_MATCHER.assign_themes(texts)
+    timings['vectorized_seconds'] = time.perf_counter() - started
+    
+    report = {
+        'reviews': len(texts),
+        **{name: round(seconds, 3) for name, seconds in timings.items()},
+        'speedup': round(timings['baseline_seconds'] / timings['vectorized_seconds'], 2),
+        'identical': bool((baseline == per_row).all() and (baseline == vectorized).all())
+    }
+    logger.info(f"Theme matching benchmark: {report}")
+    return report
+
+def run_thematic_analysis(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Applies the rule-based theme assignment to all reviews, using the normalized text
+    and tokens of the shared normalization stage.
+    """
+    logger.info("Starting Rule-Based Thematic Analysis on preprocessed text...")
+    
+    # Use the shared 'review_normalized' column (emojis as text, already lowercased) with the
+    # precompiled single-pass matcher, applied to the whole column at once
+    df['identified_theme'] = THEME_MATCHER.assign_themes(df['review_normalized'], lowercased=True)
+    
+    # Optional: Display top N-grams to verify theme keywords (statistics persist across runs)
+    keyword_stats = KeywordStatistics.load(
+        KEYWORD_STATS_PATH, num_features=KEYWORD_STATS_NUM_FEATURES, top_k=KEYWORD_STATS_TOP_K,
+        capacity=KEYWORD_STATS_CAPACITY
+    )
+    keyword_stats.update(df)
+    keyword_stats.save(KEYWORD_STATS_PATH)
+    top_terms = keyword_stats.top_terms(n=10)
+    if top_terms.empty:
+        logger.warning("No keyword statistics yet (empty vocabulary).")
+    else:
+        logger.info(f"Top 10 keywords/n-grams (streaming TF-IDF): {top_terms['term'].tolist()}")
+
+    logger.info("Thematic Analysis complete.")
+    return df
+
+def aggregate_insights(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregates sentiment and theme data by bank and rating for high-level insights.
+    
+    With INSIGHTS_ROLLUP_ENABLED, only reviews not counted before, or whose sentiment 
+    label or theme changed since, are merged into the persistent rollup store and the 
+    table is derived from its counters; otherwise it is recomputed from `df` alone.
+    """
+    logger.info("Aggregating insights by Bank and Rating...")
+    
+    if INSIGHTS_ROLLUP_ENABLED:
+        rollup = InsightsRollup(INSIGHTS_ROLLUP_FILEPATH)
+        try:
+            rollup.merge(df)
+            agg_df = rollup.to_frame()
+        finally:
+            rollup.close()
+        logger.info("Aggregation complete (incremental rollup).")
+        return agg_df
+    
+    # 1. Prepare numerical representation for sentiment
+    # Map POSITIVE=1, NEUTRAL=0, NEGATIVE=-1 for a better average index calculation across all three labels
+    df['sentiment_numeric'] = df['sentiment_label'].map({'POSITIVE': 1, 'NEUTRAL': 0, 'NEGATIVE': -1}).fillna(0)
+    
+    # 2. Group and calculate key metrics
+    agg_df = df.groupby(['bank', 'rating'], observed=True).agg(
+        total_reviews=('review', 'count'),
+        # Mean sentiment score: 1=Positive, 0=Neutral, -1=Negative
+        mean_sentiment_score=('sentiment_numeric', 'mean'), 
+        median_rating=('rating', 'median'),
+        top_theme=('identified_theme', lambda x: x.mode()[0]) # Find the most frequent theme
+    ).reset_index()
+    
+    # Rename for clarity
+    agg_df.rename(columns={'mean_sentiment_score': 'Avg_Sentiment_Index (-1 to 1)'}, inplace=True)
+    
+    logger.info("Aggregation complete. Resulting table shows key metrics per bank and rating.")
+    return agg_df
+
+
+def main():
+    """Main function to run the NLP analysis pipeline."""
+    input_filepath = os.path.join(DATA_PROCESSED_PATH, INPUT_FILENAME)
+    output_filepath = os.path.join(DATA_PROCESSED_PATH, OUTPUT_FILENAME)
+    aggregated_filepath = os.path.join(DATA_PROCESSED_PATH, AGGREGATED_FILENAME)
+    
+    # 1. Load Data
+    df = load_data(input_filepath)
+    if df.empty:
+        return 
+        
+    # 2. Shared Text Normalization (emoji conversion, lowercasing, tokens) - once per review
+    df = normalize_reviews(df)
+    
+    # 3. Sentiment Analysis (with VADER Fallback)
+    df_sentiment = run_sentiment_analysis(df)
+
+    # 4. Thematic Analysis (Keyword/Rule-Based Clustering)
+    # We rename it directly to df_final to keep the 'review_preprocessed' column
+    df_final = run_thematic_analysis(df_sentiment)
+    
+    # NOTE: The 'review_preprocessed' column is intentionally kept in df_final
+    # as requested, to allow comparison with the original 'review' column.
+
+    # 5. Aggregate Insights
+    df_aggregated = aggregate_insights(df_final.copy())
+    
+    # 6. Save Final Results (typed Parquet handoff for Task 3, plus CSV export)
+    saved_filepath = write_reviews(df_final, output_filepath)
+    logger.info(f"💾 Saved enriched individual reviews to {saved_filepath}")
+    
+    # The aggregate is a small report table, so it stays a plain CSV
+    df_aggregated.to_csv(aggregated_filepath, index=False, encoding='utf-8')
+    logger.info(f"💾 Saved aggregated insights to {aggregated_filepath}")
+
+    logger.info("\n✨ Task 2 Pipeline Complete. Data is ready for Visualization (Task 4) and Storage (Task 3).")
+
+if __name__ == "__main__":
+    if '--benchmark-sentiment' in sys.argv:
+        # Benchmark sentiment inference on the constrained reviews
+        df_bench = load_data(os.path.join(DATA_PROCESSED_PATH, INPUT_FILENAME))
+        benchmark_sentiment_inference(df_bench['review'].astype(str).apply(convert_emojis).tolist())
+    elif '--compare-backends' in sys.argv:
+        # Accuracy vs. speed of every CPU backend against the stored fp32 results
+        compare_sentiment_backends(os.path.join(DATA_PROCESSED_PATH, OUTPUT_FILENAME))
+    elif '--benchmark-themes' in sys.argv:
+        # Benchmark theme assignment on the constrained reviews
+        df_bench = load_data(os.path.join(DATA_PROCESSED_PATH, INPUT_FILENAME))
+        benchmark_theme_matching(normalize_reviews(df_bench)['review_preprocessed'])
+    else:
+        main()
\ No newline at end of file
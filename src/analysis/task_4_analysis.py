@@ -13,10 +13,11 @@ import seaborn as sns
 import os
 import sys
 import logging
+from collections import Counter
 from datetime import datetime
-from wordcloud import WordCloud # Added for the Word Cloud visualization requirement
+from wordcloud import WordCloud, STOPWORDS # Added for the Word Cloud visualization requirement
 
-# --- Setup and Configuration Loading (Identical to Task 3) ---
+# --- Setup and Configuration Loading ---
 
 logging.basicConfig(
     level=logging.INFO,
@@ -33,87 +34,48 @@ try:
 except NameError:
     PROJECT_ROOT = os.path.dirname(os.getcwd()) 
 
-# Assuming 'config' is a directory one level up from the task directory
-CONFIG_FILEPATH = os.path.join(PROJECT_ROOT, 'config', 'db_config.py')
 REPORTING_OUTPUT_DIR = os.path.join(PROJECT_ROOT, 'reports', 'task_4_output')
 
 # Ensure output directory exists
 os.makedirs(REPORTING_OUTPUT_DIR, exist_ok=True)
 
-DB_CONFIG = {} 
-try:
-    # Attempt to load configuration (assuming config/db_config.py structure)
-    # Note: In a real environment, this might be better done by importing or reading a JSON/YAML.
-    # We maintain the original method for code continuity.
-    config_path_attempt = os.path.join(os.path.dirname(os.getcwd()), 'config', 'db_config.py')
-    if not os.path.exists(config_path_attempt):
-        logger.warning(f"DB config file not found at {config_path_attempt}. Attempting alternative path.")
-        
-    config_content = ""
-    # Simplified logic assuming a predictable config location relative to task folder
-    if os.path.exists(config_path_attempt):
-        with open(config_path_attempt, 'r') as f:
-            config_content = f.read()
-    else:
-         # Fallback to current directory for testing if path fails
-        current_dir_config = os.path.join(os.getcwd(), 'db_config.py')
-        if os.path.exists(current_dir_config):
-             with open(current_dir_config, 'r') as f:
-                config_content = f.read()
-        else:
-             raise FileNotFoundError(f"db_config.py not found at expected paths.")
-        
-    exec(config_content, globals()) 
-    if 'DB_CONFIG' not in globals() or not isinstance(DB_CONFIG, dict):
-        raise ValueError("db_config.py did not define a valid DB_CONFIG dictionary.")
-except Exception as e:
-    logger.error(f"Error loading or parsing db_config.py: {e}")
-    # In a runnable environment, we would exit here, but for generation, we continue.
-    # sys.exit(1)
+# Shared pooled database access (reads config/db_config.py on first connection)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+from src.database.db_access import run_queries_concurrently, close_pool
 
 
 # --- SQL Queries for Data Extraction ---
 
 # 1. Monthly Sentiment Trend (for Line Plot)
+# Reads the materialized view maintained by Task 3 (refreshed after every load), so the
+# report does not re-aggregate the whole reviews table
 SQL_MONTHLY_TREND = """
 SELECT
-    EXTRACT(YEAR FROM T1.review_date) AS review_year,
-    EXTRACT(MONTH FROM T1.review_date) AS review_month,
-    T2.bank_name,
-    COUNT(T1.review_pk) AS total_reviews,
-    ROUND(AVG(T1.sentiment_score)::numeric, 4) AS average_sentiment
-FROM
-    reviews T1
-JOIN
-    banks T2 ON T1.bank_id = T2.bank_id
-WHERE
-    T1.review_date IS NOT NULL
-GROUP BY
     review_year,
     review_month,
-    T2.bank_name
+    bank_name,
+    total_reviews,
+    average_sentiment
+FROM
+    mv_monthly_sentiment_trend
 ORDER BY
     review_year,
     review_month,
-    T2.bank_name;
+    bank_name;
 """
 
-# 2. Rating Distribution (for Histogram)
+# 2. Rating Distribution (for Histogram), also precomputed by Task 3
 SQL_RATING_DISTRIBUTION = """
 SELECT
-    T2.bank_name,
-    T1.rating,
-    COUNT(T1.review_pk) AS rating_count
+    bank_name,
+    rating,
+    rating_count
 FROM
-    reviews T1
-JOIN
-    banks T2 ON T1.bank_id = T2.bank_id
-GROUP BY
-    T2.bank_name,
-    T1.rating
+    mv_rating_distribution
 ORDER BY
-    T2.bank_name,
-    T1.rating;
+    bank_name,
+    rating;
 """
 
 # 3. Theme Performance and Sample Reviews (for Analysis and Word Cloud)
@@ -121,6 +83,7 @@ SQL_THEME_ANALYSIS = """
 SELECT
     T2.bank_name,
     T1.review_text,
+    T1.review_tokens,
     T1.sentiment_score,
     T1.identified_theme
 FROM
@@ -209,8 +172,12 @@ def generate_word_cloud(df_themes, output_dir):
     # 1. Filter for low sentiment reviews (Pain Points)
     pain_point_reviews = df_themes[df_themes['sentiment_score'] < 0.4]
     
-    # 2. Combine all review text into a single string
-    text = " ".join(review for review in pain_point_reviews.review_text.astype(str))
+    # 2. Count words from the tokens stored by the Task 2 normalization stage
+    #    (rows loaded before that stage existed are tokenized from the raw text)
+    tokens = pain_point_reviews['review_tokens'].fillna(
+        pain_point_reviews['review_text'].astype(str).str.lower().str.findall(r"\b\w\w+\b").str.join(' ')
+    )
+    word_counts = Counter(word for review_tokens in tokens for word in review_tokens.split() if word not in STOPWORDS)
     
     # 3. Generate the word cloud
     wordcloud = WordCloud(
@@ -219,7 +186,7 @@ def generate_word_cloud(df_themes, output_dir):
         background_color='white', 
         min_font_size=10, 
         colormap='magma'
-    ).generate(text)
+    ).generate_from_frequencies(word_counts)
     
     plt.figure(figsize=(16, 8), facecolor=None)
     plt.imshow(wordcloud, interpolation='bilinear')
@@ -241,16 +208,15 @@ def generate_word_cloud(df_themes, output_dir):
 
 def run_task_4_analysis():
     """Connects to DB, runs queries, generates visualizations, and performs analysis."""
-    conn = None
     try:
-        # 1. Connect to PostgreSQL
-        conn = psycopg2.connect(**DB_CONFIG)
-        logger.info("Successfully connected to PostgreSQL for Task 4 analysis.")
-
-        # 2. Extract Data using SQL
-        df_trend = pd.read_sql(SQL_MONTHLY_TREND, conn)
-        df_rating = pd.read_sql(SQL_RATING_DISTRIBUTION, conn)
-        df_themes = pd.read_sql(SQL_THEME_ANALYSIS, conn)
+        # 1-2. Extract Data using SQL: the three queries run at the same time on pooled 
+        # connections, streaming rows through server-side cursors
+        results = run_queries_concurrently({
+            'trend': SQL_MONTHLY_TREND,
+            'rating': SQL_RATING_DISTRIBUTION,
+            'themes': SQL_THEME_ANALYSIS,
+        })
+        df_trend, df_rating, df_themes = results['trend'], results['rating'], results['themes']
         logger.info(f"Extracted {len(df_themes)} themed records for analysis.")
 
         # 3. Generate Visualizations (3 Plots: Trend, Distribution, Word Cloud)
@@ -276,6 +242,8 @@ def run_task_4_analysis():
         logger.info(f"\n✨ Task 4: Analysis and Visualizations saved to '{REPORTING_OUTPUT_DIR}'")
 
 
+    except (FileNotFoundError, ValueError) as e:
+        logger.error(f"Error loading or parsing db_config.py: {e}")
     except psycopg2.OperationalError as e:
         logger.error(f"PostgreSQL Connection Error: {e}")
         logger.error("Ensure server is running and config/db_config.py is correct.")
@@ -286,9 +254,7 @@ def run_task_4_analysis():
         import traceback
         logger.error(traceback.format_exc())
     finally:
-        if conn:
-            conn.close()
-            logger.info("PostgreSQL connection closed.")
+        close_pool()
 
 # --- Helper function for identifying Drivers/Pain Points ---
 
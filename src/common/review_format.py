@@ -0,0 +1,191 @@
+"""
+Typed Columnar Handoff Format
+
+Shared by all pipeline stages to hand review data to the next stage as Parquet
+files with an explicit schema instead of re-parsing CSV:
+- bank / source / app_name / app_id / identified_theme / sentiment_label are
+  dictionary-encoded (pandas 'category')
+- rating is a small integer (int8)
+- date is a native date (Arrow date32, datetime64 in pandas)
+
+Readers memory-map the Parquet file and can project only the columns they need.
+CSV is still written next to each Parquet file as a human-readable export. Readers
+use the CSV file instead when it is newer than the Parquet file (written by a tool
+or notebook that only writes CSV), when no Parquet file exists, or when pyarrow is
+not installed.
+"""
+
+import os
+import time
+import logging
+import tracemalloc
+import pandas as pd
+
+# pyarrow is optional: without it every stage keeps using CSV
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+# --- Schema ---
+CATEGORICAL_COLUMNS = ['bank', 'source', 'app_name', 'app_id', 'identified_theme', 'sentiment_label']
+RATING_COLUMN = 'rating'
+DATE_COLUMN = 'date'
+
+# Write a CSV export next to every Parquet handoff file
+EXPORT_CSV = True
+
+
+def _with_extension(filepath: str, extension: str) -> str:
+    return os.path.splitext(filepath)[0] + extension
+
+def _parquet_source(filepath: str):
+    """
+    The Parquet file to read for `filepath`, or None when the CSV file should be read:
+    no pyarrow, no Parquet file, or a CSV file written after the Parquet file.
+    """
+    parquet_filepath = _with_extension(filepath, '.parquet')
+    if pq is None or not os.path.exists(parquet_filepath):
+        return None
+
+    csv_filepath = _with_extension(filepath, '.csv')
+    # write_reviews writes the CSV export first, so its own Parquet file is never older
+    if os.path.exists(csv_filepath) and os.path.getmtime(csv_filepath) > os.path.getmtime(parquet_filepath):
+        logger.warning(f"{csv_filepath} is newer than {parquet_filepath}; reading the CSV file.")
+        return None
+    return parquet_filepath
+
+def apply_review_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Coerces whichever schema columns are present to their handoff dtypes."""
+    df = df.copy()
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
+    if RATING_COLUMN in df.columns:
+        rating = pd.to_numeric(df[RATING_COLUMN], errors='coerce')
+        df[RATING_COLUMN] = rating.astype('int8') if rating.notna().all() else rating.astype('Int8')
+
+    if DATE_COLUMN in df.columns:
+        df[DATE_COLUMN] = pd.to_datetime(df[DATE_COLUMN], errors='coerce').dt.normalize()
+    return df
+
+def write_reviews(df: pd.DataFrame, filepath: str, export_csv: bool = EXPORT_CSV) -> str:
+    """
+    Writes a stage's output. `filepath` may be given with any extension; the Parquet
+    file and the optional CSV export share its base name. Returns the primary path.
+    """
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    csv_filepath = _with_extension(filepath, '.csv')
+    parquet_filepath = _with_extension(filepath, '.parquet')
+
+    if pq is None:
+        logger.warning("pyarrow is not installed; writing the CSV handoff only.")
+        df.to_csv(csv_filepath, index=False, encoding='utf-8', date_format='%Y-%m-%d')
+        # A Parquet file from an earlier run would otherwise shadow this output
+        if os.path.exists(parquet_filepath):
+            os.remove(parquet_filepath)
+        return csv_filepath
+
+    table = pa.Table.from_pandas(apply_review_schema(df), preserve_index=False)
+    if DATE_COLUMN in table.column_names:
+        # Store the day as a native date32 rather than a timestamp
+        date_index = table.column_names.index(DATE_COLUMN)
+        table = table.set_column(date_index, DATE_COLUMN, table.column(DATE_COLUMN).cast(pa.date32()))
+
+    # The export is written before the Parquet file so readers never take it for newer output
+    if export_csv:
+        df.to_csv(csv_filepath, index=False, encoding='utf-8', date_format='%Y-%m-%d')
+    pq.write_table(table, parquet_filepath, compression='zstd')
+    return parquet_filepath
+
+def read_reviews(filepath: str, columns: list = None) -> pd.DataFrame:
+    """
+    Reads a stage's output, preferring the memory-mapped Parquet file and loading
+    only `columns` when given. Falls back to the CSV file (coerced to the same
+    schema) when no Parquet file exists or the CSV file is newer. Raises
+    FileNotFoundError if neither exists.
+    """
+    parquet_filepath = _parquet_source(filepath)
+    if parquet_filepath is not None:
+        table = pq.read_table(parquet_filepath, columns=columns, memory_map=True)
+        # date32 -> datetime64 so downstream .dt accessors keep working
+        return table.to_pandas(date_as_object=False)
+
+    csv_filepath = _with_extension(filepath, '.csv')
+    df = pd.read_csv(csv_filepath, encoding='utf-8', usecols=columns)
+    return apply_review_schema(df)
+
+def iter_reviews(filepath: str, chunk_size: int, columns: list = None):
+    """
+    Yields a stage's output as DataFrames of at most `chunk_size` rows, streaming
+    Parquet record batches or CSV chunks so the whole file is never loaded.
+    """
+    parquet_filepath = _parquet_source(filepath)
+    if parquet_filepath is not None:
+        parquet_file = pq.ParquetFile(parquet_filepath, memory_map=True)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas(date_as_object=False)
+        return
+
+    csv_filepath = _with_extension(filepath, '.csv')
+    for chunk in pd.read_csv(csv_filepath, encoding='utf-8', usecols=columns, chunksize=chunk_size):
+        yield apply_review_schema(chunk)
+
+def benchmark_handoff(csv_filepath: str, columns: list = None) -> pd.DataFrame:
+    """
+    Converts an existing CSV handoff file to Parquet and compares load time and
+    resident (deep) memory of the CSV read, the full Parquet read and, when
+    `columns` is given, a column-projected Parquet read.
+    """
+    df = pd.read_csv(csv_filepath, encoding='utf-8')
+    bench_filepath = _with_extension(csv_filepath, '.bench.parquet')
+    write_reviews(df, bench_filepath, export_csv=False)
+
+    readers = [
+        ('csv (pd.read_csv)', lambda: pd.read_csv(csv_filepath, encoding='utf-8')),
+        ('parquet (all columns)', lambda: read_reviews(bench_filepath)),
+    ]
+    if columns:
+        readers.append((f'parquet ({len(columns)} columns)', lambda: read_reviews(bench_filepath, columns=columns)))
+
+    results = []
+    try:
+        for name, reader in readers:
+            tracemalloc.start()
+            started = time.perf_counter()
+            loaded = reader()
+            elapsed = time.perf_counter() - started
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results.append({
+                'reader': name,
+                'rows': len(loaded),
+                'load_ms': round(elapsed * 1000, 1),
+                'peak_load_mb': round(peak_bytes / 1024 ** 2, 2),
+                'resident_mb': round(loaded.memory_usage(deep=True).sum() / 1024 ** 2, 2)
+            })
+    finally:
+        os.remove(bench_filepath)
+
+    report = pd.DataFrame(results)
+    logger.info(f"Handoff format benchmark for {csv_filepath}:\n{report.to_string(index=False)}")
+    return report
+
+
+if __name__ == "__main__":
+    # Benchmark the handoff files of every stage: python -m src.common.review_format
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    handoff_files = [
+        os.path.join(project_root, 'data', 'raw', 'reviews_initial_clean.csv'),
+        os.path.join(project_root, 'data', 'processed', 'final_bank_reviews_constrained.csv'),
+        os.path.join(project_root, 'data', 'processed', 'reviews_with_sentiment_themes.csv'),
+    ]
+    for handoff_file in handoff_files:
+        if os.path.exists(handoff_file):
+            benchmark_handoff(handoff_file, columns=['bank', 'rating', 'date'])
@@ -4,9 +4,17 @@ Google Play Store Review Scraper for Ethiopian Banking Apps
 """
 
 import pandas as pd
+import numpy as np
 import time
+import tracemalloc
 import logging
-from google_play_scraper import reviews_all, Sort
+import threading
+import json
+import gzip
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from google_play_scraper import reviews as fetch_review_page, Sort
+from google_play_scraper.features.reviews import _ContinuationToken, MAX_COUNT_EACH_FETCH
 from datetime import datetime
 import sys
 import os
@@ -16,6 +24,14 @@ import os
 # within the project structure (e.g., from the root or inside 'src/data_collection').
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 DATA_RAW_PATH = os.path.join(PROJECT_ROOT, 'data', 'raw')
+SCRAPE_STATE_PATH = os.path.join(DATA_RAW_PATH, 'scrape_state')
+DATA_BATCHES_PATH = os.path.join(DATA_RAW_PATH, 'batches')
+HTTP_CACHE_PATH = os.path.join(DATA_RAW_PATH, 'http_cache')
+
+# Make the shared 'src.common' helpers importable when run as a script
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+from src.common.review_format import read_reviews, write_reviews
 
 # 🟢 FIX: Ensure output console encoding is UTF-8 for emojis (Fixes UnicodeEncodeError)
 if sys.stdout.encoding.lower() != 'utf-8':
@@ -86,10 +102,384 @@ def preprocess_reviews(reviews: list) -> pd.DataFrame:
     
     return df
 
+# Columns produced by both ingest paths, in deliverable order
+REVIEW_COLUMNS = ['review_text', 'rating', 'date', 'bank', 'source', 'app_name', 'app_id']
+
+def _constant_categorical(value: str, length: int) -> pd.Categorical:
+    """A column holding one repeated value, stored as 1-byte codes plus a single category."""
+    return pd.Categorical.from_codes(np.zeros(length, dtype=np.int8), categories=[value])
+
+def build_review_frame(page: list, app_id: str, app_name: str, short_name: str, scraped_at: datetime) -> pd.DataFrame:
+    """
+    Columnar ingest of one page of raw reviews.
+    
+    Only the needed fields are pulled out of the review dicts, once, into typed 
+    columns (the dicts themselves are never mutated). Bank/app metadata become 
+    constant categorical columns and the whole page shares one scrape timestamp.
+    """
+    length = len(page)
+    return pd.DataFrame({
+        'review_text': [review.get('content') for review in page],
+        'rating': pd.array([review.get('score') for review in page], dtype='Int8'),
+        # Naive Play Store timestamps are UTC; truncating to the day keeps the 
+        # YYYY-MM-DD granularity of the legacy path without a string round trip
+        'date': pd.to_datetime([review.get('at') for review in page], errors='coerce').normalize(),
+        'bank': _constant_categorical(short_name, length),
+        'source': _constant_categorical('Google Play', length),
+        'app_name': _constant_categorical(app_name, length),
+        'app_id': _constant_categorical(app_id, length),
+        'scraped_at': np.full(length, np.datetime64(scraped_at, 's'))
+    })
+
+def preprocess_review_frames(frames: list) -> pd.DataFrame:
+    """
+    Columnar counterpart of `preprocess_reviews`: concatenates page frames built by 
+    `build_review_frame` and applies the same missing-data and duplicate rules. 
+    The 'date' column stays a datetime64 column (formatted as YYYY-MM-DD on save).
+    """
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=REVIEW_COLUMNS)
+    
+    df = pd.concat(frames, ignore_index=True)
+    # Pages from different apps carry different categories; re-encode the union once
+    for col in ['bank', 'source', 'app_name', 'app_id']:
+        df[col] = df[col].astype('category')
+    
+    initial_count = len(df)
+    df = df.dropna(subset=['review_text', 'rating', 'date'])
+    df = df.drop_duplicates(subset=['review_text', 'date', 'bank'])
+    df = df[REVIEW_COLUMNS].reset_index(drop=True)
+    
+    logger.info(f"Cleaned reviews count: {len(df)} (Dropped {initial_count - len(df)} rows during initial clean).")
+    return df
+
+def _synthetic_review_pages(n_reviews: int, page_size: int):
+    """Yields pages of fake raw review dicts shaped like google_play_scraper output."""
+    base_time = datetime(2024, 1, 1)
+    for start in range(0, n_reviews, page_size):
+        yield [
+            {
+                'reviewId': f"gp:{i}",
+                'userName': f"user {i}",
+                'userImage': 'https://play-lh.googleusercontent.com/a/default-user',
+                'content': f"review number {i % 50000} about the app",
+                'score': i % 5 + 1,
+                'thumbsUpCount': i % 7,
+                'reviewCreatedVersion': '5.1.0',
+                'at': base_time + pd.Timedelta(minutes=i),
+                'replyContent': None,
+                'repliedAt': None,
+                'appVersion': '5.1.0'
+            }
+            for i in range(start, min(start + page_size, n_reviews))
+        ]
+
+def benchmark_ingest(n_reviews: int = 1_000_000, page_size: int = 200) -> pd.DataFrame:
+    """
+    Compares the legacy dict-mutation ingest (tag every dict, then `preprocess_reviews`) 
+    with the columnar ingest (`build_review_frame` per page, then 
+    `preprocess_review_frames`) on synthetic pages. Reports wall time and peak 
+    traced memory, including the raw pages each path keeps alive.
+    """
+    app_id, app_name, short_name = 'com.example.bank', 'Example Bank', 'EXB'
+    
+    def legacy_path():
+        reviews = []
+        for page in _synthetic_review_pages(n_reviews, page_size):
+            reviews.extend(page)
+        BankReviewScraper._add_bank_metadata(reviews, app_id, app_name, short_name)
+        return preprocess_reviews(reviews)
+    
+    def columnar_path():
+        scraped_at = datetime.now()
+        frames = [
+            build_review_frame(page, app_id, app_name, short_name, scraped_at)
+            for page in _synthetic_review_pages(n_reviews, page_size)
+        ]
+        return preprocess_review_frames(frames)
+    
+    results = []
+    for name, ingest in [('legacy dict mutation', legacy_path), ('columnar', columnar_path)]:
+        tracemalloc.start()
+        started = time.perf_counter()
+        df = ingest()
+        elapsed = time.perf_counter() - started
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        
+        results.append({
+            'path': name,
+            'rows': len(df),
+            'seconds': round(elapsed, 2),
+            'reviews_per_sec': round(n_reviews / elapsed),
+            'peak_mb': round(peak_bytes / 1024 ** 2, 1),
+            'frame_mb': round(df.memory_usage(deep=True).sum() / 1024 ** 2, 1)
+        })
+        del df
+    
+    report = pd.DataFrame(results)
+    logger.info(f"Ingest benchmark ({n_reviews} reviews):\n{report.to_string(index=False)}")
+    return report
+
+def _batch_partition_dir(batch_root: str, bank: str, scrape_date: str) -> str:
+    """Hive-style partition directory: <batch_root>/bank=<bank>/scrape_date=<YYYY-MM-DD>"""
+    return os.path.join(batch_root, f"bank={bank}", f"scrape_date={scrape_date}")
+
+def write_review_batch(df: pd.DataFrame, batch_root: str, bank: str, scrape_started: datetime, batch_number: int) -> str:
+    """
+    Writes one page of cleaned reviews to a new, append-only batch file in its 
+    bank/scrape-date partition. Existing batch files are never modified; the file 
+    is written under a temporary name and renamed so readers never see partial data.
+    
+    File names carry the run's start time to the microsecond and the process id, so 
+    runs started in the same second get distinct names; should a name still exist, 
+    FileExistsError is raised instead of overwriting the earlier batch.
+    """
+    partition_dir = _batch_partition_dir(batch_root, bank, scrape_started.strftime('%Y-%m-%d'))
+    os.makedirs(partition_dir, exist_ok=True)
+    
+    run_id = f"{scrape_started.strftime('%H%M%S%f')}-{os.getpid()}"
+    filepath = os.path.join(partition_dir, f"part-{run_id}-{batch_number:05d}.csv")
+    tmp_filepath = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+    df.to_csv(tmp_filepath, index=False, encoding='utf-8', date_format='%Y-%m-%d')
+    try:
+        # Unlike os.replace, a hard link fails when the target exists
+        os.link(tmp_filepath, filepath)
+    finally:
+        os.remove(tmp_filepath)
+    return filepath
+
+def iter_review_batches(batch_root: str = DATA_BATCHES_PATH, banks=None, scrape_dates=None):
+    """
+    Lazily yields one DataFrame per batch file, optionally restricted to some 
+    banks and/or scrape dates (YYYY-MM-DD). Only one batch is held in memory at a time.
+    """
+    if not os.path.isdir(batch_root):
+        return
+    
+    for bank_dir in sorted(os.listdir(batch_root)):
+        bank = bank_dir.split('=', 1)[-1]
+        if banks is not None and bank not in banks:
+            continue
+        
+        bank_path = os.path.join(batch_root, bank_dir)
+        for date_dir in sorted(os.listdir(bank_path)):
+            scrape_date = date_dir.split('=', 1)[-1]
+            if scrape_dates is not None and scrape_date not in scrape_dates:
+                continue
+            
+            date_path = os.path.join(bank_path, date_dir)
+            for filename in sorted(os.listdir(date_path)):
+                if filename.endswith('.csv'):
+                    yield pd.read_csv(os.path.join(date_path, filename), encoding='utf-8')
+
+class TokenBucketRateLimiter:
+    """
+    Thread-safe token bucket shared by every scraping worker.
+    
+    Each Play Store page request consumes one token. Tokens refill continuously at 
+    `rate` per second up to `capacity`, so short bursts are allowed while the 
+    long-run request rate across all apps never exceeds `rate`.
+    """
+    
+    def __init__(self, rate: float, capacity: int):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("Rate limiter requires rate > 0 and capacity >= 1.")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Blocks until a token is available, then consumes it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+                self._last_refill = now
+                
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                
+                # Time until the next full token is available
+                wait_seconds = (1 - self._tokens) / self.rate
+            
+            time.sleep(wait_seconds)
+
+class ScrapeStateStore:
+    """
+    Persists incremental scraping state per app_id under `state_dir`.
+    
+    For every app two files are kept:
+    - `<app_id>.json`: the watermark (newest review already collected) and, while a 
+      scrape is in progress, a checkpoint with the paging continuation token.
+    - `<app_id>.pending.jsonl`: reviews fetched by the in-progress scrape, appended 
+      page by page so a crashed run can resume without refetching them.
+    """
+    
+    TOKEN_FIELDS = ('token', 'lang', 'country', 'sort', 'count', 'filter_score_with', 'filter_device_with')
+    DATETIME_FIELDS = ('at', 'repliedAt')
+    
+    def __init__(self, state_dir: str):
+        self.state_dir = state_dir
+        os.makedirs(self.state_dir, exist_ok=True)
+    
+    def _state_path(self, app_id: str) -> str:
+        return os.path.join(self.state_dir, f"{app_id}.json")
+    
+    def _pending_path(self, app_id: str) -> str:
+        return os.path.join(self.state_dir, f"{app_id}.pending.jsonl")
+    
+    def load(self, app_id: str) -> dict:
+        """Returns the stored state for an app, or an empty dict for a first run."""
+        try:
+            with open(self._state_path(app_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+    
+    def save(self, app_id: str, state: dict):
+        """Writes the state atomically so a crash never leaves a half-written file."""
+        tmp_path = self._state_path(app_id) + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self._state_path(app_id))
+    
+    def append_pending(self, app_id: str, reviews: list):
+        """Appends one page of fetched reviews to the in-progress spool file."""
+        with open(self._pending_path(app_id), 'a', encoding='utf-8') as f:
+            for review in reviews:
+                f.write(json.dumps(review, default=str, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def read_pending(self, app_id: str) -> list:
+        """Reads back the reviews spooled by an interrupted scrape."""
+        reviews = []
+        try:
+            with open(self._pending_path(app_id), 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    review = json.loads(line)
+                    for field in self.DATETIME_FIELDS:
+                        if review.get(field):
+                            review[field] = datetime.fromisoformat(review[field])
+                    reviews.append(review)
+        except FileNotFoundError:
+            pass
+        return reviews
+    
+    def clear_pending(self, app_id: str):
+        if os.path.exists(self._pending_path(app_id)):
+            os.remove(self._pending_path(app_id))
+    
+    @classmethod
+    def serialize_token(cls, continuation_token) -> dict:
+        return {field: getattr(continuation_token, field) for field in cls.TOKEN_FIELDS}
+    
+    @classmethod
+    def deserialize_token(cls, token_data: dict):
+        return _ContinuationToken(*(token_data[field] for field in cls.TOKEN_FIELDS))
+
+class ReplayCacheMissError(LookupError):
+    """Raised in replay mode when a requested page was never recorded."""
+
+class ReviewPageCache:
+    """
+    Record/replay cache for raw Play Store review pages.
+    
+    In 'record' mode every page response (reviews plus the next continuation token) 
+    is written to a gzip-compressed JSON file. In 'replay' mode pages are served 
+    from those files without any network access. Entries are keyed by the request 
+    (app, language, country, sort, page size and the continuation token string), 
+    and the replayed next-page token carries the recorded token string, so a 
+    replayed crawl walks exactly the same chain of pages as the recorded one.
+    """
+    
+    MODES = ('record', 'replay')
+    
+    def __init__(self, cache_dir: str, mode: str):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown HTTP cache mode '{mode}'. Expected one of {self.MODES}.")
+        self.cache_dir = cache_dir
+        self.mode = mode
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    @staticmethod
+    def _request_key(app_id, lang, country, sort, count, continuation_token) -> dict:
+        # When paging, the library takes its request parameters from the token itself
+        if continuation_token is not None:
+            lang, country, sort, count = (continuation_token.lang, continuation_token.country,
+                                          continuation_token.sort, continuation_token.count)
+        return {
+            'app_id': app_id,
+            'lang': lang,
+            'country': country,
+            'sort': sort,
+            'count': count,
+            'token': continuation_token.token if continuation_token is not None else None
+        }
+    
+    def _entry_path(self, request_key: dict) -> str:
+        digest = hashlib.sha1(json.dumps(request_key, sort_keys=True).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, request_key['app_id'], f"{digest}.json.gz")
+    
+    def record(self, request_key: dict, page: list, next_token):
+        """Stores one page response for `request_key`."""
+        entry_path = self._entry_path(request_key)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        entry = {
+            'request': request_key,
+            'reviews': page,
+            'continuation_token': ScrapeStateStore.serialize_token(next_token) if next_token is not None else None
+        }
+        tmp_path = entry_path + '.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(entry, f, default=str, ensure_ascii=False)
+        os.replace(tmp_path, entry_path)
+    
+    def discard(self, request_key: dict):
+        """Removes the recorded page for `request_key`, if any (e.g. a failed request)."""
+        try:
+            os.remove(self._entry_path(request_key))
+        except FileNotFoundError:
+            pass
+    
+    def replay(self, request_key: dict):
+        """Returns the recorded (page, next_token) for `request_key`."""
+        entry_path = self._entry_path(request_key)
+        try:
+            with gzip.open(entry_path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            raise ReplayCacheMissError(
+                f"No recorded page for {request_key['app_id']} (token={request_key['token']}). "
+                "Run once with http_cache_mode='record' first."
+            )
+        
+        page = entry['reviews']
+        for review in page:
+            for field in ScrapeStateStore.DATETIME_FIELDS:
+                if review.get(field):
+                    review[field] = datetime.fromisoformat(review[field])
+        
+        token_data = entry['continuation_token']
+        next_token = ScrapeStateStore.deserialize_token(token_data) if token_data is not None else None
+        return page, next_token
+
 class BankReviewScraper:
     """Scrapes reviews from Google Play Store for banking apps"""
     
-    def __init__(self):
+    # Incremental runs in a row whose paging ended before the watermark, after which 
+    # the early end is taken as the real end of the reviews
+    MAX_INCOMPLETE_CRAWLS = 3
+    
+    def __init__(self, **config_overrides):
+        """`config_overrides` replace entries of `scraping_config`, e.g. incremental=True."""
         self.bank_apps = {
             'CBE': {
                 'id': 'com.combanketh.mobilebanking', 
@@ -111,31 +501,279 @@ class BankReviewScraper:
         self.scraping_config = {
             'lang': None, 
             'country': 'et', 
-            'sleep_milliseconds': 1000,
-            'max_reviews_per_app': 1000 
+            'max_reviews_per_app': 1000,
+            # Reviews requested per page. MAX_COUNT_EACH_FETCH (4500) is the most the library
+            # asks the Play Store for in one request and what reviews_all used, so a full
+            # crawl takes as few rate-limited requests as before (200 took ~22x as many)
+            'page_size': MAX_COUNT_EACH_FETCH,
+            # Number of apps scraped at the same time (1 = serial crawl)
+            'max_workers': 4,
+            # Shared token bucket: sustained page requests per second across all apps,
+            # and how many requests may be sent back-to-back before throttling kicks in
+            'requests_per_second': 1.0,
+            'burst_size': 3,
+            # Incremental mode: only fetch reviews newer than the stored per-app
+            # watermark, checkpointing after every page so a crashed run can resume
+            'incremental': False,
+            'state_dir': SCRAPE_STATE_PATH,
+            # Streaming mode: write each fetched page to partitioned batch files
+            # under data/raw/batches instead of building one in-memory DataFrame
+            'stream_to_batches': False,
+            # Record/replay of raw page responses: None (live), 'record' (live and
+            # saved to the cache) or 'replay' (served from the cache, no network)
+            'http_cache_mode': None,
+            'http_cache_dir': HTTP_CACHE_PATH,
+            # Build typed, column-oriented page frames instead of tagging every
+            # raw review dict with bank metadata (see `build_review_frame`)
+            'columnar_ingest': True
         }
+        unknown = set(config_overrides) - set(self.scraping_config)
+        if unknown:
+            raise ValueError(f"Unknown scraping_config keys: {sorted(unknown)}")
+        self.scraping_config.update(config_overrides)
+        
+        # Helpers are built from scraping_config on first use (see the properties
+        # below), so changing the config after construction still takes effect
+        self._helpers = {}
+        self._helpers_lock = threading.Lock()
+        # Watermarks of caught-up apps, committed once their reviews are persisted
+        self._pending_watermarks = {}
         self.all_reviews = []
+    
+    def _helper(self, name: str, settings: tuple, factory):
+        """Returns the cached helper `name`, rebuilding it when its settings changed."""
+        with self._helpers_lock:
+            cached = self._helpers.get(name)
+            if cached is None or cached[0] != settings:
+                cached = (settings, factory())
+                self._helpers[name] = cached
+            return cached[1]
+    
+    @property
+    def rate_limiter(self) -> TokenBucketRateLimiter:
+        rate, capacity = self.scraping_config['requests_per_second'], self.scraping_config['burst_size']
+        return self._helper('rate_limiter', (rate, capacity), lambda: TokenBucketRateLimiter(rate=rate, capacity=capacity))
+    
+    @property
+    def state_store(self):
+        """The incremental state store, or None when incremental mode is off."""
+        if not self.scraping_config['incremental']:
+            return None
+        state_dir = self.scraping_config['state_dir']
+        return self._helper('state_store', (state_dir,), lambda: ScrapeStateStore(state_dir))
+    
+    @property
+    def page_cache(self):
+        """The record/replay page cache, or None when `http_cache_mode` is None (live requests)."""
+        mode, cache_dir = self.scraping_config['http_cache_mode'], self.scraping_config['http_cache_dir']
+        if not mode:
+            return None
+        return self._helper('page_cache', (cache_dir, mode), lambda: ReviewPageCache(cache_dir, mode))
+        
+    def _fetch_review_pages(self, app_id, sort=Sort.MOST_RELEVANT, continuation_token=None):
+        """
+        Yields (page, continuation_token) for one app, following the continuation 
+        token until the Play Store has no more results.
+        """
+        while True:
+            page, continuation_token = self._request_page(app_id, sort, continuation_token)
+            
+            if page:
+                yield page, continuation_token
+            
+            # An empty page or missing token means we reached the last page
+            if not page or continuation_token is None or continuation_token.token is None:
+                break
+    
+    def _request_args(self, sort) -> dict:
+        return dict(
+            lang=self.scraping_config['lang'],
+            country=self.scraping_config['country'],
+            sort=sort,
+            count=self.scraping_config['page_size']
+        )
+    
+    def _request_page(self, app_id, sort, continuation_token):
+        """
+        Fetches one page of reviews. Live requests wait for a token from the shared 
+        rate limiter and are saved when recording; replayed pages are read from the 
+        local cache at disk speed.
+        """
+        request_args = self._request_args(sort)
+        request_key = None
+        page_cache = self.page_cache
+        if page_cache is not None:
+            request_key = ReviewPageCache._request_key(app_id, continuation_token=continuation_token, **request_args)
+            if page_cache.mode == 'replay':
+                return page_cache.replay(request_key)
+        
+        self.rate_limiter.acquire()
+        page, next_token = fetch_review_page(app_id, continuation_token=continuation_token, **request_args)
+        
+        if request_key is not None:
+            page_cache.record(request_key, page, next_token)
+        return page, next_token
+    
+    @staticmethod
+    def _split_at_watermark(page: list, watermark: dict):
+        """
+        Returns the reviews of a NEWEST-sorted page that are newer than the watermark, 
+        and whether the watermark was reached (i.e. paging can stop).
+        """
+        if not watermark:
+            return page, False
+        
+        watermark_at = datetime.fromisoformat(watermark['review_at'])
+        for position, review in enumerate(page):
+            if review['reviewId'] == watermark['review_id'] or review['at'] < watermark_at:
+                return page[:position], True
+        return page, False
+    
+    def _iter_new_review_pages(self, app_id, short_name, spool=True):
+        """
+        Incremental scrape of one app: yields pages of reviews newer than the stored 
+        watermark, paging newest-first and stopping once the watermark is reached.
+        
+        The continuation token is checkpointed after each page has been consumed, so 
+        an interrupted run resumes from the last page instead of starting over. With 
+        `spool=True` fetched reviews are also spooled to disk and replayed on resume 
+        (callers that persist pages themselves, like the batch writer, skip this). 
+        
+        Once the app is caught up the checkpoint is marked as such, but the watermark 
+        only advances (and the spool is only dropped) when the caller has persisted 
+        the reviews and calls `commit_watermarks`. A run that fails before that 
+        replays the spool on the next run instead of losing the reviews.
+        
+        The library reports a failed request as the last page (no next-page token), 
+        so with a stored watermark the app only counts as caught up once the 
+        watermark is reached. A crawl that ends early keeps its last good checkpoint 
+        (the truncated page is neither yielded nor kept in the record cache) and the 
+        next run resumes from there; after MAX_INCOMPLETE_CRAWLS such runs in a row 
+        the early end is accepted, e.g. when the watermark review no longer exists.
+        """
+        state_store = self.state_store
+        state = state_store.load(app_id)
+        watermark = state.get('watermark')
+        checkpoint = state.get('checkpoint')
+        new_review_count = 0
+        
+        if checkpoint:
+            run_newest = checkpoint['run_newest']
+            token_data = checkpoint['continuation_token']
+            pending = state_store.read_pending(app_id) if spool else []
+            logger.info(f"♻️  Resuming {short_name} from checkpoint ({len(pending)} reviews already spooled).")
+            if pending:
+                new_review_count += len(pending)
+                yield pending
+        else:
+            state_store.clear_pending(app_id)
+            run_newest, token_data = None, None
+        
+        # A caught-up checkpoint (or one without a next-page token) means the crash 
+        # happened after the last page, before the reviews were persisted
+        finished = bool(checkpoint and checkpoint.get('caught_up')) or (token_data is not None and token_data['token'] is None)
+        continuation_token = state_store.deserialize_token(token_data) if token_data else None
+        
+        incomplete_crawls = checkpoint.get('incomplete_crawls', 0) if checkpoint else 0
+        
+        while not finished:
+            page, next_token = self._request_page(app_id, Sort.NEWEST, continuation_token)
+            new_reviews, reached_watermark = self._split_at_watermark(page or [], watermark)
+            last_page = not page or next_token is None or next_token.token is None
+            
+            if last_page and watermark and not reached_watermark and incomplete_crawls + 1 < self.MAX_INCOMPLETE_CRAWLS:
+                # Possibly a failed request: keep the checkpoint of the previous page
+                page_cache = self.page_cache
+                if page_cache is not None and page_cache.mode == 'record':
+                    page_cache.discard(ReviewPageCache._request_key(
+                        app_id, continuation_token=continuation_token, **self._request_args(Sort.NEWEST)
+                    ))
+                state_store.save(app_id, {
+                    'watermark': watermark,
+                    'checkpoint': {
+                        'continuation_token': state_store.serialize_token(continuation_token) if continuation_token else None,
+                        'run_newest': run_newest,
+                        'incomplete_crawls': incomplete_crawls + 1
+                    }
+                })
+                logger.warning(f"⚠️  {short_name}: paging ended before the stored watermark (failed request?). "
+                               f"Keeping the checkpoint; the next run resumes from the last complete page.")
+                return
+            
+            # The first review of the first page is the newest one of this run
+            if run_newest is None and new_reviews:
+                run_newest = {
+                    'review_id': new_reviews[0]['reviewId'],
+                    'review_at': new_reviews[0]['at'].isoformat()
+                }
+            
+            if spool:
+                state_store.append_pending(app_id, new_reviews)
+            if new_reviews:
+                new_review_count += len(new_reviews)
+                yield new_reviews
+            
+            if reached_watermark or last_page:
+                break
+            continuation_token = next_token
+            state_store.save(app_id, {
+                'watermark': watermark,
+                'checkpoint': {
+                    'continuation_token': state_store.serialize_token(continuation_token),
+                    'run_newest': run_newest
+                }
+            })
+        
+        # Caught up: keep the spool until the caller commits the new watermark
+        state_store.save(app_id, {
+            'watermark': watermark,
+            'checkpoint': {'continuation_token': None, 'run_newest': run_newest, 'caught_up': True}
+        })
+        self._pending_watermarks[app_id] = run_newest or watermark
+        
+        logger.info(f"🔖 {short_name}: {new_review_count} new reviews since last watermark.")
+    
+    def commit_watermarks(self, app_ids=None):
+        """
+        Advances the watermark of every caught-up app (or only `app_ids`) and drops 
+        its checkpoint and spool. Call only after the scraped reviews are persisted.
+        """
+        if self.state_store is None:
+            return
+        for app_id in list(app_ids if app_ids is not None else self._pending_watermarks):
+            if app_id not in self._pending_watermarks:
+                continue
+            self.state_store.save(app_id, {'watermark': self._pending_watermarks.pop(app_id)})
+            self.state_store.clear_pending(app_id)
+    
+    def _iter_app_pages(self, app_id, short_name, spool=True):
+        """Yields pages of raw reviews for one app, incrementally if configured."""
+        if self.state_store is not None:
+            yield from self._iter_new_review_pages(app_id, short_name, spool=spool)
+        else:
+            for page, _ in self._fetch_review_pages(app_id):
+                yield page
+    
+    @staticmethod
+    def _add_bank_metadata(reviews: list, app_id, app_name, short_name):
+        """Add bank metadata to each review dictionary"""
+        for review in reviews:
+            review['bank_name'] = short_name
+            review['app_name'] = app_name
+            review['app_id'] = app_id
+            review['scraped_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
     def scrape_single_app(self, app_id, app_name, short_name):
         """Scrape reviews for a single banking app"""
         try:
             logger.info(f"📱 Starting to scrape reviews for {app_name} ({short_name})...")
             
-            # Scrape reviews with configured settings
-            reviews = reviews_all(
-                app_id=app_id,
-                lang=self.scraping_config['lang'],
-                country=self.scraping_config['country'],
-                sort=Sort.MOST_RELEVANT,
-                sleep_milliseconds=self.scraping_config['sleep_milliseconds']
-            )
+            # Page through the reviews under the shared rate limiter
+            reviews = []
+            for page in self._iter_app_pages(app_id, short_name):
+                reviews.extend(page)
             
-            # Add bank metadata to each review dictionary
-            for review in reviews:
-                review['bank_name'] = short_name
-                review['app_name'] = app_name
-                review['app_id'] = app_id
-                review['scraped_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            self._add_bank_metadata(reviews, app_id, app_name, short_name)
             
             logger.info(f"✅ Successfully scraped {len(reviews)} reviews for {short_name}")
             return reviews
@@ -144,33 +782,138 @@ class BankReviewScraper:
             logger.error(f"❌ Failed to scrape {app_name}: {str(e)}")
             return []
     
+    def stream_single_app(self, app_id, app_name, short_name, batch_root, scrape_started):
+        """
+        Scrape one app page by page, cleaning each page and writing it straight to 
+        its own batch file. Nothing is accumulated, so memory stays bounded by the 
+        page size. Returns the number of reviews written.
+        """
+        try:
+            logger.info(f"📱 Streaming reviews for {app_name} ({short_name}) to {batch_root}...")
+            
+            written = 0
+            for batch_number, page in enumerate(self._iter_app_pages(app_id, short_name, spool=False)):
+                if self.scraping_config['columnar_ingest']:
+                    df_page = preprocess_review_frames([
+                        build_review_frame(page, app_id, app_name, short_name, datetime.now())
+                    ])
+                else:
+                    self._add_bank_metadata(page, app_id, app_name, short_name)
+                    df_page = preprocess_reviews(page)
+                if not df_page.empty:
+                    write_review_batch(df_page, batch_root, short_name, scrape_started, batch_number)
+                    written += len(df_page)
+            
+            # Every page is in a batch file now, so the watermark can move
+            self.commit_watermarks([app_id])
+            logger.info(f"✅ Streamed {written} cleaned reviews for {short_name}")
+            return written
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to stream {app_name}: {str(e)}")
+            return 0
+    
+    def _run_for_all_apps(self, worker, *extra_args) -> dict:
+        """
+        Runs `worker(app_id, app_name, short_name, *extra_args)` for every app on a 
+        thread pool of `max_workers` threads. Pacing is handled per page request by 
+        the shared token bucket, so adding workers raises throughput without 
+        exceeding the configured request rate.
+        
+        Returns {bank_key: result} in `bank_apps` order, regardless of which app 
+        finishes first.
+        """
+        max_workers = max(1, min(self.scraping_config['max_workers'], len(self.bank_apps)))
+        logger.info(f"Using {max_workers} scraping worker(s).")
+        
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    worker,
+                    app_info['id'],
+                    app_info['name'],
+                    app_info['short_name'],
+                    *extra_args
+                ): bank_key
+                for bank_key, app_info in self.bank_apps.items()
+            }
+            
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        
+        return {bank_key: results[bank_key] for bank_key in self.bank_apps}
+    
     def scrape_all_banks(self):
-        """Scrape reviews for all banking apps"""
+        """Scrape reviews for all banking apps concurrently"""
         logger.info("🚀 Starting review scraping for all banks...")
         logger.info("=" * 60)
         
-        total_reviews = 0
+        results = self._run_for_all_apps(self.scrape_single_app)
         
-        for bank_key, app_info in self.bank_apps.items():
-            reviews = self.scrape_single_app(
-                app_info['id'],
-                app_info['name'],
-                app_info['short_name']
-            )
-            
+        total_reviews = 0
+        for reviews in results.values():
             self.all_reviews.extend(reviews)
             total_reviews += len(reviews)
-            
-            # Pause between apps to avoid rate limiting
-            time.sleep(2)
         
         logger.info(f"🎯 Total raw reviews collected: {total_reviews}")
         return self.all_reviews
     
-    def save_to_csv(self, df: pd.DataFrame, filename="reviews_initial_clean.csv"):
+    def scrape_single_app_columnar(self, app_id, app_name, short_name) -> list:
+        """Scrape one app into a list of typed page frames (see `build_review_frame`)"""
+        try:
+            logger.info(f"📱 Starting to scrape reviews for {app_name} ({short_name})...")
+            
+            # One scrape timestamp for the whole app batch
+            scraped_at = datetime.now()
+            frames = [
+                build_review_frame(page, app_id, app_name, short_name, scraped_at)
+                for page in self._iter_app_pages(app_id, short_name)
+            ]
+            
+            logger.info(f"✅ Successfully scraped {sum(len(frame) for frame in frames)} reviews for {short_name}")
+            return frames
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to scrape {app_name}: {str(e)}")
+            return []
+    
+    def scrape_all_banks_columnar(self) -> pd.DataFrame:
+        """
+        Columnar variant of `scrape_all_banks` + `preprocess_reviews`: returns the 
+        cleaned DataFrame built from typed page frames.
+        """
+        logger.info("🚀 Starting columnar review scraping for all banks...")
+        logger.info("=" * 60)
+        
+        results = self._run_for_all_apps(self.scrape_single_app_columnar)
+        frames = [frame for app_frames in results.values() for frame in app_frames]
+        
+        logger.info(f"🎯 Total raw reviews collected: {sum(len(frame) for frame in frames)}")
+        return preprocess_review_frames(frames)
+    
+    def scrape_all_banks_streaming(self, batch_root=DATA_BATCHES_PATH):
+        """
+        Streaming variant of `scrape_all_banks`: every fetched page is cleaned and 
+        written to a batch file partitioned by bank and scrape date instead of being 
+        kept in `self.all_reviews`. Returns the total number of reviews written.
+        """
+        logger.info("🚀 Streaming review batches for all banks...")
+        logger.info("=" * 60)
+        
+        results = self._run_for_all_apps(self.stream_single_app, batch_root, datetime.now())
+        total_reviews = sum(results.values())
+        
+        logger.info(f"🎯 Total cleaned reviews written to batches: {total_reviews}")
+        return total_reviews
+    
+    def save_to_csv(self, df: pd.DataFrame, filename="reviews_initial_clean.csv", append=False):
         """
-        Save scraped reviews DataFrame to CSV file.
-        Saves to a predefined file for the next pipeline step to consume.
+        Save scraped reviews DataFrame to the typed Parquet handoff file, with a CSV 
+        export alongside. Saves to a predefined file for the next pipeline step to consume.
+        
+        With `append=True` (incremental mode) the new reviews are merged into the 
+        existing file and duplicates are dropped, instead of overwriting it.
         """
         if df.empty:
             logger.error("❌ No reviews to save!")
@@ -182,39 +925,89 @@ class BankReviewScraper:
         # Create data/raw directory if it doesn't exist
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
         
-        # Save to CSV using UTF-8 encoding
-        df.to_csv(filepath, index=False, encoding='utf-8')
+        if append:
+            try:
+                existing_df = read_reviews(filepath)
+            except FileNotFoundError:
+                existing_df = None
+            if existing_df is not None:
+                # Compare dates in one representation whichever ingest path produced `df`
+                df = df.assign(date=pd.to_datetime(df['date'], errors='coerce'))
+                df = pd.concat([df, existing_df], ignore_index=True)
+                df.drop_duplicates(subset=['review_text', 'date', 'bank'], inplace=True)
+                logger.info(f"Merged new reviews into existing file ({len(existing_df)} previously stored).")
+        
+        # Save as typed Parquet plus a UTF-8 CSV export (dates written as YYYY-MM-DD)
+        filepath = write_reviews(df, filepath)
         
         logger.info(f"💾 Saved {len(df)} initial clean reviews to {filepath}")
         return filepath
     
 
-def main():
+def parse_config_overrides(argv: list) -> dict:
+    """
+    Reads scraping_config overrides from the command line:
+    --incremental, --stream-to-batches and --http-cache=record|replay.
+    """
+    overrides = {}
+    for arg in argv:
+        if arg == '--incremental':
+            overrides['incremental'] = True
+        elif arg == '--stream-to-batches':
+            overrides['stream_to_batches'] = True
+        elif arg.startswith('--http-cache='):
+            overrides['http_cache_mode'] = arg.split('=', 1)[1]
+    return overrides
+
+def main(**config_overrides):
     """Main function to run the scraping and initial cleaning process"""
     print("🎯 10 Academy Week 2 Challenge - Task 1: Data Collection & Initial Clean")
     print("Google Play Store Review Scraper")
     print("=" * 60)
     
     # Initialize scraper
-    scraper = BankReviewScraper()
+    scraper = BankReviewScraper(**config_overrides)
     
     try:
-        # 1. Scrape all banks
-        raw_reviews = scraper.scrape_all_banks()
+        if scraper.scraping_config['stream_to_batches']:
+            # Pages are cleaned and persisted as they arrive; no single CSV is built
+            total_written = scraper.scrape_all_banks_streaming()
+            print("\n✨ Streaming collection COMPLETED SUCCESSFULLY! 🎉")
+            print(f"📁 {total_written} reviews written to partitioned batches in: {DATA_BATCHES_PATH}")
+            return total_written > 0 or scraper.scraping_config['incremental']
         
-        if not raw_reviews:
-            logger.error("💥 No reviews were collected. Exiting.")
-            return False
+        incremental = scraper.scraping_config['incremental']
         
-        # 2. Initial Preprocessing (cleaning, deduplication, date format)
-        df_cleaned = preprocess_reviews(raw_reviews)
+        if scraper.scraping_config['columnar_ingest']:
+            # 1-2. Scrape all banks into typed page frames and clean them column-wise
+            df_cleaned = scraper.scrape_all_banks_columnar()
+            if df_cleaned.empty and incremental:
+                logger.info("✅ No new reviews since the last incremental run. Nothing to save.")
+                scraper.commit_watermarks()
+                return True
+        else:
+            # 1. Scrape all banks
+            raw_reviews = scraper.scrape_all_banks()
+            
+            if not raw_reviews:
+                if incremental:
+                    logger.info("✅ No new reviews since the last incremental run. Nothing to save.")
+                    scraper.commit_watermarks()
+                    return True
+                logger.error("💥 No reviews were collected. Exiting.")
+                return False
+            
+            # 2. Initial Preprocessing (cleaning, deduplication, date format)
+            df_cleaned = preprocess_reviews(raw_reviews)
         
         if df_cleaned.empty:
             logger.error("💥 All collected reviews were dropped during preprocessing. Exiting.")
             return False
 
         # 3. Save to CSV for the next processing step
-        csv_file = scraper.save_to_csv(df_cleaned)
+        csv_file = scraper.save_to_csv(df_cleaned, append=incremental)
+        # The reviews are on disk: only now may the incremental watermarks move past them
+        scraper.commit_watermarks()
         
         print("\n✨ Initial collection and cleaning COMPLETED SUCCESSFULLY! 🎉")
         print(f"📁 Initial data saved to: {csv_file}")
@@ -230,8 +1023,13 @@ if __name__ == "__main__":
     # Ensure the data/raw directory exists before running
     os.makedirs(DATA_RAW_PATH, exist_ok=True)
     
+    # Optional: compare the legacy and columnar ingest paths on synthetic data
+    if '--benchmark-ingest' in sys.argv:
+        benchmark_ingest()
+        sys.exit(0)
+    
     # Run the scraper
-    success = main()
+    success = main(**parse_config_overrides(sys.argv[1:]))
     
     # Exit with appropriate code
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -0,0 +1,225 @@
+"""
+Near-Duplicate Review Detection (MinHash + LSH)
+10 Academy Week 2 Challenge - Task 1: Data Preprocessing
+
+Exact de-duplication on (review, bank, date) misses copy-pasted spam and trivially
+edited repeats. This module estimates the Jaccard similarity of character shingles
+with MinHash signatures and finds candidate pairs through a banded
+locality-sensitive hashing (LSH) index, so each review is only compared with the
+few reviews that share a band bucket instead of with every other review.
+
+The index is incremental: reviews can be fed chunk by chunk (as in the streaming
+preprocessing mode) and every review is checked against all reviews kept so far.
+Per kept review it holds only a 64-bit row hash and a signature truncated to
+16 bits per value (about 270 bytes); audit rows are streamed to disk as they
+are produced.
+"""
+
+import os
+import re
+import zlib
+import logging
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Universal hashing modulo a Mersenne prime, truncated to 32-bit signature values
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+AUDIT_COLUMNS = [
+    'bank', 'cluster_id', 'estimated_similarity',
+    'kept_review_hash', 'dropped_review_hash', 'dropped_review', 'dropped_date'
+]
+
+
+def optimal_lsh_bands(threshold: float, num_perm: int) -> tuple:
+    """
+    Picks (bands, rows_per_band) with bands * rows <= num_perm whose LSH S-curve
+    inflection point (1 / bands) ** (1 / rows) is closest to `threshold`.
+    """
+    best = None
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        inflection = (1 / bands) ** (1 / rows)
+        if best is None or abs(inflection - threshold) < best[0]:
+            best = (abs(inflection - threshold), bands, rows)
+    return best[1], best[2]
+
+class MinHasher:
+    """Computes MinHash signatures of character shingles of normalized review text."""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 42):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.a = rng.randint(1, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> set:
+        """Character k-shingles of the lowercased, whitespace-collapsed text."""
+        normalized = re.sub(r'\s+', ' ', str(text).lower()).strip()
+        if len(normalized) <= self.shingle_size:
+            return {normalized} if normalized else set()
+        return {normalized[i:i + self.shingle_size] for i in range(len(normalized) - self.shingle_size + 1)}
+
+    def signature(self, text: str) -> np.ndarray:
+        shingles = self.shingles(text)
+        if not shingles:
+            return np.full(self.num_perm, MAX_HASH, dtype=np.uint32)
+
+        # crc32 is stable across processes, unlike Python's salted hash()
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+        # Multiplication wraps modulo 2**64, as in the usual MinHash implementations
+        permuted = ((hashes[:, None] * self.a + self.b) % MERSENNE_PRIME) & MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+class NearDuplicateIndex:
+    """
+    Incremental LSH index over the MinHash signatures of kept (representative)
+    reviews. Each representative starts a cluster; later reviews whose estimated
+    Jaccard similarity with a representative reaches `threshold` join its cluster.
+
+    Representatives are stored in two growing arrays indexed by cluster id: the
+    row hash of the kept review and its signature, truncated to the low 16 bits of
+    each value. Two different 32-bit values then collide with probability 2**-16,
+    which changes the similarity estimate by less than 0.0001.
+    """
+
+    def __init__(self, hasher: MinHasher, threshold: float):
+        self.hasher = hasher
+        self.threshold = threshold
+        self.bands, self.rows = optimal_lsh_bands(threshold, hasher.num_perm)
+        self.buckets = [{} for _ in range(self.bands)]
+        self.size = 0
+        self.signatures = np.empty((0, hasher.num_perm), dtype=np.uint16)
+        self.row_hashes = np.empty(0, dtype=np.uint64)
+
+    def _append(self, signature: np.ndarray, row_hash: int) -> int:
+        """Stores a new representative, doubling the arrays when full. Returns its cluster id."""
+        if self.size == len(self.row_hashes):
+            capacity = max(64, 2 * self.size)
+            signatures = np.empty((capacity, self.hasher.num_perm), dtype=np.uint16)
+            signatures[:self.size] = self.signatures[:self.size]
+            row_hashes = np.empty(capacity, dtype=np.uint64)
+            row_hashes[:self.size] = self.row_hashes[:self.size]
+            self.signatures, self.row_hashes = signatures, row_hashes
+        cluster_id = self.size
+        self.signatures[cluster_id] = signature
+        self.row_hashes[cluster_id] = row_hash
+        self.size += 1
+        return cluster_id
+
+    def _band_keys(self, signature: np.ndarray) -> list:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def match_or_add(self, text: str, row_hash: int = 0) -> tuple:
+        """
+        Returns (cluster_id, similarity). `similarity` is None when the text became
+        a new representative (stored with `row_hash`), otherwise the estimated
+        Jaccard similarity with the representative of the cluster it was matched to.
+        """
+        signature = self.hasher.signature(text)
+        band_keys = self._band_keys(signature)
+        short_signature = signature.astype(np.uint16)
+
+        candidates = set()
+        for band, key in enumerate(band_keys):
+            candidates.update(self.buckets[band].get(key, ()))
+
+        best_cluster, best_similarity = None, 0.0
+        for cluster_id in candidates:
+            similarity = float(np.mean(self.signatures[cluster_id] == short_signature))
+            if similarity >= self.threshold and similarity > best_similarity:
+                best_cluster, best_similarity = cluster_id, similarity
+        if best_cluster is not None:
+            return best_cluster, best_similarity
+
+        cluster_id = self._append(short_signature, row_hash)
+        for band, key in enumerate(band_keys):
+            self.buckets[band].setdefault(key, []).append(cluster_id)
+        return cluster_id, None
+
+class NearDuplicateFilter:
+    """
+    Removes near-duplicate reviews within each bank, keeping the first occurrence,
+    and records every cluster with more than one member for auditing.
+
+    Reviews shorter than `min_length` characters are passed through untouched: many
+    different users legitimately write "good app" or "nice", and collapsing those
+    would distort the per-bank sentiment more than the spam does.
+
+    Kept reviews are identified in the audit by their row hash (`review_row_hashes`
+    of bank, text and date). With `audit_filepath` the audit rows of every `filter`
+    call are appended to that CSV file instead of being kept in memory.
+    """
+
+    def __init__(self, threshold: float = 0.8, shingle_size: int = 5, num_perm: int = 128,
+                 min_length: int = 30, text_col: str = 'review', group_col: str = 'bank',
+                 audit_filepath: str = None):
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+        self.threshold = threshold
+        self.min_length = min_length
+        self.text_col = text_col
+        self.group_col = group_col
+        self.indexes = {}  # bank -> NearDuplicateIndex
+        self.audit_filepath = audit_filepath
+        self.audit_records = []
+        self.dropped_count = 0
+        self.duplicate_clusters = set()
+        if audit_filepath is not None:
+            # Start a fresh audit file with just the header
+            os.makedirs(os.path.dirname(os.path.abspath(audit_filepath)), exist_ok=True)
+            pd.DataFrame(columns=AUDIT_COLUMNS).to_csv(audit_filepath, index=False, encoding='utf-8')
+
+    def review_row_hashes(self, df: pd.DataFrame) -> np.ndarray:
+        """64-bit hashes of (bank, text, date) that identify kept reviews in the audit."""
+        key_columns = [self.group_col, self.text_col] + (['date'] if 'date' in df.columns else [])
+        return pd.util.hash_pandas_object(df[key_columns].astype(str), index=False).to_numpy()
+
+    def filter(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Returns the rows of `df` that are not near-duplicates of any review kept so far."""
+        keep = np.ones(len(df), dtype=bool)
+        dates = df['date'] if 'date' in df.columns else pd.Series(None, index=df.index)
+        row_hashes = self.review_row_hashes(df)
+        audit_records = []
+
+        for position, (group, text, date) in enumerate(zip(df[self.group_col], df[self.text_col], dates)):
+            if len(str(text).strip()) < self.min_length:
+                continue
+
+            index = self.indexes.get(group)
+            if index is None:
+                index = self.indexes[group] = NearDuplicateIndex(self.hasher, self.threshold)
+
+            cluster_id, similarity = index.match_or_add(text, row_hashes[position])
+            if similarity is None:
+                continue
+
+            keep[position] = False
+            self.duplicate_clusters.add((group, cluster_id))
+            audit_records.append({
+                'bank': group,
+                'cluster_id': f"{group}-{cluster_id}",
+                'estimated_similarity': round(similarity, 3),
+                'kept_review_hash': f"{int(index.row_hashes[cluster_id]):016x}",
+                'dropped_review_hash': f"{int(row_hashes[position]):016x}",
+                'dropped_review': text,
+                'dropped_date': date,
+            })
+
+        self.dropped_count += len(audit_records)
+        if self.audit_filepath is None:
+            self.audit_records.extend(audit_records)
+        elif audit_records:
+            pd.DataFrame(audit_records, columns=AUDIT_COLUMNS).to_csv(
+                self.audit_filepath, mode='a', header=False, index=False, encoding='utf-8'
+            )
+        return df[keep]
+
+    def audit_frame(self) -> pd.DataFrame:
+        """One row per dropped review, with the row hash of the kept representative of its cluster."""
+        if self.audit_filepath is not None:
+            return pd.read_csv(self.audit_filepath, encoding='utf-8', dtype={'kept_review_hash': str, 'dropped_review_hash': str})
+        return pd.DataFrame(self.audit_records, columns=AUDIT_COLUMNS)
@@ -10,9 +10,14 @@ listed in requirements.txt are installed via 'pip install -r requirements.txt'.
 """
 
 import pandas as pd
+import numpy as np
 import logging
 import os
 import sys
+import time
+import hashlib
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
 # Import for language detection
 from langdetect import detect, DetectorFactory
 from langdetect.lang_detect_exception import LangDetectException
@@ -24,14 +29,57 @@ DetectorFactory.seed = 42
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 DATA_RAW_PATH = os.path.join(PROJECT_ROOT, 'data', 'raw')
 DATA_PROCESSED_PATH = os.path.join(PROJECT_ROOT, 'data', 'processed')
+DATA_CACHE_PATH = os.path.join(PROJECT_ROOT, 'data', 'cache')
+
+# Make the shared 'src.common' helpers importable when run as a script
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+from src.common.review_format import read_reviews, write_reviews, iter_reviews
+from src.data_preprocessing.near_duplicates import NearDuplicateFilter
 
 INPUT_FILENAME = "reviews_initial_clean.csv"
 OUTPUT_FILENAME = "final_bank_reviews_constrained.csv"
 
+# Near-duplicate removal (MinHash/LSH over character shingles, within each bank)
+NEAR_DUPLICATE_REMOVAL = True
+NEAR_DUPLICATE_THRESHOLD = 0.8     # Estimated Jaccard similarity at which reviews count as duplicates
+NEAR_DUPLICATE_SHINGLE_SIZE = 5    # Characters per shingle
+NEAR_DUPLICATE_NUM_PERM = 128      # MinHash signature length
+NEAR_DUPLICATE_MIN_LENGTH = 30     # Shorter reviews ("good app", "nice") are never treated as near-duplicates
+NEAR_DUPLICATE_AUDIT_FILENAME = "near_duplicate_clusters.csv"
+
+# Chunked streaming mode for inputs that do not fit in memory
+STREAMING_MODE = False
+CHUNK_SIZE = 50_000
+
 # Define constraints
 MIN_REVIEWS = 400
 MAX_REVIEWS = 700
 
+# Streaming reservoir sampling: fixed seed, and optional stratification (None, 'rating' or 'month')
+SAMPLING_SEED = 42
+SAMPLING_STRATIFY_BY = None
+
+# Language detection parallelism: worker processes (1 = serial) and reviews per task
+LANGDETECT_WORKERS = os.cpu_count() or 1
+LANGDETECT_CHUNK_SIZE = 500
+
+# Persistent language detection cache (least recently used entries evicted beyond the limit)
+LANGDETECT_CACHE_FILEPATH = os.path.join(DATA_CACHE_PATH, 'langdetect_cache.sqlite')
+LANGDETECT_CACHE_MAX_ENTRIES = 500_000
+
+# Fast-path language tiers resolved with vectorized string ops before langdetect
+NON_LATIN_SCRIPT_RATIO = 0.5   # Share of letters in another script that marks a review non-English
+SHORT_REVIEW_MAX_WORDS = 4     # Pure-ASCII reviews up to this many words may be resolved by the lexicon
+SHORT_ENGLISH_LEXICON = frozenset({
+    'a', 'an', 'and', 'app', 'application', 'amazing', 'awesome', 'bad', 'bank', 'banking',
+    'best', 'boring', 'cool', 'done', 'easy', 'excellent', 'fantastic', 'fast', 'fine', 'fix',
+    'good', 'great', 'helpful', 'i', 'is', 'it', 'keep', 'like', 'love', 'much', 'my', 'nice',
+    'not', 'ok', 'okay', 'perfect', 'please', 'poor', 'really', 'satisfied', 'service', 'simple',
+    'slow', 'so', 'super', 'thank', 'thanks', 'the', 'this', 'too', 'up', 'update', 'useful',
+    'useless', 'very', 'well', 'wonderful', 'work', 'working', 'works', 'worst', 'wow', 'you'
+})
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -127,12 +175,208 @@ def is_english(text: str) -> bool:
         logger.debug(f"Language detection failed for text: {text[:30]}... Error: {e}")
         return False
 
-def filter_english_reviews(df: pd.DataFrame) -> pd.DataFrame:
+def _init_langdetect_worker(seed: int):
+    """Process pool initializer: applies the parent's langdetect seed in each worker."""
+    DetectorFactory.seed = seed
+
+def _detect_english_chunk(texts: list) -> list:
+    """Runs `is_english` over one chunk of texts inside a worker process."""
+    return [is_english(text) for text in texts]
+
+def detect_english(texts: list, n_workers: int = LANGDETECT_WORKERS, chunk_size: int = LANGDETECT_CHUNK_SIZE) -> list:
+    """
+    Returns one `is_english` flag per text, in input order.
+    
+    With n_workers > 1 the texts are split into chunks that are detected on a 
+    process pool. Results are identical to the serial path: langdetect re-seeds its 
+    detector from `DetectorFactory.seed` for every text, and the seed is passed to 
+    each worker explicitly so it also holds on spawn-based platforms.
+    """
+    if n_workers <= 1 or len(texts) <= chunk_size:
+        return [is_english(text) for text in texts]
+    
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        initializer=_init_langdetect_worker,
+        initargs=(DetectorFactory.seed,)
+    ) as executor:
+        # executor.map yields chunk results in submission order
+        return [flag for chunk_flags in executor.map(_detect_english_chunk, chunks) for flag in chunk_flags]
+
+class LanguageDetectionCache:
+    """
+    SQLite-backed store of language detection results, keyed by a hash of the 
+    normalized review text, that persists across pipeline runs.
+    
+    Every lookup refreshes the entry's `last_used` stamp; `evict()` drops the least 
+    recently used entries once the table grows beyond `max_entries`.
+    """
+    
+    # Stay well below SQLite's limit on bound parameters per statement
+    QUERY_BATCH_SIZE = 500
+    
+    def __init__(self, filepath: str = LANGDETECT_CACHE_FILEPATH, max_entries: int = LANGDETECT_CACHE_MAX_ENTRIES):
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(filepath)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS langdetect_cache ("
+            "text_hash TEXT PRIMARY KEY, is_english INTEGER NOT NULL, last_used INTEGER NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_langdetect_last_used ON langdetect_cache (last_used)")
+        self.conn.commit()
+    
+    @staticmethod
+    def text_key(normalized_text: str) -> str:
+        return hashlib.blake2b(normalized_text.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def get_many(self, keys: list) -> dict:
+        """Returns {key: is_english} for the cached keys and refreshes their last_used stamp."""
+        found = {}
+        for i in range(0, len(keys), self.QUERY_BATCH_SIZE):
+            batch = keys[i:i + self.QUERY_BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            rows = self.conn.execute(
+                f"SELECT text_hash, is_english FROM langdetect_cache WHERE text_hash IN ({placeholders})", batch
+            ).fetchall()
+            found.update((key, bool(flag)) for key, flag in rows)
+        
+        now = time.time_ns()
+        self.conn.executemany("UPDATE langdetect_cache SET last_used = ? WHERE text_hash = ?", [(now, key) for key in found])
+        self.conn.commit()
+        
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+    
+    def put_many(self, results: dict):
+        """Stores {key: is_english} detection results."""
+        now = time.time_ns()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO langdetect_cache (text_hash, is_english, last_used) VALUES (?, ?, ?)",
+            [(key, int(flag), now) for key, flag in results.items()]
+        )
+        self.conn.commit()
+    
+    def evict(self) -> int:
+        """Deletes least recently used entries beyond `max_entries`; returns how many were removed."""
+        (size,) = self.conn.execute("SELECT COUNT(*) FROM langdetect_cache").fetchone()
+        excess = size - self.max_entries
+        if excess <= 0:
+            return 0
+        self.conn.execute(
+            "DELETE FROM langdetect_cache WHERE text_hash IN "
+            "(SELECT text_hash FROM langdetect_cache ORDER BY last_used ASC LIMIT ?)", (excess,)
+        )
+        self.conn.commit()
+        return excess
+    
+    def close(self):
+        self.conn.close()
+
+def detect_english_cached(texts: pd.Series, n_workers: int = LANGDETECT_WORKERS) -> list:
+    """
+    `detect_english` with a persistent cache in front of it.
+    
+    Texts are normalized (lowercased, whitespace collapsed) and hashed; each unique 
+    key is detected at most once per run, and only keys not seen in earlier runs 
+    are sent to langdetect (using the first original text with that key).
+    """
+    normalized = texts.fillna('').astype(str).str.lower().str.split().str.join(' ')
+    keys = [LanguageDetectionCache.text_key(text) for text in normalized]
+    
+    # First original text for every unique key
+    representatives = dict(zip(reversed(keys), reversed(texts.tolist())))
+    unique_keys = list(representatives)
+    
+    cache = LanguageDetectionCache()
+    try:
+        flags_by_key = cache.get_many(unique_keys)
+        missing_keys = [key for key in unique_keys if key not in flags_by_key]
+        
+        detected = detect_english([representatives[key] for key in missing_keys], n_workers=n_workers)
+        new_results = dict(zip(missing_keys, detected))
+        cache.put_many(new_results)
+        flags_by_key.update(new_results)
+        evicted = cache.evict()
+        
+        logger.info(
+            f"Language detection cache: {len(texts)} reviews, {len(unique_keys)} unique texts, "
+            f"{cache.hits} hits, {cache.misses} misses sent to langdetect, {evicted} entries evicted."
+        )
+    finally:
+        cache.close()
+    
+    return [flags_by_key[key] for key in keys]
+
+def classify_language_fast_path(texts: pd.Series) -> pd.DataFrame:
+    """
+    Vectorized pre-classification of review language from Unicode script ratios and 
+    length rules, evaluated over the whole column at once.
+    
+    Returns a DataFrame aligned with `texts` with columns:
+    - 'is_english': True / False for resolved rows, None for ambiguous rows
+    - 'tier': which rule resolved the row:
+        'no_letters'    -> empty, emoji-only, digits/punctuation (langdetect raises on these)
+        'ethiopic'      -> mostly Ethiopic script (Amharic, Tigrinya, ...)
+        'non_latin'     -> mostly another non-Latin script
+        'short_english' -> short pure-ASCII review made only of common English review words
+        'langdetect'    -> ambiguous, must go through the probabilistic detector
+    """
+    texts = texts.fillna('').astype(str)
+    
+    letters = texts.str.count(r'[^\W\d_]')
+    ethiopic = texts.str.count(r'[\u1200-\u139F\u2D80-\u2DDF\uAB00-\uAB2F]')
+    latin = texts.str.count(r'[A-Za-z\u00C0-\u024F]')
+    safe_letters = letters.where(letters > 0, 1)
+    
+    tier = pd.Series('langdetect', index=texts.index, dtype=object)
+    is_english = pd.Series(None, index=texts.index, dtype=object)
+    
+    # Short pure-ASCII reviews whose every word is in the English review lexicon
+    is_short_ascii = texts.str.fullmatch(r'[\x00-\x7F]*') & (texts.str.split().str.len() <= SHORT_REVIEW_MAX_WORDS)
+    short_words = texts[is_short_ascii].str.lower().str.findall(r'[a-z]+').explode()
+    all_in_lexicon = short_words.isin(SHORT_ENGLISH_LEXICON) & short_words.notna()
+    short_english = all_in_lexicon.groupby(level=0).all().reindex(texts.index, fill_value=False)
+    
+    # Later rules take precedence, so the no-letters rule always wins
+    rules = [
+        ('short_english', short_english, True),
+        ('non_latin', (letters - latin) / safe_letters >= NON_LATIN_SCRIPT_RATIO, False),
+        ('ethiopic', ethiopic / safe_letters >= NON_LATIN_SCRIPT_RATIO, False),
+        ('no_letters', letters == 0, False),
+    ]
+    for name, mask, value in rules:
+        tier[mask] = name
+        is_english[mask] = value
+    
+    return pd.DataFrame({'is_english': is_english, 'tier': tier})
+
+def filter_english_reviews(df: pd.DataFrame, n_workers: int = LANGDETECT_WORKERS, use_cache: bool = True,
+                           use_fast_path: bool = True) -> pd.DataFrame:
     """Filters the DataFrame to include only reviews detected as English."""
     initial_count = len(df)
     
-    # Apply language detection
-    df['is_english'] = df['review'].apply(is_english)
+    # 1. Resolve the obvious rows with vectorized script/length rules
+    if use_fast_path:
+        fast_path = classify_language_fast_path(df['review'])
+        tier_shares = fast_path['tier'].value_counts(normalize=True)
+        logger.info("Language fast path tiers: " + ", ".join(f"{tier}={share:.1%}" for tier, share in tier_shares.items()))
+        is_english = fast_path['is_english']
+    else:
+        is_english = pd.Series(None, index=df.index, dtype=object)
+    
+    # 2. Apply language detection to the ambiguous rows (cached, and in parallel when n_workers > 1)
+    ambiguous = is_english.isna()
+    if ambiguous.any():
+        if use_cache:
+            is_english[ambiguous] = detect_english_cached(df.loc[ambiguous, 'review'], n_workers=n_workers)
+        else:
+            is_english[ambiguous] = detect_english(df.loc[ambiguous, 'review'].tolist(), n_workers=n_workers)
+    df['is_english'] = is_english.astype(bool)
     
     # Filter the DataFrame
     df_english = df[df['is_english']].drop(columns=['is_english'])
@@ -143,6 +387,32 @@ def filter_english_reviews(df: pd.DataFrame) -> pd.DataFrame:
     return df_english
 
 
+def benchmark_language_detection(texts: list, n_workers: int = LANGDETECT_WORKERS) -> dict:
+    """
+    Times serial vs process-pool language detection on the same texts, checks that 
+    both return identical flags, and reports throughput in reviews per second.
+    """
+    timings = {}
+    flags = {}
+    for label, workers in [('serial', 1), (f'parallel ({n_workers} workers)', n_workers)]:
+        started = time.perf_counter()
+        flags[label] = detect_english(texts, n_workers=workers)
+        timings[label] = time.perf_counter() - started
+    
+    serial_flags, parallel_flags = flags.values()
+    report = {
+        label: {'seconds': round(elapsed, 2), 'reviews_per_sec': round(len(texts) / elapsed, 1)}
+        for label, elapsed in timings.items()
+    }
+    report['identical_results'] = serial_flags == parallel_flags
+    
+    logger.info(f"Language detection benchmark on {len(texts)} reviews:")
+    for label, elapsed in timings.items():
+        logger.info(f"   {label}: {elapsed:.2f}s ({len(texts) / elapsed:.1f} reviews/sec)")
+    logger.info(f"   Speed-up: {timings['serial'] / list(timings.values())[1]:.2f}x, identical results: {report['identical_results']}")
+    return report
+
+
 def apply_review_constraints(df: pd.DataFrame) -> pd.DataFrame:
     """
     Applies the 400 minimum and 700 maximum review constraint per bank.
@@ -160,7 +430,7 @@ def apply_review_constraints(df: pd.DataFrame) -> pd.DataFrame:
     
     # Group by bank and apply the sampling/filtering logic
     df_constrained = (
-        df.groupby('bank', group_keys=False)
+        df.groupby('bank', group_keys=False, observed=True)
         .apply(constrain_group)
     )
     
@@ -192,10 +462,231 @@ def constrain_group(group: pd.DataFrame) -> pd.DataFrame:
         logger.info(f"Bank {bank_name}: {current_count} reviews found. Constraint met. Keeping all.")
         return group
 
+def create_near_duplicate_filter() -> NearDuplicateFilter:
+    """Builds a near-duplicate filter from the module configuration, streaming its audit to disk."""
+    return NearDuplicateFilter(
+        threshold=NEAR_DUPLICATE_THRESHOLD,
+        shingle_size=NEAR_DUPLICATE_SHINGLE_SIZE,
+        num_perm=NEAR_DUPLICATE_NUM_PERM,
+        min_length=NEAR_DUPLICATE_MIN_LENGTH,
+        audit_filepath=os.path.join(DATA_PROCESSED_PATH, NEAR_DUPLICATE_AUDIT_FILENAME)
+    )
+
+def remove_near_duplicates(df: pd.DataFrame, near_duplicate_filter: NearDuplicateFilter) -> pd.DataFrame:
+    """Drops reviews that are near-duplicates of an earlier review of the same bank."""
+    initial_count = len(df)
+    df_unique = near_duplicate_filter.filter(df)
+    logger.info(f"Near-duplicate removal: Dropped {initial_count - len(df_unique)} near-duplicate reviews "
+                f"(threshold {NEAR_DUPLICATE_THRESHOLD}, {NEAR_DUPLICATE_SHINGLE_SIZE}-char shingles).")
+    return df_unique
+
+def report_near_duplicate_audit(near_duplicate_filter: NearDuplicateFilter):
+    """
+    Logs a summary of the near-duplicate audit (kept review hash vs. each dropped 
+    review); the audit file itself is streamed by the filter while it runs.
+    """
+    logger.info(f"Near-duplicate audit: {len(near_duplicate_filter.duplicate_clusters)} clusters "
+                f"({near_duplicate_filter.dropped_count} dropped reviews) in {near_duplicate_filter.audit_filepath}")
+
+class CrossChunkDeduplicator:
+    """
+    Drops rows whose (review, bank, date) key was already seen in an earlier chunk.
+    
+    Keys are stored as 64-bit hashes in one sorted numpy array (8 bytes per unique 
+    review), so memory stays far below that of the rows themselves.
+    """
+    
+    KEY_COLUMNS = ['review', 'bank', 'date']
+    
+    def __init__(self):
+        self.seen_hashes = np.empty(0, dtype=np.uint64)
+    
+    def filter_new(self, df: pd.DataFrame) -> pd.DataFrame:
+        hashes = pd.util.hash_pandas_object(df[self.KEY_COLUMNS], index=False).to_numpy()
+        
+        # Binary search against the sorted set of hashes from earlier chunks
+        positions = np.searchsorted(self.seen_hashes, hashes)
+        positions[positions == len(self.seen_hashes)] = 0
+        already_seen = (self.seen_hashes[positions] == hashes) if len(self.seen_hashes) else np.zeros(len(hashes), dtype=bool)
+        
+        # Within-chunk duplicates are handled by perform_initial_cleaning already
+        new_hashes = np.unique(hashes[~already_seen])
+        # Merging two sorted runs is linear with a stable (timsort) sort
+        self.seen_hashes = np.sort(np.concatenate([self.seen_hashes, new_hashes]), kind='stable')
+        
+        if already_seen.any():
+            logger.info(f"Removed {int(already_seen.sum())} rows duplicated from earlier chunks.")
+        return df[~already_seen]
+
+def run_streaming_pipeline(input_filepath: str, output_filepath: str, chunk_size: int = CHUNK_SIZE):
+    """
+    Chunked variant of `main` for raw files larger than memory.
+    
+    The raw CSV is read `chunk_size` rows at a time; every chunk is cleaned, 
+    deduplicated against all earlier chunks and language-filtered, and the English 
+    reviews are offered to a seeded per-bank reservoir sampler that applies the 
+    constraints in the same pass. Only the sampled rows are kept.
+    """
+    deduplicator = CrossChunkDeduplicator()
+    near_duplicate_filter = create_near_duplicate_filter() if NEAR_DUPLICATE_REMOVAL else None
+    sampler = BankReservoirSampler()
+    rows_read, rows_english = 0, 0
+    
+    try:
+        reader = iter_reviews(input_filepath, chunk_size)
+        for chunk_number, chunk in enumerate(reader, start=1):
+            rows_read += len(chunk)
+            logger.info(f"Processing chunk {chunk_number} ({len(chunk)} rows, {rows_read} read so far)...")
+            
+            df_cleaned = perform_initial_cleaning(chunk)
+            if 'review' not in df_cleaned.columns:
+                # Column validation failed; the error has been logged already
+                return
+            
+            df_new = deduplicator.filter_new(df_cleaned)
+            if near_duplicate_filter is not None:
+                # The LSH index spans all chunks seen so far
+                df_new = remove_near_duplicates(df_new, near_duplicate_filter)
+            if df_new.empty:
+                continue
+            
+            df_english = filter_english_reviews(df_new)
+            rows_english += len(df_english)
+            
+            # Constraints are applied in the same pass with per-bank reservoirs
+            sampler.update(df_english)
+    except FileNotFoundError:
+        logger.error(f"Input file not found: {input_filepath}. Please ensure the scraping script has been run.")
+        return
+    
+    logger.info(f"Streaming pass complete: {rows_read} rows read, {rows_english} English reviews offered to the sampler.")
+    if near_duplicate_filter is not None:
+        report_near_duplicate_audit(near_duplicate_filter)
+    if rows_english == 0:
+        logger.error("No reviews left after cleaning and language filtering.")
+        return
+    
+    df_constrained = sampler.result()
+    save_data(df_constrained, output_filepath)
+    generate_report(df_constrained, output_filepath)
+
+class BankReservoirSampler:
+    """
+    Single-pass, seeded reservoir sampler enforcing MIN_REVIEWS/MAX_REVIEWS per bank 
+    over an iterator of chunks, without ever holding the full filtered data.
+    
+    One reservoir (Algorithm R) of up to `max_reviews` rows is kept per bank, or per 
+    (bank, stratum) when `stratify_by` is 'rating' or 'month'. When stratified, the 
+    final per-bank sample is allocated across strata in proportion to how many rows 
+    each stratum had (largest remainder), so the sample mirrors the bank's rating or 
+    month distribution.
+    """
+    
+    STRATIFY_OPTIONS = (None, 'rating', 'month')
+    
+    def __init__(self, max_reviews: int = MAX_REVIEWS, min_reviews: int = MIN_REVIEWS,
+                 seed: int = SAMPLING_SEED, stratify_by: str = SAMPLING_STRATIFY_BY):
+        if stratify_by not in self.STRATIFY_OPTIONS:
+            raise ValueError(f"stratify_by must be one of {self.STRATIFY_OPTIONS}, got {stratify_by!r}")
+        self.max_reviews = max_reviews
+        self.min_reviews = min_reviews
+        self.stratify_by = stratify_by
+        self.rng = np.random.default_rng(seed)
+        self.columns = None
+        self.reservoirs = {}  # (bank, stratum) -> list of row tuples
+        self.seen = {}        # (bank, stratum) -> number of rows offered so far
+    
+    def _strata(self, chunk: pd.DataFrame) -> pd.Series:
+        if self.stratify_by == 'rating':
+            return chunk['rating']
+        if self.stratify_by == 'month':
+            return pd.to_datetime(chunk['date'], errors='coerce').dt.strftime('%Y-%m')
+        return pd.Series('all', index=chunk.index)
+    
+    def update(self, chunk: pd.DataFrame):
+        """Offers every row of `chunk` to its bank's (stratum's) reservoir."""
+        if chunk.empty:
+            return
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+        
+        for (bank, stratum), group in chunk.groupby([chunk['bank'], self._strata(chunk)], sort=False, dropna=False, observed=True):
+            key = (bank, stratum)
+            reservoir = self.reservoirs.setdefault(key, [])
+            seen = self.seen.get(key, 0)
+            
+            # Fill the reservoir until it holds max_reviews rows
+            n_fill = min(max(self.max_reviews - seen, 0), len(group))
+            if n_fill:
+                reservoir.extend(group.iloc[:n_fill].itertuples(index=False, name=None))
+            
+            # Row number i (0-based in the stream) replaces slot j ~ U[0, i] if j < max_reviews
+            n_rest = len(group) - n_fill
+            if n_rest:
+                stream_positions = seen + n_fill + np.arange(n_rest)
+                slots = np.floor(self.rng.random(n_rest) * (stream_positions + 1)).astype(np.int64)
+                accepted = np.flatnonzero(slots < self.max_reviews)
+                if len(accepted):
+                    rows = group.iloc[n_fill + accepted].itertuples(index=False, name=None)
+                    for slot, row in zip(slots[accepted], rows):
+                        reservoir[slot] = row
+            
+            self.seen[key] = seen + len(group)
+    
+    def _allocate(self, counts: np.ndarray) -> np.ndarray:
+        """Splits max_reviews across strata in proportion to `counts` (largest remainder)."""
+        quotas = self.max_reviews * counts / counts.sum()
+        allocation = np.floor(quotas).astype(np.int64)
+        remainder = self.max_reviews - allocation.sum()
+        allocation[np.argsort(-(quotas - allocation), kind='stable')[:remainder]] += 1
+        return np.minimum(allocation, counts)
+    
+    def result(self) -> pd.DataFrame:
+        """Returns the constrained sample for all banks seen so far."""
+        rows = []
+        banks = list(dict.fromkeys(bank for bank, _ in self.reservoirs))
+        
+        for bank in banks:
+            keys = [key for key in self.reservoirs if key[0] == bank]
+            counts = np.array([self.seen[key] for key in keys])
+            total = int(counts.sum())
+            
+            if total > self.max_reviews:
+                logger.info(f"Bank {bank}: {total} reviews found. Sampling down to {self.max_reviews} reviews.")
+                if len(keys) == 1:
+                    rows.extend(self.reservoirs[keys[0]])
+                else:
+                    for key, n_keep in zip(keys, self._allocate(counts)):
+                        reservoir = self.reservoirs[key]
+                        chosen = self.rng.choice(len(reservoir), size=min(n_keep, len(reservoir)), replace=False)
+                        rows.extend(reservoir[i] for i in sorted(chosen))
+            else:
+                if total < self.min_reviews:
+                    logger.warning(f"Bank {bank}: Only {total} reviews found. Minimum target ({self.min_reviews}) not met. Keeping all.")
+                else:
+                    logger.info(f"Bank {bank}: {total} reviews found. Constraint met. Keeping all.")
+                for key in keys:
+                    rows.extend(self.reservoirs[key])
+        
+        return pd.DataFrame(rows, columns=self.columns)
+
+def constrain_review_stream(chunks, seed: int = SAMPLING_SEED, stratify_by: str = SAMPLING_STRATIFY_BY) -> pd.DataFrame:
+    """
+    Streaming counterpart of `apply_review_constraints`: one pass over an iterable of 
+    DataFrame chunks with a seeded per-bank reservoir sampler.
+    """
+    stratification = f", stratified by {stratify_by}" if stratify_by else ""
+    logger.info(f"Applying review count constraints (Min: {MIN_REVIEWS}, Max: {MAX_REVIEWS}) per bank with reservoir sampling{stratification}...")
+    
+    sampler = BankReservoirSampler(seed=seed, stratify_by=stratify_by)
+    for chunk in chunks:
+        sampler.update(chunk)
+    return sampler.result()
+
 def load_data(filepath: str) -> pd.DataFrame:
-    """Loads the CSV file from the raw data directory."""
+    """Loads the typed Parquet handoff file (or its CSV fallback) from the raw data directory."""
     try:
-        df = pd.read_csv(filepath, encoding='utf-8')
+        df = read_reviews(filepath)
         logger.info(f"Successfully loaded {len(df)} reviews from {filepath}")
         return df
     except FileNotFoundError:
@@ -206,12 +697,10 @@ def load_data(filepath: str) -> pd.DataFrame:
         return pd.DataFrame()
 
 def save_data(df: pd.DataFrame, filepath: str):
-    """Saves the final processed DataFrame to CSV."""
-    # Create data/processed directory if it doesn't exist
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-    
-    df.to_csv(filepath, index=False, encoding='utf-8')
-    logger.info(f"💾 Saved {len(df)} final constrained reviews to {filepath}")
+    """Saves the final processed DataFrame as typed Parquet, with a CSV export alongside."""
+    # write_reviews creates the data/processed directory if it doesn't exist
+    saved_filepath = write_reviews(df, filepath)
+    logger.info(f"💾 Saved {len(df)} final constrained reviews to {saved_filepath}")
 
 def generate_report(df: pd.DataFrame, final_filepath: str):
     """Generates a final report on the constrained dataset."""
@@ -219,7 +708,7 @@ def generate_report(df: pd.DataFrame, final_filepath: str):
     print("📊 FINAL DATA PROCESSING REPORT")
     print("=" * 60)
     
-    bank_counts = df['bank'].value_counts()
+    bank_counts = df['bank'].astype(str).value_counts()
     total_reviews = len(df)
     
     print(f"Total Final Reviews (English & Constrained): {total_reviews}")
@@ -247,6 +736,11 @@ def main():
     input_filepath = os.path.join(DATA_RAW_PATH, INPUT_FILENAME)
     output_filepath = os.path.join(DATA_PROCESSED_PATH, OUTPUT_FILENAME)
     
+    if STREAMING_MODE:
+        # Chunked processing for raw files that do not fit in memory
+        run_streaming_pipeline(input_filepath, output_filepath)
+        return
+    
     # 1. Load the initial clean data
     df = load_data(input_filepath)
     
@@ -259,6 +753,12 @@ def main():
     if df_cleaned.empty:
         # Stop if column validation failed
         return
+    
+    # 2b. Remove near-duplicate reviews (copy-pasted spam, trivially edited repeats)
+    if NEAR_DUPLICATE_REMOVAL:
+        near_duplicate_filter = create_near_duplicate_filter()
+        df_cleaned = remove_near_duplicates(df_cleaned, near_duplicate_filter)
+        report_near_duplicate_audit(near_duplicate_filter)
         
     # 3. Filter data to include only English language reviews
     df_english = filter_english_reviews(df_cleaned)
@@ -273,4 +773,9 @@ def main():
     generate_report(df_constrained, output_filepath)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if '--benchmark-langdetect' in sys.argv:
+        # Benchmark language detection on the cleaned raw reviews
+        df_bench = perform_initial_cleaning(load_data(os.path.join(DATA_RAW_PATH, INPUT_FILENAME)))
+        benchmark_language_detection(df_bench['review'].tolist())
+    else:
+        main()
\ No newline at end of file
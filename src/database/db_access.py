@@ -0,0 +1,198 @@
+"""
+Shared PostgreSQL Access Layer
+
+Used by Task 3 (storage) and Task 4 (analysis):
+- reads DB_CONFIG from config/db_config.py only when a connection is first needed,
+  so importing this module has no side effects
+- hands out connections from one thread-safe pool (psycopg2 ThreadedConnectionPool)
+- streams large results in chunks through named (server-side) cursors instead of
+  loading them into client memory at once
+- runs independent report queries concurrently on pooled connections
+
+STORAGE_BACKEND selects the engine: 'postgres' (the server in config/db_config.py)
+or 'duckdb', an embedded columnar database file that needs no server. All helpers
+below work with both.
+"""
+
+import os
+import uuid
+import runpy
+import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from psycopg2 import pool
+
+# DuckDB is optional: without it only the PostgreSQL backend is available
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CONFIG_FILEPATH = os.path.join(PROJECT_ROOT, 'config', 'db_config.py')
+
+# --- Storage Backend ---
+# 'postgres' or 'duckdb' (can be overridden with the STORAGE_BACKEND environment variable)
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'postgres')
+DUCKDB_FILEPATH = os.path.join(PROJECT_ROOT, 'data', 'processed', 'bank_reviews.duckdb')
+
+# --- Pool and Cursor Settings ---
+POOL_MIN_CONNECTIONS = 1
+POOL_MAX_CONNECTIONS = 4
+# Rows fetched per round trip by server-side cursors
+FETCH_SIZE = 10_000
+
+_pool = None
+_duckdb_conn = None
+_pool_lock = threading.Lock()
+
+
+def load_db_config(filepath: str = CONFIG_FILEPATH) -> dict:
+    """
+    Runs config/db_config.py in its own namespace and returns its DB_CONFIG dictionary.
+    Raises FileNotFoundError if the file is missing and ValueError if it defines no
+    valid DB_CONFIG.
+    """
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(f"Database config not found: {filepath}. Create config/db_config.py with a DB_CONFIG dictionary.")
+    db_config = runpy.run_path(filepath).get('DB_CONFIG')
+    if not isinstance(db_config, dict):
+        raise ValueError(f"{filepath} did not define a valid DB_CONFIG dictionary.")
+    return db_config
+
+def get_pool() -> pool.ThreadedConnectionPool:
+    """Returns the shared connection pool, creating it (and reading the config) on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = pool.ThreadedConnectionPool(POOL_MIN_CONNECTIONS, POOL_MAX_CONNECTIONS, **load_db_config())
+            logger.info(f"Opened PostgreSQL connection pool ({POOL_MIN_CONNECTIONS}-{POOL_MAX_CONNECTIONS} connections).")
+        return _pool
+
+def get_duckdb_connection():
+    """Returns the shared connection to the DuckDB database file, opening it on first use."""
+    global _duckdb_conn
+    if duckdb is None:
+        raise ImportError("STORAGE_BACKEND is 'duckdb' but the 'duckdb' package is not installed.")
+    with _pool_lock:
+        if _duckdb_conn is None:
+            os.makedirs(os.path.dirname(DUCKDB_FILEPATH), exist_ok=True)
+            _duckdb_conn = duckdb.connect(DUCKDB_FILEPATH)
+            logger.info(f"Opened DuckDB database {DUCKDB_FILEPATH}.")
+        return _duckdb_conn
+
+def is_duckdb(conn) -> bool:
+    """True for DuckDB connections and cursors."""
+    return duckdb is not None and isinstance(conn, duckdb.DuckDBPyConnection)
+
+def close_pool():
+    """Closes every pooled connection (and the DuckDB database, if open)."""
+    global _pool, _duckdb_conn
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+            logger.info("PostgreSQL connection pool closed.")
+        if _duckdb_conn is not None:
+            _duckdb_conn.close()
+            _duckdb_conn = None
+            logger.info("DuckDB database closed.")
+
+def _rollback(conn):
+    try:
+        conn.rollback()
+    except Exception:
+        # DuckDB raises when no transaction is open; there is nothing to undo then
+        pass
+
+@contextmanager
+def pooled_connection(backend: str = None):
+    """
+    Borrows a connection of the storage backend: a pooled PostgreSQL connection, or 
+    a per-thread cursor of the shared DuckDB database. An open transaction is rolled 
+    back if the block fails.
+    """
+    if (backend or STORAGE_BACKEND) == 'duckdb':
+        conn = get_duckdb_connection().cursor()
+        try:
+            yield conn
+        except Exception:
+            _rollback(conn)
+            raise
+        finally:
+            conn.close()
+        return
+
+    connection_pool = get_pool()
+    conn = connection_pool.getconn()
+    try:
+        yield conn
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        connection_pool.putconn(conn)
+
+def read_sql_chunks(query: str, params=None, chunk_size: int = FETCH_SIZE, conn=None):
+    """
+    Yields the result of `query` as DataFrames of at most `chunk_size` rows, read
+    through a named server-side cursor (PostgreSQL) or DuckDB's chunked fetch, so the 
+    full result never sits in client memory. An empty result yields one empty 
+    DataFrame with the result's columns.
+    
+    Uses `conn` when given (its transaction is left to the caller), otherwise a 
+    pooled connection whose read transaction is closed afterwards.
+    """
+    if conn is None:
+        with pooled_connection() as pooled_conn:
+            try:
+                yield from read_sql_chunks(query, params, chunk_size, pooled_conn)
+            finally:
+                # Read-only, so ending the transaction with a rollback loses nothing
+                _rollback(pooled_conn)
+        return
+
+    if is_duckdb(conn):
+        # DuckDB hands out results in vectors of 2048 rows; smaller chunk sizes are 
+        # served by slicing each fetched vector
+        vectors_per_chunk = max(1, chunk_size // 2048)
+        conn.execute(query, params)
+        chunk = conn.fetch_df_chunk(vectors_per_chunk)
+        if chunk.empty:
+            yield chunk
+            return
+        while not chunk.empty:
+            for start in range(0, len(chunk), chunk_size):
+                yield chunk.iloc[start:start + chunk_size].reset_index(drop=True)
+            chunk = conn.fetch_df_chunk(vectors_per_chunk)
+        return
+
+    with conn.cursor(name=f"chunked_reader_{uuid.uuid4().hex}") as cur:
+        cur.itersize = chunk_size
+        cur.execute(query, params)
+        rows = cur.fetchmany(chunk_size)
+        columns = [column.name for column in cur.description]
+        # coerce_float turns NUMERIC (Decimal) values into floats, as pd.read_sql does
+        yield pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+
+def read_sql_frame(query: str, params=None, chunk_size: int = FETCH_SIZE, conn=None) -> pd.DataFrame:
+    """Reads a whole result through `read_sql_chunks` into one DataFrame."""
+    return pd.concat(read_sql_chunks(query, params, chunk_size, conn), ignore_index=True)
+
+def run_queries_concurrently(queries: dict, chunk_size: int = FETCH_SIZE) -> dict:
+    """
+    Runs {name: sql} on separate pooled connections at the same time and returns
+    {name: DataFrame}. At most POOL_MAX_CONNECTIONS queries run at once.
+    """
+    with ThreadPoolExecutor(max_workers=min(len(queries), POOL_MAX_CONNECTIONS)) as executor:
+        futures = {name: executor.submit(read_sql_frame, query, None, chunk_size) for name, query in queries.items()}
+        return {name: future.result() for name, future in futures.items()}
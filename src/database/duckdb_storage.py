@@ -0,0 +1,184 @@
+"""
+Embedded DuckDB Storage Backend
+10 Academy Week 2 Challenge - Task 3: Store Cleaned Data
+
+Same schema, load API and report tables as the PostgreSQL storage in
+task_3_database_storage.py, on an embedded columnar DuckDB file, so Task 3 and the
+Task 4 report run without a database server (STORAGE_BACKEND = 'duckdb').
+
+Differences from the PostgreSQL schema:
+- no secondary indexes or partitions: DuckDB scans columns and skips row groups
+  with min/max zone maps, and ART indexes would only slow down the loads
+- the report "materialized views" are plain tables rebuilt after each load, with
+  the same names and columns, so the Task 4 queries run unchanged
+- uniqueness of review_hash is enforced by the merge instead of a constraint
+"""
+
+import logging
+import pandas as pd
+
+from src.database.task_3_database_storage import REVIEW_COLUMN_MAP, REVIEW_UPDATE_COLUMNS, review_content_hash
+
+logger = logging.getLogger(__name__)
+
+# --- Schema ---
+CREATE_TABLES = """
+CREATE SEQUENCE IF NOT EXISTS banks_bank_id_seq;
+CREATE TABLE IF NOT EXISTS banks (
+    bank_id INTEGER PRIMARY KEY DEFAULT nextval('banks_bank_id_seq'),
+    bank_name VARCHAR UNIQUE NOT NULL,
+    app_name VARCHAR
+);
+
+CREATE SEQUENCE IF NOT EXISTS reviews_review_pk_seq;
+CREATE TABLE IF NOT EXISTS reviews (
+    review_pk INTEGER PRIMARY KEY DEFAULT nextval('reviews_review_pk_seq'),
+    bank_id INTEGER, -- References banks(bank_id)
+    review_id_generated INTEGER NOT NULL, -- Row index from Task 2 (not stable across runs)
+    review_hash VARCHAR, -- Natural key: md5 of bank|app_id|review text|review date
+    app_id VARCHAR,
+    review_text VARCHAR,
+    review_preprocessed VARCHAR,
+    review_tokens VARCHAR,
+    rating INTEGER NOT NULL,
+    review_date DATE,
+    sentiment_label VARCHAR,
+    sentiment_score DECIMAL(5, 4),
+    identified_theme VARCHAR,
+    source VARCHAR DEFAULT 'Google Play'
+);
+"""
+
+# Same names and columns as the PostgreSQL materialized views read by Task 4
+REFRESH_REPORT_TABLES = """
+CREATE OR REPLACE TABLE mv_monthly_sentiment_trend AS
+SELECT
+    EXTRACT(YEAR FROM T1.review_date) AS review_year,
+    EXTRACT(MONTH FROM T1.review_date) AS review_month,
+    T2.bank_name,
+    COUNT(T1.review_pk) AS total_reviews,
+    ROUND(AVG(T1.sentiment_score), 4) AS average_sentiment
+FROM
+    reviews T1
+JOIN
+    banks T2 ON T1.bank_id = T2.bank_id
+WHERE
+    T1.review_date IS NOT NULL
+GROUP BY
+    review_year,
+    review_month,
+    T2.bank_name;
+
+CREATE OR REPLACE TABLE mv_rating_distribution AS
+SELECT
+    T2.bank_name,
+    T1.rating,
+    COUNT(T1.review_pk) AS rating_count
+FROM
+    reviews T1
+JOIN
+    banks T2 ON T1.bank_id = T2.bank_id
+GROUP BY
+    T2.bank_name,
+    T1.rating;
+"""
+
+
+def create_db_tables(conn):
+    """Creates the 'banks' and 'reviews' tables and the (empty) report tables if they don't exist."""
+    conn.execute(CREATE_TABLES)
+    conn.execute("SELECT COUNT(*) FROM information_schema.tables WHERE table_name = 'mv_rating_distribution'")
+    if not conn.fetchone()[0]:
+        conn.execute(REFRESH_REPORT_TABLES)
+    logger.info("DuckDB schema creation complete.")
+
+def ensure_month_partitions(conn, df: pd.DataFrame):
+    """No-op: DuckDB tables are not partitioned (see the module docstring)."""
+
+def refresh_report_views(conn):
+    """Rebuilds the Task 4 report tables after a load."""
+    conn.execute(REFRESH_REPORT_TABLES)
+    logger.info("Refreshed report tables.")
+
+def insert_banks_data(conn, df: pd.DataFrame) -> dict:
+    """Inserts bank names not stored yet and returns a mapping of bank_name to bank_id."""
+    banks = pd.DataFrame({'bank_name': df['bank'].astype(str).unique()})
+    banks['app_name'] = banks['bank_name'] + ' Mobile App'
+
+    conn.register('input_banks', banks)
+    try:
+        conn.execute(
+            "INSERT INTO banks (bank_name, app_name) "
+            "SELECT bank_name, app_name FROM input_banks "
+            "WHERE bank_name NOT IN (SELECT bank_name FROM banks)"
+        )
+        conn.execute("SELECT bank_id, bank_name FROM banks WHERE bank_name IN (SELECT bank_name FROM input_banks)")
+        bank_id_map = {bank_name: bank_id for bank_id, bank_name in conn.fetchall()}
+    finally:
+        conn.unregister('input_banks')
+
+    logger.info(f"Bank ID mapping created: {bank_id_map}")
+    return bank_id_map
+
+def load_reviews_data(conn, df: pd.DataFrame, bank_id_map: dict, method: str = None,
+                      table_name: str = 'reviews') -> tuple:
+    """
+    Incrementally loads review data: the batch is de-duplicated on review_hash, stored
+    reviews are updated only where a value changed, and new ones are inserted, in one
+    transaction. `method` is accepted for API compatibility with the PostgreSQL
+    loader (DuckDB reads the DataFrame directly). Returns (inserted, updated) row counts.
+    """
+    df = df.assign(
+        review_hash=review_content_hash(df),
+        bank_id=df['bank'].astype(str).map(bank_id_map).astype('Int64')
+    )
+    records = pd.DataFrame({db_col: df[df_col] for df_col, db_col in REVIEW_COLUMN_MAP})
+    records['review_date'] = pd.to_datetime(records['review_date'], errors='coerce')
+    for col in ('review_text', 'review_preprocessed', 'review_tokens', 'app_id',
+                'sentiment_label', 'identified_theme', 'source'):
+        # Categorical and all-missing columns are handed to DuckDB as plain strings
+        records[col] = records[col].astype(object).where(records[col].notna(), None)
+
+    columns = ', '.join(col for _, col in REVIEW_COLUMN_MAP)
+    changed = ' OR '.join(f"target.{col} IS DISTINCT FROM staged.{col}" for col in REVIEW_UPDATE_COLUMNS)
+    assignments = ', '.join(f"{col} = staged.{col}" for col in REVIEW_UPDATE_COLUMNS)
+
+    conn.register('reviews_batch', records)
+    conn.begin()
+    try:
+        # Cast to the table types first, so unchanged values compare as equal
+        conn.execute("""
+            CREATE OR REPLACE TEMP TABLE reviews_staging AS
+            SELECT DISTINCT ON (review_hash)
+                CAST(bank_id AS INTEGER) AS bank_id, CAST(review_id_generated AS INTEGER) AS review_id_generated,
+                review_hash, app_id, review_text, review_preprocessed, review_tokens,
+                CAST(rating AS INTEGER) AS rating, CAST(review_date AS DATE) AS review_date,
+                sentiment_label, CAST(sentiment_score AS DECIMAL(5, 4)) AS sentiment_score,
+                identified_theme, source
+            FROM reviews_batch
+            ORDER BY review_hash
+        """)
+        conn.execute(f"""
+            UPDATE {table_name} AS target SET {assignments}
+            FROM reviews_staging AS staged
+            WHERE target.review_hash = staged.review_hash AND ({changed})
+        """)
+        updated = conn.fetchone()[0]
+        conn.execute(f"""
+            INSERT INTO {table_name} ({columns})
+            SELECT {columns} FROM reviews_staging AS staged
+            WHERE NOT EXISTS (SELECT 1 FROM {table_name} AS target WHERE target.review_hash = staged.review_hash)
+        """)
+        inserted = conn.fetchone()[0]
+        conn.execute("DROP TABLE reviews_staging")
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"Error during DuckDB load: {e}")
+        return 0, 0
+    finally:
+        conn.unregister('reviews_batch')
+
+    logger.info(f"DuckDB load complete: {inserted} inserted, {updated} updated, "
+                f"{len(records) - inserted - updated} unchanged or duplicated in the batch.")
+    return inserted, updated
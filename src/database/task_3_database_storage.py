@@ -10,9 +10,15 @@ import pandas as pd
 import psycopg2
 from psycopg2 import sql
 from psycopg2 import extras
+import io
 import os
+import hashlib
 import sys
+import time
+import tempfile
 import logging
+from contextlib import contextmanager
+from types import SimpleNamespace
 
 # Set up logging
 logging.basicConfig(
@@ -35,34 +41,23 @@ except NameError:
 # Define Paths and Imports
 DATA_PROCESSED_PATH = os.path.join(PROJECT_ROOT, 'data', 'processed')
 INPUT_FILENAME = "reviews_with_sentiment_themes.csv"
-CONFIG_FILEPATH = os.path.join(PROJECT_ROOT, 'config', 'db_config.py')
+# Reviews a partitioned 'reviews' table cannot store (no parseable date), kept for inspection
+UNDATED_REVIEWS_FILENAME = "reviews_undated_skipped.csv"
 
-# Initialize DB_CONFIG globally
-DB_CONFIG = {} 
+# 'copy' streams rows through COPY FROM STDIN into a staging table; 'execute_values'
+# is the original multi-row INSERT path
+BULK_LOAD_METHOD = 'copy'
+COPY_CHUNK_ROWS = 100_000
 
-try:
-    # Read the content of the config file directly to avoid import path issues
-    # The config file is expected to define a dictionary named DB_CONFIG
-    with open(CONFIG_FILEPATH, 'r') as f:
-        config_content = f.read()
-    
-    # Execute the content, defining DB_CONFIG in the global scope
-    # This bypasses the need for dynamic sys.path manipulation
-    exec(config_content, globals()) 
-    
-    # Check if DB_CONFIG was successfully defined and is a dictionary
-    if 'DB_CONFIG' not in globals() or not isinstance(DB_CONFIG, dict):
-        raise ValueError("db_config.py did not define a valid DB_CONFIG dictionary.")
-
-except FileNotFoundError:
-    logger.error(f"Failed to find config file: {CONFIG_FILEPATH}")
-    logger.error("Please ensure db_config.py exists in the 'config' directory.")
-    sys.exit(1)
-except Exception as e:
-    logger.error(f"Error loading or parsing db_config.py: {e}")
-    logger.error("Please ensure the syntax in db_config.py is correct (it should only define the DB_CONFIG dictionary).")
-    sys.exit(1)
+# Create 'reviews' range-partitioned by month of review_date. Only applies when the table
+# is first created; an existing unpartitioned table is left as it is.
+PARTITION_BY_MONTH = False
 
+# Make the shared 'src.common' helpers importable when run as a script
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+from src.common.review_format import read_reviews
+from src.database.db_access import STORAGE_BACKEND, pooled_connection, close_pool, read_sql_frame, duckdb
 
 # --- SQL Schema Definitions ---
 
@@ -80,9 +75,12 @@ CREATE_REVIEWS_TABLE = """
 CREATE TABLE IF NOT EXISTS reviews (
     review_pk SERIAL PRIMARY KEY,
     bank_id INTEGER REFERENCES banks(bank_id) ON DELETE CASCADE,
-    review_id_generated INTEGER UNIQUE NOT NULL, -- Original index from pandas
+    review_id_generated INTEGER NOT NULL, -- Row index from Task 2 (not stable across runs)
+    review_hash CHAR(32) UNIQUE, -- Natural key: md5 of bank|app_id|review text|review date
+    app_id VARCHAR(100),
     review_text TEXT,
     review_preprocessed TEXT,
+    review_tokens TEXT, -- Space-joined tokens from the Task 2 normalization stage
     rating INTEGER NOT NULL,
     review_date DATE,
     sentiment_label VARCHAR(10),
@@ -92,96 +90,256 @@ CREATE TABLE IF NOT EXISTS reviews (
 );
 """
 
+# 2b. Monthly-partitioned variant (PARTITION_BY_MONTH). Unique keys of a partitioned table 
+# must contain the partition key; review_hash already covers the date, so adding 
+# review_date to it does not change which reviews are considered equal. Being part of the 
+# primary key makes review_date NOT NULL: undated reviews are skipped and reported before 
+# the load (see skip_undated_reviews). The default partition only catches dated rows 
+# outside the monthly partitions.
+CREATE_REVIEWS_TABLE_PARTITIONED = """
+CREATE TABLE IF NOT EXISTS reviews (
+    review_pk SERIAL,
+    bank_id INTEGER REFERENCES banks(bank_id) ON DELETE CASCADE,
+    review_id_generated INTEGER NOT NULL, -- Row index from Task 2 (not stable across runs)
+    review_hash CHAR(32), -- Natural key: md5 of bank|app_id|review text|review date
+    app_id VARCHAR(100),
+    review_text TEXT,
+    review_preprocessed TEXT,
+    review_tokens TEXT, -- Space-joined tokens from the Task 2 normalization stage
+    rating INTEGER NOT NULL,
+    review_date DATE,
+    sentiment_label VARCHAR(10),
+    sentiment_score NUMERIC(5, 4),
+    identified_theme VARCHAR(50),
+    source VARCHAR(50) DEFAULT 'Google Play',
+    PRIMARY KEY (review_pk, review_date),
+    UNIQUE (review_hash, review_date)
+) PARTITION BY RANGE (review_date);
+CREATE TABLE IF NOT EXISTS reviews_default PARTITION OF reviews DEFAULT;
+"""
+
+# 3. Secondary indexes matching the Task 4 joins, filters and groupings
+CREATE_REVIEW_INDEXES = """
+CREATE INDEX IF NOT EXISTS reviews_bank_id_idx ON reviews (bank_id);
+CREATE INDEX IF NOT EXISTS reviews_review_date_idx ON reviews (review_date);
+CREATE INDEX IF NOT EXISTS reviews_identified_theme_idx ON reviews (identified_theme);
+"""
+
+# 4. Materialized views behind the Task 4 trend and distribution reports. The unique 
+# indexes allow REFRESH ... CONCURRENTLY, so reports can read while a refresh runs.
+CREATE_REPORT_VIEWS = """
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_monthly_sentiment_trend AS
+SELECT
+    EXTRACT(YEAR FROM T1.review_date) AS review_year,
+    EXTRACT(MONTH FROM T1.review_date) AS review_month,
+    T2.bank_name,
+    COUNT(T1.review_pk) AS total_reviews,
+    ROUND(AVG(T1.sentiment_score)::numeric, 4) AS average_sentiment
+FROM
+    reviews T1
+JOIN
+    banks T2 ON T1.bank_id = T2.bank_id
+WHERE
+    T1.review_date IS NOT NULL
+GROUP BY
+    review_year,
+    review_month,
+    T2.bank_name;
+CREATE UNIQUE INDEX IF NOT EXISTS mv_monthly_sentiment_trend_key
+    ON mv_monthly_sentiment_trend (review_year, review_month, bank_name);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_rating_distribution AS
+SELECT
+    T2.bank_name,
+    T1.rating,
+    COUNT(T1.review_pk) AS rating_count
+FROM
+    reviews T1
+JOIN
+    banks T2 ON T1.bank_id = T2.bank_id
+GROUP BY
+    T2.bank_name,
+    T1.rating;
+CREATE UNIQUE INDEX IF NOT EXISTS mv_rating_distribution_key
+    ON mv_rating_distribution (bank_name, rating);
+"""
+
+REFRESH_REPORT_VIEWS = """
+REFRESH MATERIALIZED VIEW CONCURRENTLY mv_monthly_sentiment_trend;
+REFRESH MATERIALIZED VIEW CONCURRENTLY mv_rating_distribution;
+"""
+
+# Brings tables created by earlier versions of this script up to date: review_id_generated 
+# is renumbered by every Task 2 run, so the content hash replaces it as the unique key
+MIGRATE_REVIEWS_TABLE = """
+ALTER TABLE reviews ADD COLUMN IF NOT EXISTS review_tokens TEXT;
+ALTER TABLE reviews ADD COLUMN IF NOT EXISTS app_id VARCHAR(100);
+ALTER TABLE reviews ADD COLUMN IF NOT EXISTS review_hash CHAR(32);
+ALTER TABLE reviews DROP CONSTRAINT IF EXISTS reviews_review_id_generated_key;
+CREATE UNIQUE INDEX IF NOT EXISTS reviews_review_hash_key ON reviews (review_hash);
+"""
+
+# Columns refreshed when a review that is already stored comes back with different values.
+# The hash covers bank, app, text and date, so those never change for a given key, and
+# review_id_generated is left out because every Task 2 run renumbers it.
+REVIEW_UPDATE_COLUMNS = [
+    'review_preprocessed', 'review_tokens', 'rating',
+    'sentiment_label', 'sentiment_score', 'identified_theme', 'source'
+]
+
+# DataFrame column -> reviews table column, in load order
+REVIEW_COLUMN_MAP = [
+    ('bank_id', 'bank_id'),
+    ('review_id_generated', 'review_id_generated'),
+    ('review_hash', 'review_hash'),
+    ('app_id', 'app_id'),
+    ('review', 'review_text'),
+    ('review_preprocessed', 'review_preprocessed'),
+    ('review_tokens', 'review_tokens'),
+    ('rating', 'rating'),
+    ('date', 'review_date'),
+    ('sentiment_label', 'sentiment_label'),
+    ('sentiment_score', 'sentiment_score'),
+    ('identified_theme', 'identified_theme'),
+    ('source', 'source'),
+]
+
+# Resolves all bank names in one statement: inserts the new ones and returns the ids of 
+# both new and existing banks (the CTE's snapshot does not see its own inserts)
+UPSERT_BANKS_QUERY = """
+WITH input_banks (bank_name, app_name) AS (
+    SELECT * FROM unnest(%(bank_names)s::text[], %(app_names)s::text[])
+),
+inserted AS (
+    INSERT INTO banks (bank_name, app_name)
+    SELECT bank_name, app_name FROM input_banks
+    ON CONFLICT (bank_name) DO NOTHING
+    RETURNING bank_id, bank_name
+)
+SELECT bank_id, bank_name FROM inserted
+UNION ALL
+SELECT bank_id, bank_name FROM banks WHERE bank_name = ANY(%(bank_names)s);
+"""
+
 # --- Connection and Insertion Functions ---
 
+def is_partitioned(conn, table_name: str = 'reviews') -> bool:
+    """True if `table_name` exists and is a partitioned table."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (table_name,))
+        row = cur.fetchone()
+    return bool(row) and row[0] == 'p'
+
 def create_db_tables(conn):
-    """Creates the 'banks' and 'reviews' tables if they don't exist."""
+    """Creates the 'banks' and 'reviews' tables, their indexes and the report views if they don't exist."""
     with conn.cursor() as cur:
         logger.info("Creating 'banks' table...")
         cur.execute(CREATE_BANKS_TABLE)
-        logger.info("Creating 'reviews' table...")
-        cur.execute(CREATE_REVIEWS_TABLE)
+        cur.execute("SELECT to_regclass('reviews') IS NOT NULL")
+        reviews_exists = cur.fetchone()[0]
+        
+        if PARTITION_BY_MONTH and not reviews_exists:
+            logger.info("Creating 'reviews' table (partitioned by month)...")
+            cur.execute(CREATE_REVIEWS_TABLE_PARTITIONED)
+        else:
+            logger.info("Creating 'reviews' table...")
+            cur.execute(CREATE_REVIEWS_TABLE)
+    conn.commit()
+    
+    if PARTITION_BY_MONTH and reviews_exists and not is_partitioned(conn):
+        logger.warning("PARTITION_BY_MONTH is set but 'reviews' already exists unpartitioned; keeping it as is.")
+    
+    with conn.cursor() as cur:
+        # A partitioned table can only have been created by this version, so it needs no migration
+        if not is_partitioned(conn):
+            # Tables created by earlier versions lack the tokens and natural key columns
+            cur.execute(MIGRATE_REVIEWS_TABLE)
+        logger.info("Creating indexes and report views...")
+        cur.execute(CREATE_REVIEW_INDEXES)
+        cur.execute(CREATE_REPORT_VIEWS)
     conn.commit()
     logger.info("Database schema creation complete.")
 
+def ensure_month_partitions(conn, df: pd.DataFrame):
+    """
+    Creates the monthly partitions of 'reviews' needed for the dates in `df` (no-op 
+    for an unpartitioned table). Rows without a date cannot be stored in a partitioned 
+    table; load_reviews_data skips and reports them.
+    """
+    if not is_partitioned(conn):
+        return
+    
+    months = pd.to_datetime(df['date'], errors='coerce').dropna().dt.to_period('M').unique()
+    with conn.cursor() as cur:
+        for month in sorted(months):
+            partition = sql.Identifier(f"reviews_y{month.year}m{month.month:02d}")
+            cur.execute(sql.SQL(
+                "CREATE TABLE IF NOT EXISTS {} PARTITION OF reviews FOR VALUES FROM (%s) TO (%s)"
+            ).format(partition), (month.start_time.date(), (month + 1).start_time.date()))
+    conn.commit()
+    logger.info(f"Ensured {len(months)} monthly partitions of 'reviews'.")
+
+def refresh_report_views(conn):
+    """Refreshes the Task 4 materialized views after a load."""
+    with conn.cursor() as cur:
+        cur.execute(REFRESH_REPORT_VIEWS)
+    conn.commit()
+    logger.info("Refreshed report materialized views.")
+
 def insert_banks_data(conn, df: pd.DataFrame) -> dict:
     """
     Inserts unique bank names into the 'banks' table and returns a mapping 
     of bank_name to bank_id. Handles conflicts to ensure idempotency.
     """
-    bank_names = df['bank'].unique()
+    bank_names = df['bank'].astype(str).unique().tolist()
     
     # Assuming app_name is the same as bank_name for this task
-    bank_data = [(name, name + ' Mobile App') for name in bank_names]
-    
-    # INSERT OR IGNORE, and return the ID if inserted/fetch existing ID
-    insert_query = sql.SQL("INSERT INTO banks (bank_name, app_name) VALUES (%s, %s) ON CONFLICT (bank_name) DO NOTHING RETURNING bank_id, bank_name;")
+    app_names = [name + ' Mobile App' for name in bank_names]
     
     bank_id_map = {}
     with conn.cursor() as cur:
         logger.info(f"Inserting {len(bank_names)} unique bank entries...")
-        for name, app_name in bank_data:
-            try:
-                cur.execute(insert_query, (name, app_name))
-                result = cur.fetchone()
-                if result:
-                    # Successfully inserted (returned ID)
-                    bank_id_map[result[1]] = result[0]
-                else:
-                    # Conflict occurred (bank already exists), fetch the existing ID
-                    cur.execute(sql.SQL("SELECT bank_id FROM banks WHERE bank_name = %s"), (name,))
-                    fetched_id = cur.fetchone()
-                    if fetched_id:
-                        bank_id_map[name] = fetched_id[0]
-                    else:
-                        logger.error(f"Failed to find or insert bank: {name}")
-
-            except Exception as e:
-                logger.error(f"Error inserting/fetching bank {name}: {e}")
+        try:
+            # One round trip for all banks instead of an INSERT (and SELECT) per bank
+            cur.execute(UPSERT_BANKS_QUERY, {'bank_names': bank_names, 'app_names': app_names})
+            bank_id_map = {bank_name: bank_id for bank_id, bank_name in cur.fetchall()}
+        except Exception as e:
+            logger.error(f"Error inserting/fetching banks: {e}")
+            conn.rollback()
+            return bank_id_map
+    
+    missing_banks = set(bank_names) - set(bank_id_map)
+    if missing_banks:
+        logger.error(f"Failed to find or insert banks: {sorted(missing_banks)}")
 
     conn.commit()
     logger.info(f"Bank ID mapping created: {bank_id_map}")
     return bank_id_map
 
-def insert_reviews_data(conn, df: pd.DataFrame, bank_id_map: dict):
+def insert_reviews_data(conn, df: pd.DataFrame, bank_id_map: dict, table_name: str = 'reviews'):
     """Performs bulk insertion of review data into the 'reviews' table."""
     logger.info("Preparing reviews data for bulk insertion...")
 
     # Map bank name to its foreign key (bank_id)
-    df['bank_id'] = df['bank'].map(bank_id_map)
+    df['bank_id'] = df['bank'].astype(str).map(bank_id_map)
 
     # Convert date string to proper SQL date format and handle NaN/None
     df['date'] = pd.to_datetime(df['date'], errors='coerce').dt.date
 
     # Select the columns matching the database schema for insertion
-    review_records = df[[
-        'bank_id',
-        'review_id_generated',
-        'review',
-        'review_preprocessed',
-        'rating',
-        'date',
-        'sentiment_label',
-        'sentiment_score',
-        'identified_theme',
-        'source'
-    ]].values.tolist()
+    review_records = df[[df_col for df_col, _ in REVIEW_COLUMN_MAP]].values.tolist()
 
     # Replace pandas NaN/NaT with None for SQL compatibility
     review_records = [[None if pd.isna(item) or (item is pd.NaT) else item for item in row] for row in review_records]
 
-    # Define the target table and columns
-    table_name = 'reviews'
-    columns = [
-        'bank_id', 'review_id_generated', 'review_text', 'review_preprocessed', 
-        'rating', 'review_date', 'sentiment_label', 'sentiment_score', 
-        'identified_theme', 'source'
-    ]
+    # Define the target columns
+    columns = [db_col for _, db_col in REVIEW_COLUMN_MAP]
     
-    # Use ON CONFLICT (review_id_generated) DO NOTHING to handle existing records
+    # Use ON CONFLICT on the natural key to handle existing records
     insert_query = sql.SQL(
-        "INSERT INTO {} ({}) VALUES %s ON CONFLICT (review_id_generated) DO NOTHING"
-    ).format(sql.Identifier(table_name), sql.SQL(', ').join(map(sql.Identifier, columns)))
+        "INSERT INTO {} ({}) VALUES %s ON CONFLICT ({}) DO NOTHING"
+    ).format(sql.Identifier(table_name), sql.SQL(', ').join(map(sql.Identifier, columns)),
+             review_conflict_target(conn, table_name))
     
     # Use execute_values for efficient bulk insertion
     with conn.cursor() as cur:
@@ -194,40 +352,335 @@ def insert_reviews_data(conn, df: pd.DataFrame, bank_id_map: dict):
             logger.error(f"Error during bulk insert: {e}")
             conn.rollback()
 
+def review_content_hash(df: pd.DataFrame) -> pd.Series:
+    """
+    Stable natural key of each review: md5 of bank|app_id|review text|YYYY-MM-DD, 
+    with missing parts as empty strings. The same key can be computed in SQL as
+    md5(concat_ws('|', bank_name, coalesce(app_id, ''), coalesce(review_text, ''),
+                  coalesce(to_char(review_date, 'YYYY-MM-DD'), ''))).
+    """
+    dates = pd.to_datetime(df['date'], errors='coerce').dt.strftime('%Y-%m-%d').fillna('')
+    app_ids = df['app_id'].astype(object).fillna('').astype(str) if 'app_id' in df.columns else ''
+    keys = (df['bank'].astype(str) + '|' + app_ids + '|' + df['review'].astype(object).fillna('').astype(str)
+            + '|' + dates)
+    return keys.map(lambda key: hashlib.md5(key.encode('utf-8')).hexdigest())
+
+def review_conflict_target(conn, table_name: str = 'reviews') -> sql.Composable:
+    """Columns of the natural-key unique constraint (partitioned tables include review_date)."""
+    columns = ['review_hash', 'review_date'] if is_partitioned(conn, table_name) else ['review_hash']
+    return sql.SQL(', ').join(map(sql.Identifier, columns))
+
+def copy_reviews_data(conn, df: pd.DataFrame, bank_id_map: dict, table_name: str = 'reviews') -> tuple:
+    """
+    Incrementally loads review data with COPY FROM STDIN and a set-based merge.
+    
+    Rows are serialized to CSV in memory (COPY_CHUNK_ROWS at a time), with missing 
+    values written as \\N by pandas instead of checked cell by cell, and copied into a 
+    temporary staging table. Set-based statements on the review_hash natural key then 
+    update stored reviews only where a value actually changed (IS DISTINCT FROM), so 
+    unchanged reviews cost no writes, and insert only the reviews not stored yet, so 
+    re-loaded reviews draw no review_pk values (INSERT ... ON CONFLICT would evaluate 
+    the sequence default for every proposed row). Returns (inserted, updated) row counts.
+    """
+    logger.info("Preparing reviews data for COPY bulk load...")
+    
+    # Map bank name to its foreign key; nullable integers keep ids from being written as floats
+    df = df.assign(bank_id=df['bank'].astype(str).map(bank_id_map).astype('Int64'))
+    records = pd.DataFrame({db_col: df[df_col] for df_col, db_col in REVIEW_COLUMN_MAP})
+    records['review_date'] = pd.to_datetime(records['review_date'], errors='coerce')
+    columns = list(records.columns)
+    column_list = sql.SQL(', ').join(map(sql.Identifier, columns))
+    table = sql.Identifier(table_name)
+    
+    copy_query = sql.SQL(
+        "COPY reviews_staging ({}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+    ).format(column_list)
+    
+    # Rows stored before the natural key existed have no hash: adopt the oldest stored copy of 
+    # each staged review (same bank, text and date) so it is updated instead of duplicated
+    adopt_legacy_query = sql.SQL("""
+        UPDATE {table} AS target
+        SET review_hash = staged.review_hash, app_id = staged.app_id
+        FROM reviews_staging AS staged,
+             (SELECT MIN(review_pk) AS review_pk FROM {table} WHERE review_hash IS NULL
+              GROUP BY bank_id, review_text, review_date) AS oldest
+        WHERE target.review_pk = oldest.review_pk
+          AND target.bank_id = staged.bank_id
+          AND target.review_text IS NOT DISTINCT FROM staged.review_text
+          AND target.review_date IS NOT DISTINCT FROM staged.review_date
+          AND NOT EXISTS (SELECT 1 FROM {table} AS keyed WHERE keyed.review_hash = staged.review_hash)
+    """).format(table=table)
+    
+    # One staged row per natural key (the last Task 2 output may repeat a review)
+    update_columns = [sql.Identifier(col) for col in REVIEW_UPDATE_COLUMNS]
+    update_query = sql.SQL("""
+        UPDATE {table} AS target SET ({update_columns}) = ({staged_columns})
+        FROM (SELECT DISTINCT ON (review_hash) * FROM reviews_staging ORDER BY review_hash) AS staged
+        WHERE target.review_hash = staged.review_hash
+          AND ({target_columns}) IS DISTINCT FROM ({staged_columns})
+    """).format(
+        table=table,
+        update_columns=sql.SQL(', ').join(update_columns),
+        staged_columns=sql.SQL(', ').join(sql.SQL('staged.') + col for col in update_columns),
+        target_columns=sql.SQL(', ').join(sql.SQL('target.') + col for col in update_columns),
+    )
+    # ON CONFLICT only guards against a concurrent load inserting the same review
+    insert_query = sql.SQL("""
+        INSERT INTO {table} ({columns})
+        SELECT DISTINCT ON (review_hash) {columns} FROM reviews_staging AS staged
+        WHERE NOT EXISTS (SELECT 1 FROM {table} AS stored WHERE stored.review_hash = staged.review_hash)
+        ORDER BY review_hash
+        ON CONFLICT ({conflict_target}) DO NOTHING
+    """).format(
+        table=table,
+        columns=column_list,
+        conflict_target=review_conflict_target(conn, table_name),
+    )
+    
+    with conn.cursor() as cur:
+        logger.info(f"Starting COPY bulk load of {len(records)} review records...")
+        try:
+            # Only the loaded columns, without defaults or constraints: LIKE would copy the 
+            # review_pk default and draw a value of the table's sequence per staged row
+            cur.execute(sql.SQL(
+                "CREATE TEMP TABLE reviews_staging ON COMMIT DROP AS SELECT {} FROM {} WITH NO DATA"
+            ).format(column_list, table))
+            for start in range(0, len(records), COPY_CHUNK_ROWS):
+                buffer = io.StringIO()
+                records.iloc[start:start + COPY_CHUNK_ROWS].to_csv(
+                    buffer, index=False, header=False, na_rep='\\N', date_format='%Y-%m-%d'
+                )
+                buffer.seek(0)
+                cur.copy_expert(copy_query.as_string(conn), buffer)
+            
+            cur.execute(adopt_legacy_query)
+            if cur.rowcount:
+                logger.info(f"Assigned natural keys to {cur.rowcount} reviews loaded by an earlier version.")
+            
+            cur.execute(update_query)
+            updated = cur.rowcount
+            cur.execute(insert_query)
+            inserted = cur.rowcount
+            conn.commit()
+            logger.info(f"COPY bulk load complete: {inserted} inserted, {updated} updated, "
+                        f"{len(records) - inserted - updated} unchanged or duplicated in the batch.")
+            return inserted, updated
+        except Exception as e:
+            logger.error(f"Error during COPY bulk load: {e}")
+            conn.rollback()
+            return 0, 0
+
+def skip_undated_reviews(conn, df: pd.DataFrame, table_name: str = 'reviews') -> pd.DataFrame:
+    """
+    Drops the reviews without a parseable date when `table_name` is partitioned, and 
+    writes them to UNDATED_REVIEWS_FILENAME: review_date is part of the primary key 
+    there, so a single undated row would abort the whole COPY/merge. Unpartitioned 
+    tables store them with a NULL date, so `df` is returned unchanged.
+    """
+    if not is_partitioned(conn, table_name):
+        return df
+    
+    undated = pd.to_datetime(df['date'], errors='coerce').isna()
+    if undated.any():
+        undated_filepath = os.path.join(DATA_PROCESSED_PATH, UNDATED_REVIEWS_FILENAME)
+        df[undated].to_csv(undated_filepath, index=False)
+        logger.warning(f"Skipped {int(undated.sum())} reviews without a date (the partitioned 'reviews' "
+                       f"table requires one); written to {undated_filepath}.")
+    return df[~undated]
+
+def load_reviews_data(conn, df: pd.DataFrame, bank_id_map: dict, method: str = BULK_LOAD_METHOD,
+                      table_name: str = 'reviews'):
+    """Loads review data with the configured bulk-load method ('copy' or 'execute_values')."""
+    df = skip_undated_reviews(conn, df, table_name)
+    df = df.assign(review_hash=review_content_hash(df))
+    if method == 'copy':
+        return copy_reviews_data(conn, df, bank_id_map, table_name)
+    elif method == 'execute_values':
+        insert_reviews_data(conn, df.copy(), bank_id_map, table_name)
+    else:
+        raise ValueError(f"Unknown bulk load method '{method}'. Choose 'copy' or 'execute_values'.")
+
+def benchmark_review_load(conn, df: pd.DataFrame, bank_id_map: dict) -> pd.DataFrame:
+    """
+    Loads the same reviews with each method into an empty scratch copy of the 
+    reviews table and reports rows/sec.
+    """
+    # The scratch table is not partitioned, so apply the real table's date rule up front
+    df = skip_undated_reviews(conn, df)
+    results = []
+    for method in ('execute_values', 'copy'):
+        with conn.cursor() as cur:
+            cur.execute("DROP TABLE IF EXISTS reviews_load_benchmark")
+            # A plain (unpartitioned) scratch table keyed on review_hash alone, with its own 
+            # review_pk identity so the benchmark never draws from the reviews sequence
+            cur.execute("CREATE TABLE reviews_load_benchmark AS SELECT * FROM reviews WITH NO DATA")
+            cur.execute(
+                "ALTER TABLE reviews_load_benchmark ALTER COLUMN review_pk SET NOT NULL, "
+                "ALTER COLUMN review_pk ADD GENERATED BY DEFAULT AS IDENTITY"
+            )
+            cur.execute("CREATE UNIQUE INDEX ON reviews_load_benchmark (review_hash)")
+        conn.commit()
+        
+        started = time.perf_counter()
+        load_reviews_data(conn, df, bank_id_map, method=method, table_name='reviews_load_benchmark')
+        elapsed = time.perf_counter() - started
+        
+        with conn.cursor() as cur:
+            cur.execute("SELECT COUNT(*) FROM reviews_load_benchmark")
+            loaded_rows = cur.fetchone()[0]
+            cur.execute("DROP TABLE reviews_load_benchmark")
+        conn.commit()
+        results.append({
+            'method': method,
+            'rows': loaded_rows,
+            'seconds': round(elapsed, 3),
+            'rows_per_sec': round(loaded_rows / elapsed, 1) if elapsed else None
+        })
+    
+    report = pd.DataFrame(results)
+    logger.info(f"Review load benchmark:\n{report.to_string(index=False)}")
+    return report
+
+# The storage API shared by both backends (see duckdb_storage.py for the embedded one)
+POSTGRES_STORAGE = SimpleNamespace(
+    create_db_tables=create_db_tables,
+    insert_banks_data=insert_banks_data,
+    ensure_month_partitions=ensure_month_partitions,
+    load_reviews_data=load_reviews_data,
+    refresh_report_views=refresh_report_views,
+)
+
+def get_storage(backend: str = None):
+    """Storage functions of `backend` ('postgres' or 'duckdb'; STORAGE_BACKEND by default)."""
+    if (backend or STORAGE_BACKEND) == 'duckdb':
+        # Imported lazily: duckdb_storage reuses this module's column definitions
+        from src.database import duckdb_storage
+        return duckdb_storage
+    return POSTGRES_STORAGE
+
+@contextmanager
+def _benchmark_connection(backend: str):
+    """A connection to an empty database of `backend` that is discarded afterwards."""
+    if backend == 'duckdb':
+        if duckdb is None:
+            raise ImportError("the 'duckdb' package is not installed")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            conn = duckdb.connect(os.path.join(tmp_dir, 'benchmark.duckdb'))
+            try:
+                yield conn
+            finally:
+                conn.close()
+        return
+    
+    with pooled_connection('postgres') as conn:
+        # A scratch schema first in the search path shadows the real tables
+        with conn.cursor() as cur:
+            cur.execute("CREATE SCHEMA storage_benchmark; SET search_path TO storage_benchmark, public;")
+        conn.commit()
+        try:
+            yield conn
+        finally:
+            conn.rollback()
+            with conn.cursor() as cur:
+                cur.execute("DROP SCHEMA storage_benchmark CASCADE; RESET search_path;")
+            conn.commit()
+
+def benchmark_storage_backends(df: pd.DataFrame, backends: tuple = ('postgres', 'duckdb')) -> pd.DataFrame:
+    """
+    Loads `df` into an empty database of each backend (schema, banks, reviews and report 
+    views) and times the load and each Task 4 report query. Unavailable backends are skipped.
+    """
+    # Imported here so the storage script does not pull in the plotting libraries
+    from src.analysis.task_4_analysis import SQL_MONTHLY_TREND, SQL_RATING_DISTRIBUTION, SQL_THEME_ANALYSIS
+    queries = {'trend': SQL_MONTHLY_TREND, 'rating': SQL_RATING_DISTRIBUTION, 'themes': SQL_THEME_ANALYSIS}
+    
+    results = []
+    for backend in backends:
+        storage = get_storage(backend)
+        try:
+            with _benchmark_connection(backend) as conn:
+                started = time.perf_counter()
+                storage.create_db_tables(conn)
+                bank_id_map = storage.insert_banks_data(conn, df)
+                storage.ensure_month_partitions(conn, df)
+                storage.load_reviews_data(conn, df, bank_id_map)
+                storage.refresh_report_views(conn)
+                load_seconds = time.perf_counter() - started
+                
+                row = {
+                    'backend': backend,
+                    'rows': len(df),
+                    'load_seconds': round(load_seconds, 3),
+                    'load_rows_per_sec': round(len(df) / load_seconds, 1)
+                }
+                for name, query in queries.items():
+                    started = time.perf_counter()
+                    read_sql_frame(query, conn=conn)
+                    row[f'{name}_query_ms'] = round((time.perf_counter() - started) * 1000, 1)
+                results.append(row)
+        except Exception as e:
+            logger.warning(f"Skipping the '{backend}' backend in the benchmark: {e}")
+    
+    report = pd.DataFrame(results)
+    logger.info(f"Storage backend benchmark:\n{report.to_string(index=False)}")
+    return report
+
 def main():
-    """Main function to run the PostgreSQL storage pipeline."""
+    """Main function to run the storage pipeline on the configured backend (PostgreSQL or DuckDB)."""
     
     input_filepath = os.path.join(DATA_PROCESSED_PATH, INPUT_FILENAME)
     
     # 1. Load Data
     try:
-        df = pd.read_csv(input_filepath, encoding='utf-8')
+        df = read_reviews(input_filepath)
         logger.info(f"Loaded {len(df)} enriched reviews for database storage.")
         
         # Add a default 'source' column if it's missing (as per schema)
         if 'source' not in df.columns:
              df['source'] = 'Google Play'
+        # Files written by earlier Task 1/2 versions may lack these columns
+        for optional_col in ('review_tokens', 'app_id'):
+            if optional_col not in df.columns:
+                df[optional_col] = None
     except FileNotFoundError:
         logger.error(f"Input file not found: {input_filepath}. Run Task 2 analysis first.")
         return 
 
-    conn = None
+    if '--benchmark-backends' in sys.argv:
+        # Compare load and report query latency of PostgreSQL and DuckDB on scratch databases
+        try:
+            benchmark_storage_backends(df)
+        finally:
+            close_pool()
+        return
+
+    storage = get_storage()
     try:
-        # 2. Establish Connection
-        conn = psycopg2.connect(**DB_CONFIG)
-        logger.info("Successfully connected to PostgreSQL database.")
+        # 2. Borrow a connection from the shared pool (PostgreSQL reads config/db_config.py)
+        with pooled_connection() as conn:
+            logger.info(f"Successfully connected to the '{STORAGE_BACKEND}' storage backend.")
 
-        # 3. Create Tables
-        create_db_tables(conn)
+            # 3. Create Tables
+            storage.create_db_tables(conn)
 
-        # 4. Insert Banks and get mapping
-        bank_id_map = insert_banks_data(conn, df)
-        
-        # 5. Insert Reviews
-        insert_reviews_data(conn, df, bank_id_map)
+            # 4. Insert Banks and get mapping
+            bank_id_map = storage.insert_banks_data(conn, df)
+            
+            # 5. Insert Reviews (or compare the PostgreSQL bulk-load methods)
+            if '--benchmark-load' in sys.argv:
+                benchmark_review_load(conn, df, bank_id_map)
+            else:
+                storage.ensure_month_partitions(conn, df)
+                storage.load_reviews_data(conn, df, bank_id_map)
+                
+                # 6. Refresh the report views so Task 4 sees the new data
+                storage.refresh_report_views(conn)
         
-        logger.info("\n✨ Task 3: Data successfully loaded into PostgreSQL.")
+        logger.info(f"\n✨ Task 3: Data successfully loaded into {STORAGE_BACKEND}.")
 
+    except (FileNotFoundError, ValueError) as e:
+        logger.error(f"Error loading or parsing db_config.py: {e}")
+        logger.error("Please ensure config/db_config.py exists and defines the DB_CONFIG dictionary.")
     except psycopg2.OperationalError as e:
         logger.error(f"PostgreSQL Connection Error: {e}")
         logger.error("Please ensure your PostgreSQL server is running and the credentials in config/db_config.py are correct.")
@@ -235,10 +688,7 @@ def main():
     except Exception as e:
         logger.error(f"An unexpected error occurred: {e}")
     finally:
-        if conn:
-            conn.close()
-            logger.info("PostgreSQL connection closed.")
-
+        close_pool()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
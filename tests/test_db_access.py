@@ -0,0 +1,29 @@
+import pytest
+
+from src.database.db_access import read_sql_chunks, read_sql_frame
+
+duckdb = pytest.importorskip('duckdb')
+
+
+@pytest.fixture
+def conn():
+    database = duckdb.connect()
+    cursor = database.cursor()
+    yield cursor
+    cursor.close()
+    database.close()
+
+@pytest.mark.parametrize('chunk_size', [100, 2048, 5000])
+def test_duckdb_chunks_never_exceed_the_chunk_size(conn, chunk_size):
+    chunks = list(read_sql_chunks("SELECT range AS i FROM range(3000)", chunk_size=chunk_size, conn=conn))
+    assert all(len(chunk) <= chunk_size for chunk in chunks)
+    assert sum(len(chunk) for chunk in chunks) == 3000
+
+def test_chunks_add_up_to_the_whole_result(conn):
+    df = read_sql_frame("SELECT range AS i FROM range(3000) ORDER BY i", chunk_size=100, conn=conn)
+    assert df['i'].tolist() == list(range(3000))
+
+def test_empty_result_yields_one_empty_frame_with_columns(conn):
+    chunks = list(read_sql_chunks("SELECT range AS i FROM range(0)", chunk_size=100, conn=conn))
+    assert len(chunks) == 1
+    assert chunks[0].empty and chunks[0].columns.tolist() == ['i']
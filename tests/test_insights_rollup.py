@@ -0,0 +1,78 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from src.analysis import task_2_nlp_analysis as task_2
+from src.analysis.insights_rollup import InsightsRollup
+
+
+def make_scored_reviews(n: int, start: int = 0) -> pd.DataFrame:
+    return pd.DataFrame({
+        'review': [f"review {i}" for i in range(start, start + n)],
+        'rating': [i % 5 + 1 for i in range(start, start + n)],
+        'date': '2024-01-01',
+        'bank': [['CBE', 'BOA', 'Dashen'][i % 3] for i in range(start, start + n)],
+        'sentiment_label': [['POSITIVE', 'NEUTRAL', 'NEGATIVE', 'POSITIVE'][i % 4] for i in range(start, start + n)],
+        'identified_theme': [['Transaction Performance', 'Account Access Issues', None][i % 7 % 3] for i in range(start, start + n)],
+    })
+
+def groupby_aggregate(df: pd.DataFrame, monkeypatch) -> pd.DataFrame:
+    monkeypatch.setattr(task_2, 'INSIGHTS_ROLLUP_ENABLED', False)
+    return task_2.aggregate_insights(df.copy())
+
+def rollup_aggregate(rollup: InsightsRollup, *frames) -> pd.DataFrame:
+    for df in frames:
+        rollup.merge(df)
+    return rollup.to_frame()
+
+def assert_same_table(rollup_df: pd.DataFrame, expected: pd.DataFrame):
+    rollup_df = rollup_df.sort_values(['bank', 'rating']).reset_index(drop=True)
+    expected = expected.sort_values(['bank', 'rating']).reset_index(drop=True)
+    pd.testing.assert_frame_equal(rollup_df, expected, check_dtype=False)
+
+@pytest.fixture
+def rollup(tmp_path):
+    rollup = InsightsRollup(str(tmp_path / 'rollup' / 'insights.sqlite'))
+    yield rollup
+    rollup.close()
+
+def test_rollup_matches_groupby_over_the_merged_reviews(rollup, monkeypatch):
+    first, second = make_scored_reviews(60), make_scored_reviews(45, start=60)
+    # Merging a day's output again, overlapping the previous day, counts nothing twice
+    result = rollup_aggregate(rollup, first, pd.concat([first.iloc[30:], second]), second)
+
+    assert_same_table(result, groupby_aggregate(pd.concat([first, second]), monkeypatch))
+
+def test_rescored_and_rethemed_reviews_replace_their_old_contribution(rollup, monkeypatch):
+    reviews = make_scored_reviews(60)
+    rollup.merge(reviews)
+
+    # Another sentiment model and a changed theme mapping relabel part of the reviews
+    rescored = reviews.copy()
+    rescored.loc[::2, 'sentiment_label'] = 'NEGATIVE'
+    rescored.loc[::3, 'identified_theme'] = 'Customer Support'
+    changed = (rescored['sentiment_label'] != reviews['sentiment_label']) | (rescored['identified_theme'].fillna('') != reviews['identified_theme'].fillna(''))
+    assert rollup.merge(rescored) == changed.sum()
+    assert rollup.merge(rescored) == 0
+
+    assert_same_table(rollup.to_frame(), groupby_aggregate(rescored, monkeypatch))
+
+def test_stores_without_tracked_labels_are_reset(tmp_path):
+    filepath = str(tmp_path / 'insights.sqlite')
+    conn = sqlite3.connect(filepath)
+    conn.executescript(
+        "CREATE TABLE rollup_counts (bank TEXT, rating INTEGER, row_count INTEGER, review_count INTEGER, sentiment_sum REAL);"
+        "CREATE TABLE rollup_ratings (bank TEXT, rating INTEGER, rating_value REAL, count INTEGER);"
+        "CREATE TABLE rollup_themes (bank TEXT, rating INTEGER, theme TEXT, count INTEGER);"
+        "CREATE TABLE rollup_seen (review_hash TEXT PRIMARY KEY);"
+        "INSERT INTO rollup_counts VALUES ('CBE', 5, 1, 1, 1.0);"
+    )
+    conn.close()
+
+    rollup = InsightsRollup(filepath)
+    try:
+        assert rollup.to_frame().empty
+        assert rollup.merge(make_scored_reviews(10)) == 10
+    finally:
+        rollup.close()
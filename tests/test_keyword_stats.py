@@ -0,0 +1,86 @@
+import os
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.keyword_stats import ALL, KeywordStatistics, SpaceSaving
+
+
+def zipf_stream(n: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    return [f"term{rank}" for rank in rng.zipf(1.3, size=n) if rank < 5000]
+
+def make_tokenized_reviews(texts: list, bank: str = 'CBE', month: str = '2024-01') -> pd.DataFrame:
+    return pd.DataFrame({
+        'review': texts,
+        'review_tokens': texts,
+        'bank': bank,
+        'date': f"{month}-15",
+    })
+
+def test_space_saving_bounds_contain_the_exact_counts():
+    stream = zipf_stream(20_000)
+    sketch = SpaceSaving(capacity=100)
+    for item in stream:
+        sketch.add(item)
+
+    exact = Counter(stream)
+    for item, count in sketch.counts.items():
+        assert sketch.guaranteed(item) <= exact[item] <= count
+    assert sum(sketch.counts.values()) == len(stream)
+    # Untracked items never exceeded the minimum counter
+    assert max(exact[item] for item in exact if item not in sketch.counts) <= sketch.upper_bound('never-seen')
+
+def test_space_saving_ranks_like_exact_counts_on_the_guaranteed_count():
+    stream = zipf_stream(20_000, seed=1)
+    sketch = SpaceSaving(capacity=200)
+    for item in stream:
+        sketch.add(item)
+
+    exact_top = [item for item, _ in Counter(stream).most_common(10)]
+    assert [item for item, _, _ in sketch.top(10)] == exact_top
+
+def test_late_rare_terms_do_not_outrank_frequent_ones():
+    sketch = SpaceSaving(capacity=3)
+    for _ in range(50):
+        sketch.add('good')
+    for _ in range(40):
+        sketch.add('bank')
+    # Each one-off inherits the evicted minimum as its count
+    for i in range(30):
+        sketch.add(f"typo{i}")
+
+    top = sketch.top(3)
+    assert [item for item, _, _ in top[:2]] == ['good', 'bank']
+    assert top[2][1] == 1 and top[2][2] > 1
+
+def test_top_terms_match_exact_document_frequencies():
+    texts = ['mobile banking app crashes', 'banking app good', 'app slow transfer', 'good app', 'transfer failed']
+    stats = KeywordStatistics(num_features=2 ** 16, ngram_range=(1, 1))
+    stats.update(make_tokenized_reviews(texts))
+
+    top = stats.top_terms(n=3)
+    assert top['term'].tolist() == ['app', 'banking', 'good']
+    assert top['doc_count'].tolist() == [4, 2, 2]
+    assert (top['max_overestimate'] == 0).all()
+
+def test_emerging_terms_compare_with_the_previous_month():
+    stats = KeywordStatistics(num_features=2 ** 16, ngram_range=(1, 1))
+    stats.update(make_tokenized_reviews(['good app', 'good service'], month='2024-01'))
+    stats.update(make_tokenized_reviews(['login fails', 'login fails again', 'good app'], month='2024-02'))
+
+    assert stats.emerging_terms('CBE', '2024-02', n=2)['term'].tolist() == ['fails', 'login']
+    assert stats.top_terms(bank='CBE', month=ALL, n=1)['term'].tolist() == ['good']
+
+def test_save_writes_a_single_file_that_round_trips(tmp_path):
+    stats = KeywordStatistics(num_features=2 ** 16, capacity=10)
+    stats.update(make_tokenized_reviews(['good app', 'app login fails']))
+    stats.save(str(tmp_path))
+    assert os.listdir(tmp_path) == [KeywordStatistics.STATE_FILENAME]
+
+    loaded = KeywordStatistics.load(str(tmp_path))
+    assert loaded.capacity == 10
+    pd.testing.assert_frame_equal(loaded.top_terms(n=5), stats.top_terms(n=5))
+    # Reviews counted before the save are not counted again
+    assert loaded.update(make_tokenized_reviews(['good app'])) == 0
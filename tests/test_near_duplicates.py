@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from src.data_preprocessing.near_duplicates import MinHasher, NearDuplicateFilter, optimal_lsh_bands
+
+BASE = "the mobile banking app keeps crashing every time i try to transfer money to another account"
+
+
+def make_reviews(texts: list, bank: str = 'CBE') -> pd.DataFrame:
+    return pd.DataFrame({'review': texts, 'bank': bank, 'date': '2024-01-01'})
+
+def exact_jaccard(hasher: MinHasher, a: str, b: str) -> float:
+    shingles_a, shingles_b = hasher.shingles(a), hasher.shingles(b)
+    return len(shingles_a & shingles_b) / len(shingles_a | shingles_b)
+
+def test_lsh_bands_put_the_s_curve_inflection_near_the_threshold():
+    bands, rows = optimal_lsh_bands(0.8, 128)
+    assert bands * rows <= 128
+    assert abs((1 / bands) ** (1 / rows) - 0.8) < 0.05
+
+def test_minhash_estimates_the_jaccard_similarity_of_shingles():
+    hasher = MinHasher(num_perm=256)
+    edited = BASE.replace('crashing', 'freezing').replace('another', 'my other')
+    estimate = np.mean(hasher.signature(BASE) == hasher.signature(edited))
+    assert abs(estimate - exact_jaccard(hasher, BASE, edited)) < 0.1
+
+def test_near_duplicates_are_dropped_and_distinct_reviews_kept():
+    near_duplicate_filter = NearDuplicateFilter(threshold=0.8)
+    df = make_reviews([
+        BASE,
+        BASE + '!!',                                              # trivially edited repeat
+        "customer support never answered my calls about the blocked card",
+        BASE.upper(),                                             # same text after normalization
+    ])
+    kept = near_duplicate_filter.filter(df)
+
+    assert kept['review'].tolist() == [BASE, "customer support never answered my calls about the blocked card"]
+    audit = near_duplicate_filter.audit_frame()
+    assert len(audit) == 2
+    assert audit['cluster_id'].nunique() == 1
+    assert (audit['estimated_similarity'] >= 0.8).all()
+    kept_hash = f"{int(near_duplicate_filter.review_row_hashes(df.iloc[:1])[0]):016x}"
+    assert (audit['kept_review_hash'] == kept_hash).all()
+
+def test_short_reviews_and_other_banks_are_never_merged():
+    near_duplicate_filter = NearDuplicateFilter(threshold=0.8, min_length=30)
+    df = pd.concat([
+        make_reviews(['good app', 'good app', BASE]),
+        make_reviews([BASE], bank='BOA'),
+    ], ignore_index=True)
+    assert len(near_duplicate_filter.filter(df)) == 4
+
+def test_duplicates_are_found_across_chunks_and_audited_as_they_stream(tmp_path):
+    audit_filepath = tmp_path / 'audit.csv'
+    near_duplicate_filter = NearDuplicateFilter(threshold=0.8, audit_filepath=str(audit_filepath))
+
+    assert len(near_duplicate_filter.filter(make_reviews([BASE]))) == 1
+    assert len(pd.read_csv(audit_filepath)) == 0
+    assert len(near_duplicate_filter.filter(make_reviews([BASE + '.', BASE + ' !']))) == 0
+    # Rows are on disk after each chunk, not only at the end
+    assert len(pd.read_csv(audit_filepath)) == 2
+    assert near_duplicate_filter.filter(make_reviews([BASE + '?'])).empty
+
+    audit = near_duplicate_filter.audit_frame()
+    assert len(audit) == near_duplicate_filter.dropped_count == 3
+    assert len(near_duplicate_filter.duplicate_clusters) == 1
+    assert near_duplicate_filter.audit_records == []
+
+def test_index_storage_grows_with_compact_arrays():
+    near_duplicate_filter = NearDuplicateFilter(threshold=0.8, min_length=1)
+    texts = [f"review number {i} with some distinct words {i * 7919}" for i in range(100)]
+    assert len(near_duplicate_filter.filter(make_reviews(texts))) == 100
+
+    index = near_duplicate_filter.indexes['CBE']
+    assert index.size == 100
+    assert index.signatures.dtype == np.uint16
+    assert index.row_hashes.dtype == np.uint64
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_preprocessing.preprocess_data import BankReservoirSampler, CrossChunkDeduplicator
+
+
+def make_reviews(n: int, bank: str = 'CBE', start: int = 0) -> pd.DataFrame:
+    return pd.DataFrame({
+        'review': [f"review {i}" for i in range(start, start + n)],
+        'rating': [i % 5 + 1 for i in range(start, start + n)],
+        'date': pd.date_range('2024-01-01', periods=n, freq='h').strftime('%Y-%m-%d'),
+        'bank': bank,
+    })
+
+def chunks_of(df: pd.DataFrame, sizes: list):
+    start = 0
+    for size in sizes:
+        yield df.iloc[start:start + size]
+        start += size
+
+def test_reservoir_caps_large_banks_and_keeps_small_ones():
+    sampler = BankReservoirSampler(max_reviews=50, min_reviews=10, seed=1)
+    for chunk in chunks_of(make_reviews(300, 'CBE'), [7, 100, 1, 192]):
+        sampler.update(chunk)
+    sampler.update(make_reviews(30, 'BOA', start=1000))
+
+    result = sampler.result()
+    counts = result['bank'].value_counts()
+    assert counts['CBE'] == 50
+    assert counts['BOA'] == 30
+    assert result['review'].is_unique
+    assert list(result.columns) == ['review', 'rating', 'date', 'bank']
+
+def test_reservoir_is_reproducible_for_a_seed():
+    def sample(seed):
+        sampler = BankReservoirSampler(max_reviews=20, min_reviews=1, seed=seed)
+        for chunk in chunks_of(make_reviews(200), [50] * 4):
+            sampler.update(chunk)
+        return sampler.result()['review'].tolist()
+
+    assert sample(3) == sample(3)
+    assert sample(3) != sample(4)
+
+def test_reservoir_selects_every_row_with_equal_probability():
+    n_rows, max_reviews, trials = 40, 10, 1000
+    df = make_reviews(n_rows)
+    hits = pd.Series(0, index=df['review'])
+    for seed in range(trials):
+        sampler = BankReservoirSampler(max_reviews=max_reviews, min_reviews=1, seed=seed)
+        # Uneven chunks exercise the fill / replace boundary inside a chunk
+        for chunk in chunks_of(df, [13, 27]):
+            sampler.update(chunk)
+        hits[sampler.result()['review']] += 1
+
+    expected = trials * max_reviews / n_rows
+    # Binomial standard deviation is about 14 here; 5 sigma keeps the test stable
+    assert (hits - expected).abs().max() < 5 * np.sqrt(expected * (1 - max_reviews / n_rows))
+
+def test_stratified_reservoir_mirrors_the_rating_distribution():
+    df = make_reviews(1000)
+    df['rating'] = np.repeat([1, 5], [800, 200])
+    sampler = BankReservoirSampler(max_reviews=100, min_reviews=1, seed=0, stratify_by='rating')
+    for chunk in chunks_of(df.sample(frac=1, random_state=0), [250] * 4):
+        sampler.update(chunk)
+
+    assert sampler.result()['rating'].value_counts().to_dict() == {1: 80, 5: 20}
+
+def test_stratify_by_rejects_unknown_options():
+    with pytest.raises(ValueError):
+        BankReservoirSampler(stratify_by='bank')
+
+def test_cross_chunk_deduplicator_drops_rows_seen_in_earlier_chunks():
+    deduplicator = CrossChunkDeduplicator()
+    first = make_reviews(5)
+    second = pd.concat([make_reviews(2, start=3), make_reviews(3, start=10)], ignore_index=True)
+
+    assert len(deduplicator.filter_new(first)) == 5
+    kept = deduplicator.filter_new(second)
+    assert kept['review'].tolist() == ['review 10', 'review 11', 'review 12']
+    # The same review of another bank is not a duplicate
+    assert len(deduplicator.filter_new(make_reviews(5, bank='BOA'))) == 5
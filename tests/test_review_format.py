@@ -0,0 +1,65 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.common import review_format
+from src.common.review_format import read_reviews, write_reviews, iter_reviews
+
+pytest.importorskip('pyarrow')
+
+
+def make_reviews(n: int = 4) -> pd.DataFrame:
+    return pd.DataFrame({
+        'review': [f"review {i}" for i in range(n)],
+        'rating': [i % 5 + 1 for i in range(n)],
+        'date': ['2024-01-0' + str(i % 9 + 1) for i in range(n)],
+        'bank': ['CBE', 'BOA'] * (n // 2),
+    })
+
+def set_mtime(filepath: str, mtime: float):
+    os.utime(filepath, (mtime, mtime))
+
+def test_round_trip_applies_the_handoff_schema(tmp_path):
+    filepath = write_reviews(make_reviews(), str(tmp_path / 'reviews.csv'))
+    assert filepath.endswith('.parquet')
+    assert os.path.exists(tmp_path / 'reviews.csv')
+
+    df = read_reviews(str(tmp_path / 'reviews.csv'))
+    assert df['bank'].dtype == 'category'
+    assert df['rating'].dtype == 'int8'
+    assert pd.api.types.is_datetime64_any_dtype(df['date'])
+    assert read_reviews(filepath, columns=['bank']).columns.tolist() == ['bank']
+
+def test_newer_csv_output_wins_over_a_stale_parquet_file(tmp_path):
+    write_reviews(make_reviews(4), str(tmp_path / 'reviews.csv'))
+    # A CSV-only writer (notebook, older tool) updates the file afterwards
+    make_reviews(6).to_csv(tmp_path / 'reviews.csv', index=False)
+    set_mtime(tmp_path / 'reviews.parquet', 1_000_000)
+
+    assert len(read_reviews(str(tmp_path / 'reviews.csv'))) == 6
+    assert sum(len(chunk) for chunk in iter_reviews(str(tmp_path / 'reviews.csv'), chunk_size=4)) == 6
+
+def test_parquet_written_by_write_reviews_is_preferred_over_its_export(tmp_path):
+    write_reviews(make_reviews(4), str(tmp_path / 'reviews.csv'))
+    parquet_mtime = os.path.getmtime(tmp_path / 'reviews.parquet')
+    assert os.path.getmtime(tmp_path / 'reviews.csv') <= parquet_mtime
+
+    # A CSV export with other content that is not newer must not be the one read
+    make_reviews(6).to_csv(tmp_path / 'reviews.csv', index=False)
+    set_mtime(tmp_path / 'reviews.csv', parquet_mtime - 60)
+    assert len(read_reviews(str(tmp_path / 'reviews.csv'))) == 4
+    assert sum(len(chunk) for chunk in iter_reviews(str(tmp_path / 'reviews.csv'), chunk_size=3)) == 4
+
+def test_csv_only_write_removes_a_stale_parquet_file(tmp_path, monkeypatch):
+    write_reviews(make_reviews(4), str(tmp_path / 'reviews.csv'))
+    monkeypatch.setattr(review_format, 'pq', None)
+    write_reviews(make_reviews(6), str(tmp_path / 'reviews.csv'))
+
+    assert not os.path.exists(tmp_path / 'reviews.parquet')
+    monkeypatch.undo()
+    assert len(read_reviews(str(tmp_path / 'reviews.csv'))) == 6
+
+def test_missing_handoff_file_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        read_reviews(str(tmp_path / 'missing.csv'))
@@ -0,0 +1,98 @@
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from src.data_collection import scrape_reviews
+from src.data_collection.scrape_reviews import BankReviewScraper, _ContinuationToken, iter_review_batches, write_review_batch
+
+APP_ID = 'com.example.bank'
+
+
+def make_review(review_id: str, minutes_ago: int) -> dict:
+    return {'reviewId': review_id, 'content': f"review {review_id}", 'score': 5,
+            'at': datetime(2024, 6, 1) - timedelta(minutes=minutes_ago)}
+
+class FakePlayStore:
+    """Newest-first review list served in pages; `fail_at` makes one request fail like the library does."""
+
+    def __init__(self, reviews: list):
+        self.reviews = reviews
+        self.fail_at = None
+        self.requests = 0
+
+    def __call__(self, app_id, lang, country, sort, count, continuation_token=None):
+        self.requests += 1
+        start = int(continuation_token.token) if continuation_token is not None else 0
+        if start == self.fail_at:
+            # google_play_scraper swallows the error and returns no next-page token
+            return [], _ContinuationToken(None, lang, country, sort, count, None, None)
+        end = start + count
+        next_token = str(end) if end < len(self.reviews) else None
+        return self.reviews[start:end], _ContinuationToken(next_token, lang, country, sort, count, None, None)
+
+@pytest.fixture
+def play_store(monkeypatch):
+    store = FakePlayStore([make_review(f"old{i}", 100 + i) for i in range(5)])
+    monkeypatch.setattr(scrape_reviews, 'fetch_review_page', store)
+    return store
+
+def make_scraper(tmp_path, **overrides) -> BankReviewScraper:
+    return BankReviewScraper(incremental=True, state_dir=str(tmp_path / 'state'), page_size=2,
+                             requests_per_second=1000.0, burst_size=1000, **overrides)
+
+def crawl(scraper: BankReviewScraper) -> list:
+    review_ids = [review['reviewId'] for page in scraper._iter_app_pages(APP_ID, 'TEST') for review in page]
+    scraper.commit_watermarks()
+    return review_ids
+
+def test_failed_request_mid_crawl_keeps_the_watermark_and_resumes(tmp_path, play_store):
+    assert crawl(make_scraper(tmp_path)) == [f"old{i}" for i in range(5)]
+
+    play_store.reviews = [make_review(f"new{i}", i) for i in range(5)] + play_store.reviews
+    play_store.fail_at = 2
+    scraper = make_scraper(tmp_path)
+    assert crawl(scraper) == ['new0', 'new1']
+    # The watermark did not jump past new2..new4
+    state = scraper.state_store.load(APP_ID)
+    assert state['watermark']['review_id'] == 'old0'
+    assert state['checkpoint']['incomplete_crawls'] == 1
+
+    play_store.fail_at = None
+    scraper = make_scraper(tmp_path)
+    # The spooled first page is replayed, then paging resumes after it
+    assert crawl(scraper) == ['new0', 'new1', 'new2', 'new3', 'new4']
+    assert scraper.state_store.load(APP_ID) == {'watermark': {'review_id': 'new0', 'review_at': play_store.reviews[0]['at'].isoformat()}}
+
+def test_persistent_early_end_is_accepted_after_repeated_runs(tmp_path, play_store):
+    crawl(make_scraper(tmp_path))
+    play_store.reviews = [make_review('new0', 0)] + play_store.reviews
+    play_store.fail_at = 0
+
+    for _ in range(BankReviewScraper.MAX_INCOMPLETE_CRAWLS - 1):
+        crawl(make_scraper(tmp_path))
+        assert make_scraper(tmp_path).state_store.load(APP_ID)['watermark']['review_id'] == 'old0'
+    crawl(make_scraper(tmp_path))
+    assert 'checkpoint' not in make_scraper(tmp_path).state_store.load(APP_ID)
+
+def test_failed_request_is_not_recorded_for_replay(tmp_path, play_store):
+    crawl(make_scraper(tmp_path))
+    play_store.reviews = [make_review(f"new{i}", i) for i in range(5)] + play_store.reviews
+    play_store.fail_at = 2
+    cache_dir = tmp_path / 'http_cache'
+    crawl(make_scraper(tmp_path, http_cache_mode='record', http_cache_dir=str(cache_dir)))
+
+    # Only the good first page was kept; replaying must not repeat the early end
+    assert len(os.listdir(cache_dir / APP_ID)) == 1
+
+def test_batches_of_runs_started_in_the_same_second_do_not_collide(tmp_path):
+    page = pd.DataFrame({'review_text': ['good'], 'rating': [5]})
+    first = write_review_batch(page, str(tmp_path), 'CBE', datetime(2024, 6, 1, 9, 30, 0, 1000), 0)
+    second = write_review_batch(page.assign(rating=1), str(tmp_path), 'CBE', datetime(2024, 6, 1, 9, 30, 0, 2000), 0)
+    assert first != second
+
+    with pytest.raises(FileExistsError):
+        write_review_batch(page.assign(rating=3), str(tmp_path), 'CBE', datetime(2024, 6, 1, 9, 30, 0, 1000), 0)
+    assert sorted(batch['rating'].item() for batch in iter_review_batches(str(tmp_path))) == [1, 5]
+    assert not [name for name in os.listdir(os.path.dirname(first)) if name.endswith('.tmp')]
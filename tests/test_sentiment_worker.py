@@ -0,0 +1,103 @@
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from src.analysis import sentiment_worker
+from src.analysis.sentiment_worker import SentimentWorker, connect_to_worker, create_authkey, load_authkey
+
+AUTHKEY = b'test-key-' + b'0' * 32
+
+
+def free_address() -> tuple:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()
+
+def wait_for_listener(address: tuple):
+    for _ in range(100):
+        try:
+            socket.create_connection(address, timeout=0.1).close()
+            return
+        except OSError:
+            time.sleep(0.02)
+    raise RuntimeError(f"Nothing listening on {address}")
+
+@pytest.fixture
+def worker_address():
+    address = free_address()
+    worker = SentimentWorker(lambda texts: [('POSITIVE', len(text) / 10) for text in texts], 'stub-model',
+                             address=address, authkey=AUTHKEY)
+    threading.Thread(target=worker.serve_forever, daemon=True).start()
+    wait_for_listener(address)
+    return address
+
+def test_client_scores_through_the_worker(worker_address):
+    client = connect_to_worker(worker_address, AUTHKEY)
+    try:
+        assert client.model_key() == 'stub-model'
+        assert client.score(['abc', 'abcdefghij']) == [('POSITIVE', 0.3), ('POSITIVE', 1.0)]
+        assert client.metrics()['texts'] == 2
+    finally:
+        client.close()
+
+def test_wrong_key_falls_back_and_the_worker_keeps_serving(worker_address):
+    assert connect_to_worker(worker_address, b'wrong-key') is None
+
+    client = connect_to_worker(worker_address, AUTHKEY)
+    assert client.model_key() == 'stub-model'
+    client.close()
+
+def test_a_stalled_client_does_not_block_other_clients(worker_address):
+    stalled = socket.create_connection(worker_address)
+    try:
+        client = connect_to_worker(worker_address, AUTHKEY)
+        assert client.model_key() == 'stub-model'
+        client.close()
+    finally:
+        stalled.close()
+
+def test_silent_listener_times_out_instead_of_hanging(monkeypatch):
+    monkeypatch.setattr(sentiment_worker, 'CONNECT_TIMEOUT_SECONDS', 0.5)
+    with socket.socket() as listener:
+        listener.bind(('127.0.0.1', 0))
+        listener.listen()
+        started = time.monotonic()
+        assert connect_to_worker(listener.getsockname(), AUTHKEY) is None
+        assert time.monotonic() - started < 5
+
+def test_no_worker_listening_returns_none():
+    assert connect_to_worker(free_address(), AUTHKEY) is None
+
+def test_there_is_no_default_key(tmp_path, monkeypatch):
+    monkeypatch.delenv('SENTIMENT_WORKER_AUTHKEY', raising=False)
+    monkeypatch.setattr(sentiment_worker, 'WORKER_AUTHKEY_FILEPATH', str(tmp_path / 'missing.key'))
+    with pytest.raises(FileNotFoundError):
+        load_authkey()
+
+    # Without a key Task 2 does not even try to connect, even to a live worker
+    def fail_if_called(*args, **kwargs):
+        raise AssertionError("connected without a key")
+    monkeypatch.setattr(sentiment_worker, 'SentimentWorkerClient', fail_if_called)
+    assert connect_to_worker(free_address()) is None
+
+def test_environment_key_takes_precedence(monkeypatch, tmp_path):
+    monkeypatch.setenv('SENTIMENT_WORKER_AUTHKEY', 'from-env')
+    assert load_authkey(str(tmp_path / 'missing.key')) == b'from-env'
+
+@pytest.mark.skipif(os.name == 'nt', reason="POSIX permission bits")
+def test_key_file_must_be_private(tmp_path, monkeypatch):
+    monkeypatch.delenv('SENTIMENT_WORKER_AUTHKEY', raising=False)
+    key_filepath = str(tmp_path / 'worker.key')
+    monkeypatch.setattr(sentiment_worker, 'WORKER_AUTHKEY_FILEPATH', key_filepath)
+    create_authkey()
+    assert os.stat(key_filepath).st_mode & 0o777 == 0o600
+    assert len(load_authkey()) == 64
+
+    with pytest.raises(FileExistsError):
+        create_authkey(key_filepath)
+    os.chmod(key_filepath, 0o644)
+    with pytest.raises(PermissionError):
+        load_authkey(key_filepath)
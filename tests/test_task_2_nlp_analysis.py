@@ -0,0 +1,79 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.analysis import task_2_nlp_analysis as task_2
+from src.analysis.task_2_nlp_analysis import SentimentCache, ThemeMatcher, THEME_MATCHER, assign_theme, score_with_cache
+
+REVIEWS_FILEPATH = os.path.join(task_2.DATA_PROCESSED_PATH, 'reviews_with_sentiment_themes.csv')
+
+
+@pytest.fixture
+def cache_filepath(tmp_path, monkeypatch):
+    filepath = str(tmp_path / 'sentiment_cache.sqlite')
+    monkeypatch.setattr(task_2, 'SENTIMENT_CACHE_FILEPATH', filepath)
+    monkeypatch.setattr(task_2, 'SENTIMENT_CACHE_ENABLED', True)
+    monkeypatch.setattr(task_2, 'SENTIMENT_CACHE_PRUNE_OTHER_MODELS', False)
+    return filepath
+
+class CountingScorer:
+    def __init__(self, label: str):
+        self.label = label
+        self.scored = []
+
+    def __call__(self, texts: list) -> list:
+        self.scored.extend(texts)
+        return [(self.label, 0.9) for _ in texts]
+
+def test_cache_only_scores_new_texts(cache_filepath):
+    first, second = CountingScorer('POSITIVE'), CountingScorer('POSITIVE')
+    score_with_cache(pd.Series(['good', 'bad', 'good']), 'distilbert@v1', first)
+    results = score_with_cache(pd.Series(['good', 'bad', 'new']), 'distilbert@v1', second)
+
+    assert first.scored == ['good', 'bad']
+    assert second.scored == ['new']
+    assert results == [('POSITIVE', 0.9)] * 3
+
+def test_switching_models_keeps_the_other_models_entries(cache_filepath):
+    texts = pd.Series(['good', 'bad'])
+    score_with_cache(texts, 'distilbert@v1', CountingScorer('POSITIVE'))
+    # A VADER fallback run in between must not wipe the DistilBERT entries
+    vader = CountingScorer('NEGATIVE')
+    assert score_with_cache(texts, 'vader', vader) == [('NEGATIVE', 0.9)] * 2
+
+    distilbert = CountingScorer('POSITIVE')
+    assert score_with_cache(texts, 'distilbert@v1', distilbert) == [('POSITIVE', 0.9)] * 2
+    assert distilbert.scored == []
+
+def test_pruning_other_models_is_opt_in(cache_filepath):
+    score_with_cache(pd.Series(['good']), 'distilbert@v1', CountingScorer('POSITIVE'))
+    score_with_cache(pd.Series(['good']), 'vader', CountingScorer('NEGATIVE'))
+
+    cache = SentimentCache('distilbert@v1', cache_filepath, prune=True)
+    try:
+        assert cache.get_many([SentimentCache.text_key('good')]) == {SentimentCache.text_key('good'): ('POSITIVE', 0.9)}
+    finally:
+        cache.close()
+    cache = SentimentCache('vader', cache_filepath)
+    try:
+        assert cache.get_many([SentimentCache.text_key('good')]) == {}
+    finally:
+        cache.close()
+
+def test_theme_matcher_agrees_with_the_keyword_loop_on_stored_reviews():
+    texts = pd.read_csv(REVIEWS_FILEPATH, usecols=['review'])['review']
+    texts = pd.concat([texts, pd.Series([None, '', 'PIN and Face ID', 'slow, slow, SLOW', 'user interface is a ui'])],
+                      ignore_index=True)
+    expected = texts.apply(assign_theme)
+
+    assert texts.apply(THEME_MATCHER.assign).tolist() == expected.tolist()
+    assert THEME_MATCHER.assign_themes(texts).tolist() == expected.tolist()
+
+def test_nested_keywords_are_all_credited():
+    # 'user' starts 'user interface': both must count, as separate re.search calls would
+    matcher = ThemeMatcher({'A': ['user interface'], 'B': ['user', 'app'], 'C': ['interface']})
+    assert matcher.theme_scores('the user interface of the app') == {'A': 1, 'B': 2, 'C': 1}
+    # Ties go to the first theme of the mapping
+    assert matcher.assign('user interface') == 'A'
+    assert matcher.assign('nothing relevant') == 'General Feedback'
@@ -0,0 +1,196 @@
+import os
+import uuid
+
+import pandas as pd
+import pytest
+
+from src.database import task_3_database_storage as task_3
+from src.database.task_3_database_storage import review_content_hash, skip_undated_reviews
+
+# PostgreSQL tests run against a scratch schema of this server when it is set, e.g.
+# TASK3_TEST_POSTGRES_DSN="dbname=bank_reviews_test user=postgres host=localhost"
+POSTGRES_DSN = os.environ.get('TASK3_TEST_POSTGRES_DSN')
+
+
+def make_reviews() -> pd.DataFrame:
+    return pd.DataFrame({
+        'review': ['fast app', 'no date', 'bad date', 'crashes'],
+        'date': ['2024-01-05', None, 'not a date', '2024-02-10'],
+        'bank': 'CBE',
+    })
+
+def make_enriched_reviews() -> pd.DataFrame:
+    return pd.DataFrame({
+        'review_id_generated': range(5),
+        'review': ['fast app', 'crashes on login', 'Ça marche 👍', None, 'fast app'],
+        'rating': [5, 1, 4, 3, 5],
+        'date': ['2024-01-05', '2024-02-10', '2024-02-11', '2024-03-01', '2024-01-05'],
+        'bank': pd.Categorical(['CBE', 'BOA', 'CBE', 'Dashen', 'CBE']),
+        'app_id': ['com.cbe', 'com.boa', None, 'com.dashen', 'com.cbe'],
+        'review_preprocessed': ['fast app', 'crashes on login', 'ça marche', None, 'fast app'],
+        'review_tokens': ['fast app', 'crashes login', 'ça marche', None, 'fast app'],
+        'sentiment_label': ['POSITIVE', 'NEGATIVE', 'POSITIVE', 'NEUTRAL', 'POSITIVE'],
+        'sentiment_score': [0.9876, 0.91, 0.75, 0.5, 0.9876],
+        'identified_theme': ['Transaction Performance', 'Account Access Issues', 'General Feedback', None,
+                             'Transaction Performance'],
+        'source': 'Google Play',
+    })
+
+def test_partitioned_tables_skip_and_report_undated_reviews(tmp_path, monkeypatch):
+    monkeypatch.setattr(task_3, 'DATA_PROCESSED_PATH', str(tmp_path))
+    monkeypatch.setattr(task_3, 'is_partitioned', lambda conn, table_name='reviews': True)
+
+    kept = skip_undated_reviews(None, make_reviews())
+    assert kept['review'].tolist() == ['fast app', 'crashes']
+    skipped = pd.read_csv(tmp_path / task_3.UNDATED_REVIEWS_FILENAME)
+    assert skipped['review'].tolist() == ['no date', 'bad date']
+
+def test_unpartitioned_tables_keep_undated_reviews(tmp_path, monkeypatch):
+    monkeypatch.setattr(task_3, 'DATA_PROCESSED_PATH', str(tmp_path))
+    monkeypatch.setattr(task_3, 'is_partitioned', lambda conn, table_name='reviews': False)
+
+    assert len(skip_undated_reviews(None, make_reviews())) == 4
+    assert not (tmp_path / task_3.UNDATED_REVIEWS_FILENAME).exists()
+
+
+# --- DuckDB backend (same load API as PostgreSQL, no server needed) ---
+
+@pytest.fixture
+def duckdb_conn():
+    duckdb = pytest.importorskip('duckdb')
+    from src.database import duckdb_storage
+    database = duckdb.connect()
+    conn = database.cursor()
+    duckdb_storage.create_db_tables(conn)
+    yield conn
+    conn.close()
+    database.close()
+
+def load_into_duckdb(conn, df: pd.DataFrame) -> tuple:
+    from src.database import duckdb_storage
+    bank_id_map = duckdb_storage.insert_banks_data(conn, df)
+    return duckdb_storage.load_reviews_data(conn, df, bank_id_map)
+
+def test_review_content_hash_matches_its_sql_expression(duckdb_conn):
+    df = make_enriched_reviews()
+    df.loc[2, 'date'] = None
+    duckdb_conn.register('input_reviews', df.assign(bank=df['bank'].astype(str)))
+    # DuckDB spells PostgreSQL's to_char(review_date, 'YYYY-MM-DD') as strftime
+    duckdb_conn.execute("""
+        SELECT md5(concat_ws('|', bank, coalesce(app_id, ''), coalesce(review, ''),
+                             coalesce(strftime(TRY_CAST(date AS DATE), '%Y-%m-%d'), '')))
+        FROM input_reviews
+    """)
+    assert [row[0] for row in duckdb_conn.fetchall()] == review_content_hash(df).tolist()
+
+def test_loading_the_same_reviews_twice_is_idempotent(duckdb_conn):
+    df = make_enriched_reviews()
+    # The last row repeats the first one, so the batch holds four distinct reviews
+    assert load_into_duckdb(duckdb_conn, df) == (4, 0)
+    assert load_into_duckdb(duckdb_conn, df) == (0, 0)
+    duckdb_conn.execute("SELECT COUNT(*) FROM reviews")
+    assert duckdb_conn.fetchone()[0] == 4
+
+def test_changed_reviews_are_updated_in_place(duckdb_conn):
+    df = make_enriched_reviews()
+    load_into_duckdb(duckdb_conn, df)
+
+    # Re-scored by another model; review_id_generated is renumbered by every Task 2 run
+    rescored = df.assign(review_id_generated=df['review_id_generated'] + 100)
+    rescored.loc[[1, 3], 'sentiment_label'] = 'POSITIVE'
+    assert load_into_duckdb(duckdb_conn, rescored) == (0, 2)
+
+    duckdb_conn.execute("SELECT review_text, sentiment_label FROM reviews ORDER BY review_pk")
+    assert [label for _, label in duckdb_conn.fetchall()] == ['POSITIVE'] * 4
+
+
+# --- PostgreSQL (only with TASK3_TEST_POSTGRES_DSN) ---
+
+@pytest.fixture(params=[False, True], ids=['plain', 'partitioned'])
+def postgres_conn(request, monkeypatch):
+    if not POSTGRES_DSN:
+        pytest.skip("TASK3_TEST_POSTGRES_DSN is not set")
+    import psycopg2
+    monkeypatch.setattr(task_3, 'PARTITION_BY_MONTH', request.param)
+
+    conn = psycopg2.connect(POSTGRES_DSN)
+    schema = f"task3_test_{uuid.uuid4().hex[:12]}"
+    with conn.cursor() as cur:
+        cur.execute(f"CREATE SCHEMA {schema}; SET search_path TO {schema};")
+    conn.commit()
+    try:
+        task_3.create_db_tables(conn)
+        yield conn
+    finally:
+        conn.rollback()
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA {schema} CASCADE")
+        conn.commit()
+        conn.close()
+
+def load_into_postgres(conn, df: pd.DataFrame) -> tuple:
+    bank_id_map = task_3.insert_banks_data(conn, df)
+    task_3.ensure_month_partitions(conn, df)
+    return task_3.load_reviews_data(conn, df, bank_id_map)
+
+def fetch_one(conn, query: str, params=None):
+    with conn.cursor() as cur:
+        cur.execute(query, params)
+        return cur.fetchone()
+
+def test_postgres_hash_matches_the_documented_expression(postgres_conn):
+    df = make_enriched_reviews()
+    load_into_postgres(postgres_conn, df)
+    with postgres_conn.cursor() as cur:
+        cur.execute("""
+            SELECT review_hash = md5(concat_ws('|', bank_name, coalesce(app_id, ''), coalesce(review_text, ''),
+                                               coalesce(to_char(review_date, 'YYYY-MM-DD'), '')))
+            FROM reviews JOIN banks USING (bank_id)
+        """)
+        assert [row[0] for row in cur.fetchall()] == [True] * 4
+
+def test_postgres_load_is_idempotent_and_draws_no_keys_for_stored_reviews(postgres_conn):
+    df = make_enriched_reviews()
+    assert load_into_postgres(postgres_conn, df) == (4, 0)
+    sequence_value = fetch_one(postgres_conn, "SELECT last_value FROM reviews_review_pk_seq")[0]
+
+    assert load_into_postgres(postgres_conn, df) == (0, 0)
+    assert fetch_one(postgres_conn, "SELECT last_value FROM reviews_review_pk_seq")[0] == sequence_value
+    assert fetch_one(postgres_conn, "SELECT COUNT(*) FROM reviews")[0] == 4
+
+def test_postgres_updates_changed_reviews_and_refreshes_the_views(postgres_conn):
+    df = make_enriched_reviews()
+    load_into_postgres(postgres_conn, df)
+    rescored = df.assign(review_id_generated=df['review_id_generated'] + 100)
+    rescored.loc[1, ['rating', 'sentiment_label']] = [2, 'NEUTRAL']
+
+    assert load_into_postgres(postgres_conn, rescored) == (0, 1)
+    task_3.refresh_report_views(postgres_conn)
+    assert fetch_one(postgres_conn, "SELECT rating_count FROM mv_rating_distribution WHERE bank_name = 'BOA'") == (1,)
+    assert fetch_one(postgres_conn, "SELECT rating FROM reviews WHERE review_text = 'crashes on login'") == (2,)
+
+def test_postgres_adopts_rows_stored_before_the_natural_key(postgres_conn):
+    if task_3.is_partitioned(postgres_conn):
+        pytest.skip("partitioned tables are always created with the natural key")
+    df = make_enriched_reviews()
+    bank_id_map = task_3.insert_banks_data(postgres_conn, df)
+    with postgres_conn.cursor() as cur:
+        cur.execute(
+            "INSERT INTO reviews (bank_id, review_id_generated, review_text, rating, review_date) "
+            "VALUES (%s, 0, 'fast app', 5, '2024-01-05')", (bank_id_map['CBE'],)
+        )
+    postgres_conn.commit()
+
+    inserted, _ = task_3.load_reviews_data(postgres_conn, df, bank_id_map)
+    assert inserted == 3
+    assert fetch_one(postgres_conn, "SELECT COUNT(*), COUNT(review_hash) FROM reviews") == (4, 4)
+
+def test_postgres_partitioned_load_skips_undated_reviews(postgres_conn, tmp_path, monkeypatch):
+    if not task_3.is_partitioned(postgres_conn):
+        pytest.skip("only partitioned tables require a review date")
+    monkeypatch.setattr(task_3, 'DATA_PROCESSED_PATH', str(tmp_path))
+    df = make_enriched_reviews()
+    df.loc[2, 'date'] = None
+
+    assert load_into_postgres(postgres_conn, df) == (3, 0)
+    assert len(pd.read_csv(tmp_path / task_3.UNDATED_REVIEWS_FILENAME)) == 1